@@ -1,8 +1,11 @@
 """Semantic Opinion Dynamics: CLI entry point."""
 
 import argparse
+import json
+import os
 import shutil
 import sys
+from functools import partial
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
@@ -14,9 +17,29 @@ from input import (
     getNextNetworkBasename,
     initNodes,
     loadNetwork,
+    modelCall,
     saveNetwork,
 )
-from model import agentIterate, degrootIterate
+from model import (
+    ENSEMBLE_DISTS,
+    BoundedConfidence,
+    Ensemble,
+    InterventionSearch,
+    OutOfCoreDegroot,
+    SemanticDriftMonitor,
+    agentIterate,
+    buildCsr,
+    degrootIterate,
+    edgeListChunks,
+    ensembleDesign,
+    fjEquilibrium,
+    fjIterate,
+    influenceReport,
+    networkChunks,
+    saveEnsemble,
+    saveIntervention,
+    validateIntervention,
+)
 
 
 def parseArgs():
@@ -62,9 +85,128 @@ def parseArgs():
     )
     parser.add_argument(
         "--model",
-        choices=["agent", "degroot"],
+        choices=["agent", "degroot", "fj", "bc", "ensemble"],
         default="agent",
-        help="Iteration model: agent (LLM) or degroot (default: agent).",
+        help="Iteration model: agent (LLM), degroot, fj (Friedkin-Johnsen, DeGroot anchored to initial "
+        "opinions), bc (bounded confidence) or ensemble (many noisy/stubborn DeGroot replicas at once) "
+        "(default: agent).",
+    )
+    parser.add_argument(
+        "--bc-variant",
+        choices=["hk", "deffuant"],
+        default="hk",
+        help="BC model: hk (Hegselmann-Krause, synchronous averaging) or deffuant (random pairwise meetings) "
+        "(default: hk).",
+    )
+    parser.add_argument(
+        "--epsilon",
+        type=float,
+        default=0.2,
+        help="BC model: confidence bound; neighbors further apart than this are ignored (default: 0.2).",
+    )
+    parser.add_argument(
+        "--mu",
+        type=float,
+        default=0.5,
+        help="BC model (deffuant): fraction of the gap a meeting pair closes (default: 0.5).",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="BC (deffuant) and ensemble models: random seed.",
+    )
+    parser.add_argument(
+        "--replicas",
+        type=int,
+        default=100,
+        metavar="R",
+        help="Ensemble model: replicas per (distribution, noise, stubbornness) cell (default: 100).",
+    )
+    parser.add_argument(
+        "--ensemble-dists",
+        type=str,
+        default=",".join(ENSEMBLE_DISTS),
+        metavar="DISTS",
+        help="Ensemble model: comma-separated initial score distributions (default: normal, skew_right_1/2/3, polarized).",
+    )
+    parser.add_argument(
+        "--noise",
+        type=str,
+        default="0",
+        metavar="SIGMAS",
+        help="Ensemble model: comma-separated per-step Gaussian noise levels (default: 0).",
+    )
+    parser.add_argument(
+        "--stubbornness",
+        type=str,
+        default="0",
+        metavar="S",
+        help="Ensemble model: comma-separated pulls toward each replica's initial scores, 0 = DeGroot (default: 0).",
+    )
+    parser.add_argument(
+        "--equilibrium",
+        action="store_true",
+        help="FJ model: solve for the long-run state directly (sparse linear solve) instead of iterating; "
+        "writes networks/{name}_fj_equilibrium/.",
+    )
+    parser.add_argument(
+        "--out-of-core",
+        action="store_true",
+        help="DeGroot model: iterate a memory-mapped CSR on disk (networks/{name}_csr/) in row blocks, keeping only "
+        "the score vectors in RAM; writes .npy snapshots to networks/{name}_degroot_ooc/.",
+    )
+    parser.add_argument(
+        "--edge-list",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Out-of-core: (re)build networks/{name}_csr/ from this edge list (.npy array of shape (E, 2|3) or text "
+        "lines 'i j [w]', i listens to j) with initial scores drawn from --score-dist (default: reuse the CSR, "
+        "or build it from networks/{name}.json).",
+    )
+    parser.add_argument(
+        "--block-edges",
+        type=int,
+        default=None,
+        metavar="E",
+        help="Out-of-core: links per row block read into memory at once (default: 8388608).",
+    )
+    parser.add_argument(
+        "--snapshot-every",
+        type=int,
+        default=1,
+        metavar="K",
+        help="Out-of-core: save a score snapshot every K iterations; the last one is always saved (default: 1).",
+    )
+    parser.add_argument(
+        "--influence-report",
+        action="store_true",
+        help="DeGroot model: compute each node's exact weight in the long-run opinions and the sensitivity of the "
+        "mean outcome to every link weight (sparse solves, no iteration); writes networks/{name}_degroot_influence/.",
+    )
+    parser.add_argument(
+        "--intervene",
+        type=int,
+        default=None,
+        metavar="K",
+        help="DeGroot / FJ model: rank the K nodes that, held stubborn at --intervene-target, shift the mean opinion "
+        "after --iters steps most (lazy-greedy over batched propagation); writes networks/{name}_{model}_intervention/.",
+    )
+    parser.add_argument(
+        "--intervene-target",
+        type=float,
+        default=1.0,
+        metavar="X",
+        help="Intervention: opinion the seeds are held at, 0 = remote, 1 = office (default: 1).",
+    )
+    parser.add_argument(
+        "--validate-iters",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Intervention: check the picked seeds with N-iteration agent runs with and without them "
+        "(uses the agent model options; default: 0, no validation).",
     )
     parser.add_argument(
         "--iters",
@@ -73,11 +215,177 @@ def parseArgs():
         metavar="N",
         help="Number of iterations (required when running).",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        metavar="K",
+        help="Agent model: nodes packed into one LLM request, capped by the model's context budget (default: 1).",
+    )
+    parser.add_argument(
+        "--batch-executor",
+        choices=["mock", "ollama", "openai"],
+        default=None,
+        help="Agent model: write each iteration's prompts to a batch-API JSONL file and run it offline "
+        "with this executor instead of interactive requests.",
+    )
+    parser.add_argument(
+        "--no-structured-output",
+        action="store_true",
+        help="Agent model: disable JSON-mode / schema requests and rely on free-text parsing only.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Agent model: stream LLM replies and stop generation once a complete JSON reply has arrived.",
+    )
+    parser.add_argument(
+        "--max-response-tokens",
+        type=int,
+        default=None,
+        metavar="T",
+        help="Agent model: token cap for streamed single-node replies, sent as max_tokens / num_predict (default: 1024).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Agent model: LLM requests in flight at once; nodes then update from the pre-iteration state. "
+        "Out-of-core DeGroot: worker processes sharing the row blocks of each step (default: 1).",
+    )
+    parser.add_argument(
+        "--ollama-hosts",
+        type=str,
+        default=None,
+        metavar="URLS",
+        help="Comma-separated Ollama endpoints to load-balance over (default: OLLAMA_HOSTS or http://localhost:11434).",
+    )
+    parser.add_argument(
+        "--ollama-max-concurrent",
+        type=int,
+        default=None,
+        metavar="K",
+        help="Requests in flight per Ollama endpoint (default: 2).",
+    )
+    parser.add_argument(
+        "--semantic-drift",
+        action="store_true",
+        help="Agent model: embed every iteration's prompts and log semantic displacement, score/stance gap "
+        "and dispersion to telemetry.jsonl.",
+    )
+    parser.add_argument(
+        "--semantic-embedder",
+        choices=["sbert", "hashing"],
+        default=os.environ.get("SEMANTIC_EMBEDDER", "sbert"),
+        help="Agent model: embedder for --semantic-drift (default: SEMANTIC_EMBEDDER or sbert).",
+    )
+    parser.add_argument(
+        "--semantic-patience",
+        type=int,
+        default=0,
+        metavar="P",
+        help="Agent model: with --semantic-drift, stop after P consecutive iterations whose mean semantic "
+        "displacement stays below --semantic-stall-tol (default: 0, never stop).",
+    )
+    parser.add_argument(
+        "--semantic-stall-tol",
+        type=float,
+        default=0.01,
+        metavar="D",
+        help="Agent model: mean embedding displacement below which an iteration counts as stalled (default: 0.01).",
+    )
     return parser.parse_args()
 
 
+def runEnsemble(args, network: dict) -> None:
+    """Monte Carlo ensemble over the base network's topology -> networks/{name}_ensemble/."""
+    dists = [d.strip() for d in args.ensemble_dists.split(",") if d.strip()]
+    unknown = [d for d in dists if d not in SCORE_DIST_SUFFIX]
+    if unknown:
+        print(f"Error: unknown --ensemble-dists: {', '.join(unknown)}.")
+        sys.exit(1)
+    noise = [float(v) for v in args.noise.split(",")]
+    stubbornness = [float(v) for v in args.stubbornness.split(",")]
+    initial, design = ensembleDesign(len(network["nodes"]), dists, args.replicas, noise, stubbornness, args.seed)
+    ensemble = Ensemble(
+        network,
+        initial,
+        noise=[p["noise"] for p in design],
+        stubbornness=[p["stubbornness"] for p in design],
+        seed=args.seed,
+    )
+    history = ensemble.run(args.iters)
+    outDir = f"{args.name}_ensemble"
+    summary = saveEnsemble(outDir, ensemble, history, design)
+    for row in summary:
+        print(
+            f"{row['dist']:>4} noise={row['noise']:g} stubbornness={row['stubbornness']:g}: "
+            f"mean={row['meanAvg']:.4f}±{row['meanSd']:.4f} std={row['stdAvg']:.4f} minority={row['minorityAvg']:.4f}"
+        )
+    print(f"Completed {args.iters} iterations x {len(design)} replicas. Ensemble: networks/{outDir}/")
+
+
+def runIntervention(args, network: dict) -> None:
+    """Lazy-greedy stubborn-seed search on the DeGroot / FJ model -> networks/{name}_{model}_intervention/."""
+    search = InterventionSearch(network, args.model, args.intervene_target, args.iters)
+    ranking = search.greedy(args.intervene)
+    validation = None
+    if args.validate_iters > 0:
+        validation = validateIntervention(
+            network,
+            [entry["id"] for entry in ranking],
+            args.intervene_target,
+            args.validate_iters,
+            batchSize=args.batch_size,
+            executor=args.batch_executor,
+            workers=args.workers,
+        )
+    outDir = f"{args.name}_{args.model}_intervention"
+    report = saveIntervention(outDir, search, ranking, validation)
+    print(f"Baseline mean opinion after {args.iters} steps: {report['baselineMean']:.6f}")
+    for entry in ranking:
+        print(
+            f"#{entry['rank']} node {entry['id']} (x0={entry['initialOpinion']:.3f}): "
+            f"+{entry['marginalShift']:.6f} -> cumulative {entry['cumulativeShift']:.6f}"
+        )
+    print(f"{report['evaluations']} seed sets evaluated (plain greedy: {report['plainGreedyEvaluations']}).")
+    if validation is not None:
+        print(f"Agent validation over {args.validate_iters} iterations: shift {validation['agentShift']:+.6f}")
+    print(f"Ranking: networks/{outDir}/ranking.json")
+
+
+def runOutOfCore(args) -> None:
+    """Out-of-core DeGroot over networks/{name}_csr/ (built first if needed) -> networks/{name}_degroot_ooc/."""
+    csrName = f"{args.name}_csr"
+    csrDir = Path(__file__).resolve().parent / "networks" / csrName
+    if args.edge_list:
+        meta = buildCsr(edgeListChunks(args.edge_list), csrName, scoreDist=args.score_dist, seed=args.seed)
+        print(f"Built CSR from {args.edge_list}: {meta['nodes']} nodes, {meta['edges']} links -> networks/{csrName}/")
+    elif not (csrDir / "meta.json").exists():
+        network = loadNetwork(args.name)
+        meta = buildCsr(networkChunks(network), csrName, [n["opinionScore"] for n in network["nodes"]])
+        del network
+        print(f"Built CSR from networks/{args.name}.json: {meta['nodes']} nodes, {meta['edges']} links")
+    outDir = f"{args.name}_degroot_ooc"
+    engine = OutOfCoreDegroot(csrDir, workers=args.workers, **({"blockEdges": args.block_edges} if args.block_edges else {}))
+    try:
+        maxDiff = engine.run(args.iters, outDir, args.snapshot_every)
+    finally:
+        engine.close()
+    print(f"Completed {args.iters} iterations over {len(engine.blocks)} row blocks, last maxDiff={maxDiff:.6f}. "
+          f"Snapshots: networks/{outDir}/")
+
+
 def main():
     args = parseArgs()
+    modelCall.STRUCTURED_OUTPUT = not args.no_structured_output
+    modelCall.STREAM_RESPONSES = args.stream
+    if args.max_response_tokens:
+        modelCall.MAX_RESPONSE_TOKENS = args.max_response_tokens
+    if args.ollama_hosts:
+        modelCall.OLLAMA_HOSTS = [h.strip() for h in args.ollama_hosts.split(",") if h.strip()]
+    if args.ollama_max_concurrent:
+        modelCall.OLLAMA_MAX_CONCURRENT = args.ollama_max_concurrent
 
     if args.generate:
         network = generateNetwork(
@@ -94,14 +402,75 @@ def main():
     if not args.name:
         print("Error: --name (-n) required. Specify network from networks/.")
         sys.exit(1)
+    if args.equilibrium:
+        if args.model != "fj":
+            print("Error: --equilibrium is only available with --model fj.")
+            sys.exit(1)
+        network = loadNetwork(args.name)
+        outDir = f"{args.name}_fj_equilibrium"
+        saveNetwork(network, f"{outDir}/iter0")
+        network = fjEquilibrium(network, f"{outDir}/equilibrium")
+        print(f"Solved FJ equilibrium for {len(network['nodes'])} nodes -> networks/{outDir}/equilibrium.json")
+        return
+    if args.influence_report:
+        if args.model != "degroot":
+            print("Error: --influence-report is only available with --model degroot.")
+            sys.exit(1)
+        outDir = f"{args.name}_degroot_influence"
+        report = influenceReport(loadNetwork(args.name), f"{outDir}/report")
+        print(
+            f"Predicted mean opinion {report['predictedMean']:.6f} ({report['closedClasses']} closed classes, "
+            f"{report['transientNodes']} transient nodes)."
+        )
+        print("Most influential nodes: " + ", ".join(f"{n['id']} ({n['influence']:.4f})" for n in report["influence"][:5]))
+        print(
+            "Most sensitive links: "
+            + ", ".join(f"{e['node']}<-{e['neighbor']} ({e['sensitivity']:+.2e})" for e in report["linkSensitivity"][:5])
+        )
+        print(f"Report: networks/{outDir}/report.json")
+        return
     if args.iters is None:
         print("Error: --iters required when running. Specify number of iterations.")
         sys.exit(1)
+    if args.out_of_core:
+        if args.model != "degroot":
+            print("Error: --out-of-core is only available with --model degroot.")
+            sys.exit(1)
+        runOutOfCore(args)
+        return
 
     network = loadNetwork(args.name)
-    iterateFn = agentIterate if args.model == "agent" else degrootIterate
+    if args.intervene:
+        if args.model not in ("degroot", "fj"):
+            print("Error: --intervene is only available with --model degroot or fj.")
+            sys.exit(1)
+        runIntervention(args, network)
+        return
+    if args.model == "ensemble":
+        runEnsemble(args, network)
+        return
+    semantic = None
+    if args.model == "agent" and args.semantic_drift:
+        semantic = SemanticDriftMonitor(args.semantic_embedder, args.semantic_stall_tol, args.semantic_patience)
+        semantic.observe(network["nodes"])
+    if args.model == "agent":
+        iterateFn = partial(
+            agentIterate,
+            batchSize=args.batch_size,
+            executor=args.batch_executor,
+            workers=args.workers,
+            semantic=semantic,
+        )
+    elif args.model == "fj":
+        iterateFn = fjIterate
+    elif args.model == "bc":
+        engine = BoundedConfidence(network, args.bc_variant, args.epsilon, args.mu, args.seed)
+        iterateFn = engine.iterate
+    else:
+        iterateFn = degrootIterate
     slicesDir = f"{args.name}_{args.model}_slices"
     slicesPath = Path(__file__).resolve().parent / "networks" / slicesDir
+    telemetryPath = slicesPath / "telemetry.jsonl"
 
     def maxOpinionChange(prevScores, net):
         return max(
@@ -109,14 +478,45 @@ def main():
             default=0.0,
         )
 
+    def appendTelemetry(record):
+        with telemetryPath.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
     try:
         saveNetwork(network, f"{slicesDir}/iter0")
+        telemetryPath.unlink(missing_ok=True)
+        completed = 0
         for i in range(1, args.iters + 1):
             prevScores = {n["id"]: n["opinionScore"] for n in network["nodes"]}
+            modelCall.resetParseStats()
             network = iterateFn(network, f"{slicesDir}/iter{i}")
             maxDiff = maxOpinionChange(prevScores, network)
-            print(f"iter{i}: maxDiff={maxDiff:.6f}")
-        print(f"Completed {args.iters} iterations, model={args.model}. Slices: networks/{slicesDir}/")
+            record = {"iter": i, "maxDiff": round(maxDiff, 6)}
+            if args.model == "agent":
+                record.update(modelCall.resetParseStats())
+                print(
+                    f"iter{i}: maxDiff={maxDiff:.6f} parseFailures={record['parseFailures']} "
+                    f"repaired={record['repaired']} fallbacks={record['fallbacks']}"
+                )
+            else:
+                print(f"iter{i}: maxDiff={maxDiff:.6f}")
+            if semantic is not None:
+                record.update(semantic.metrics)
+                print(
+                    f"  semantic: displacement={semantic.metrics.get('semanticDisplacementMean')} "
+                    f"dispersion={semantic.metrics['semanticDispersion']} gap={semantic.metrics['scoreStanceGap']}"
+                )
+            if args.model == "bc":
+                record["frozen"] = engine.frozen
+            appendTelemetry(record)
+            completed = i
+            if semantic is not None and semantic.shouldStop:
+                print(f"Stopped early: semantic drift stalled for {semantic.stalledIterations} iterations.")
+                break
+            if args.model == "bc" and engine.frozen:
+                print(f"Stopped early: opinions froze (no neighbors within epsilon={args.epsilon} disagree).")
+                break
+        print(f"Completed {completed} iterations, model={args.model}. Slices: networks/{slicesDir}/")
     except Exception:
         if slicesPath.exists():
             shutil.rmtree(slicesPath)
@@ -0,0 +1,206 @@
+"""Offline batch execution: write prompts as a provider batch-API JSONL file, run it with a pluggable executor, read results."""
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from . import modelCall
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+OPENAI_API = "https://api.openai.com/v1"
+BATCH_POLL_SECONDS = 30
+BATCH_COMPLETION_WINDOW = "24h"
+
+_CURRENT_STATE = re.compile(r'Your current opinion \(score ([0-9.]+)\): "(.*?)"\n\n', re.DOTALL)
+
+
+def _resultsPath(requestsPath: Path) -> Path:
+    return requestsPath.with_name(requestsPath.name.replace(".requests.jsonl", ".results.jsonl"))
+
+
+def writeBatchRequests(prompts: dict[str, str], path: Path, model: str | None = None) -> Path:
+    """Write {custom_id: prompt} as OpenAI batch-API request lines. Stale results of a different request file are removed."""
+    model = model or modelCall.OPENAI_MODELS[0]
+    lines = []
+    for customId, prompt in prompts.items():
+        line = {
+            "custom_id": customId,
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {"model": model, "messages": [{"role": "user", "content": prompt}]},
+        }
+        lines.append(json.dumps(line, ensure_ascii=False) + "\n")
+    text = "".join(lines)
+    if path.exists() and path.read_text(encoding="utf-8") == text:
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    _resultsPath(path).unlink(missing_ok=True)
+    return path
+
+
+def _readJsonl(path: Path) -> list[dict]:
+    with path.open("r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _resultLine(customId: str, content: str | None, error: str | None = None) -> dict:
+    """One output line in the batch-API result format."""
+    if content is None:
+        return {"custom_id": customId, "response": None, "error": {"message": error or "no content"}}
+    body = {"choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]}
+    return {"custom_id": customId, "response": {"status_code": 200, "body": body}, "error": None}
+
+
+def _writeJsonl(lines: list[dict], path: Path) -> Path:
+    with path.open("w", encoding="utf-8") as f:
+        for line in lines:
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+    return path
+
+
+def readBatchResults(path: Path) -> dict[str, str]:
+    """Read a batch-API result file. Returns {custom_id: content} for successful lines only."""
+    results: dict[str, str] = {}
+    for line in _readJsonl(path):
+        response = line.get("response") or {}
+        if response.get("status_code") != 200:
+            continue
+        choices = (response.get("body") or {}).get("choices") or [{}]
+        content = (choices[0].get("message") or {}).get("content")
+        if content and str(content).strip():
+            results[str(line.get("custom_id"))] = str(content).strip()
+    return results
+
+
+def runMockBatch(requestsPath: Path, resultsPath: Path) -> Path:
+    """Mock executor: each node reaffirms its current score and prompt. No network access."""
+    lines = []
+    for req in _readJsonl(requestsPath):
+        prompt = req["body"]["messages"][-1]["content"]
+        match = _CURRENT_STATE.search(prompt)
+        if match is None:
+            lines.append(_resultLine(req["custom_id"], None, "mock: current state not found in prompt"))
+            continue
+        reply = {"opinionScore": float(match.group(1)), "prompt": match.group(2)}
+        lines.append(_resultLine(req["custom_id"], json.dumps(reply, ensure_ascii=False)))
+    return _writeJsonl(lines, resultsPath)
+
+
+def runOllamaBatch(requestsPath: Path, resultsPath: Path) -> Path:
+    """Local executor: run every request line through the Ollama endpoint pool (with retries), as many at once as it admits."""
+    reqs = _readJsonl(requestsPath)
+
+    def run(req: dict) -> dict:
+        prompt = req["body"]["messages"][-1]["content"]
+        try:
+            content = modelCall._call_with_retry(modelCall._call_ollama, prompt, "Ollama")
+            return _resultLine(req["custom_id"], content)
+        except Exception as e:
+            return _resultLine(req["custom_id"], None, str(e))
+
+    with ThreadPoolExecutor(max_workers=modelCall.ollamaPool().capacity) as pool:
+        lines = list(pool.map(run, reqs))
+    return _writeJsonl(lines, resultsPath)
+
+
+def runOpenAIBatch(requestsPath: Path, resultsPath: Path) -> Path:
+    """Provider executor: upload to the OpenAI Batch API, poll until done, download the output file."""
+    api_key = modelCall._load_api_key()
+    if not api_key:
+        raise ValueError("OpenAI API key not found. Put it in api_key.txt or set OPENAI_API_KEY.")
+    headers = {"Authorization": f"Bearer {api_key}"}
+    with requestsPath.open("rb") as f:
+        response = requests.post(
+            f"{OPENAI_API}/files", headers=headers, data={"purpose": "batch"}, files={"file": f}, timeout=300
+        )
+    if response.status_code != 200:
+        raise Exception(f"OpenAI file upload HTTP {response.status_code}: {response.text[:200]}")
+    fileId = response.json()["id"]
+    response = requests.post(
+        f"{OPENAI_API}/batches",
+        headers=headers,
+        json={"input_file_id": fileId, "endpoint": BATCH_ENDPOINT, "completion_window": BATCH_COMPLETION_WINDOW},
+        timeout=60,
+    )
+    if response.status_code != 200:
+        raise Exception(f"OpenAI batch create HTTP {response.status_code}: {response.text[:200]}")
+    batch = response.json()
+    print(f"[batchCall] submitted OpenAI batch {batch['id']} ({requestsPath.name})")
+    while batch.get("status") not in ("completed", "failed", "expired", "cancelled"):
+        time.sleep(BATCH_POLL_SECONDS)
+        response = requests.get(f"{OPENAI_API}/batches/{batch['id']}", headers=headers, timeout=60)
+        if response.status_code == 200:
+            batch = response.json()
+    if batch.get("status") != "completed" and not batch.get("output_file_id"):
+        raise Exception(f"OpenAI batch {batch['id']} ended with status {batch.get('status')}")
+    text = ""
+    for key in ("output_file_id", "error_file_id"):
+        if batch.get(key):
+            response = requests.get(f"{OPENAI_API}/files/{batch[key]}/content", headers=headers, timeout=300)
+            if response.status_code != 200:
+                raise Exception(f"OpenAI file download HTTP {response.status_code}: {response.text[:200]}")
+            text += response.text if response.text.endswith("\n") else response.text + "\n"
+    resultsPath.write_text(text, encoding="utf-8")
+    return resultsPath
+
+
+EXECUTORS = {"mock": runMockBatch, "ollama": runOllamaBatch, "openai": runOpenAIBatch}
+
+
+def executeBatch(requestsPath: Path, executor: str) -> dict[str, str]:
+    """Run a request file with the named executor and return {custom_id: content}.
+
+    An existing result file is reused, so an interrupted run resumes without resubmitting: only requests it has no
+    successful line for are written to a retry request file, run, and merged back into the result file.
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown batch executor: {executor}. Choose from {', '.join(EXECUTORS)}.")
+    resultsPath = _resultsPath(requestsPath)
+    if not resultsPath.exists():
+        EXECUTORS[executor](requestsPath, resultsPath)
+        return readBatchResults(resultsPath)
+    results = readBatchResults(resultsPath)
+    missing = [req for req in _readJsonl(requestsPath) if str(req["custom_id"]) not in results]
+    if not missing:
+        print(f"[batchCall] reusing {resultsPath.name}")
+        return results
+    print(f"[batchCall] resubmitting {len(missing)} unanswered request(s) of {requestsPath.name}")
+    retryPath = requestsPath.with_name(requestsPath.name.replace(".requests.jsonl", ".retry.requests.jsonl"))
+    retryResultsPath = _resultsPath(retryPath)
+    _writeJsonl(missing, retryPath)
+    EXECUTORS[executor](retryPath, retryResultsPath)
+    answered = [line for line in _readJsonl(resultsPath) if str(line.get("custom_id")) in results]
+    _writeJsonl(answered + _readJsonl(retryResultsPath), resultsPath)
+    retryPath.unlink()
+    retryResultsPath.unlink()
+    return readBatchResults(resultsPath)
+
+
+def runUpdateBatch(argsById: dict[str, dict], requestsPath: Path, executor: str) -> dict[str, tuple[float, str]]:
+    """Offline node updates: {node_id: updateNodeOpinion kwargs} -> {node_id: (score, prompt)}.
+
+    Nodes without a usable result keep their current score and prompt. Replies are parsed without live repair
+    requests, so offline executors never touch the network; missing and unparsable results both count as
+    parseFailures and fallbacks in the parse telemetry.
+    """
+    prompts = {f"node-{nid}": modelCall.buildUpdatePrompt(**kwargs) for nid, kwargs in argsById.items()}
+    writeBatchRequests(prompts, requestsPath)
+    contents = executeBatch(requestsPath, executor)
+    updates: dict[str, tuple[float, str]] = {}
+    missing = 0
+    for nid, kwargs in argsById.items():
+        raw = contents.get(f"node-{nid}")
+        if raw is None:
+            missing += 1
+            updates[nid] = (kwargs["current_score"], kwargs["current_prompt"])
+            continue
+        updates[nid] = modelCall._parseUpdateResponse(raw, kwargs["current_score"], kwargs["current_prompt"], repair=False)
+    if missing:
+        modelCall._countParse("parseFailures", missing)
+        modelCall._countParse("fallbacks", missing)
+        print(f"[batchCall] {missing}/{len(argsById)} request(s) in {requestsPath.name} returned no result; kept current state")
+    return updates
@@ -1,16 +1,66 @@
 """LLM API: persona and opinion generation. OpenAI first, Ollama fallback. Retries on failure."""
 import json
+import math
 import os
 import random
 import requests
+import threading
 import time
+from functools import partial
 from pathlib import Path
 
+from .ollamaPool import OllamaPool
+
 MAX_RETRIES = 5
 TOPIC = "Remote Work v.s. Return-to-Office"  # work-from-home vs work-from-office
 OLLAMA_MODEL = "qwen3:4b"
+# Ollama servers to balance over (comma-separated OLLAMA_HOSTS overrides), and in-flight requests allowed per server
+OLLAMA_HOSTS = [h.strip() for h in os.environ.get("OLLAMA_HOSTS", "http://localhost:11434").split(",") if h.strip()]
+OLLAMA_MAX_CONCURRENT = 2
 # Try in order; on context_length_exceeded or rate limit, switch to next. gpt-4o-mini: 128K context, cheaper.
 OPENAI_MODELS = ["gpt-3.5-turbo", "gpt-4o-mini", "gpt-4o"]
+# Context windows (tokens) used to size batched update requests. Ollama's default num_ctx is 4096.
+MODEL_CONTEXT_TOKENS = {"gpt-3.5-turbo": 16385, "gpt-4o-mini": 128000, "gpt-4o": 128000, OLLAMA_MODEL: 4096}
+CHARS_PER_TOKEN = 4  # rough estimate for English prompts
+BATCH_OUTPUT_TOKENS_PER_ITEM = 120  # reply budget per node: ~50-word prompt plus JSON keys
+MAX_BATCH_REDISPATCH = 2  # rounds of re-sending only the failed items of a batch
+# Structured output: JSON schema for OpenAI (json_object for models without schema support), format=json for Ollama
+STRUCTURED_OUTPUT = True
+OPENAI_SCHEMA_MODELS = {"gpt-4o-mini", "gpt-4o"}
+MAX_REPAIR_ATTEMPTS = 1  # re-asks that send only the malformed output back for fixing
+# Streaming: read tokens as they arrive, stop once a complete JSON reply is in; the server caps generated tokens
+STREAM_RESPONSES = False
+MAX_RESPONSE_TOKENS = 1024  # per single-node reply; batched replies get BATCH_OUTPUT_TOKENS_PER_ITEM per node
+
+UPDATE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "opinionScore": {"type": "number"},
+        "prompt": {"type": "string"},
+    },
+    "required": ["opinionScore", "prompt"],
+    "additionalProperties": False,
+}
+BATCH_UPDATE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "string"},
+                    "opinionScore": {"type": "number"},
+                    "prompt": {"type": "string"},
+                },
+                "required": ["id", "opinionScore", "prompt"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["results"],
+    "additionalProperties": False,
+}
 
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 _API_KEY_FILE = _PROJECT_ROOT / "api_key.txt"
@@ -51,7 +101,118 @@ def _is_switchable_error(status_code: int, text: str) -> bool:
     return "context_length" in text_lower or "maximum context" in text_lower or "token" in text_lower and "limit" in text_lower
 
 
-def _call_openai(prompt: str, model_index: int = 0) -> str:
+def _openai_response_format(model: str, schema: dict) -> dict:
+    """JSON schema response format where supported, plain JSON mode otherwise."""
+    if model in OPENAI_SCHEMA_MODELS:
+        return {"type": "json_schema", "json_schema": {"name": "opinion_update", "schema": schema, "strict": True}}
+    return {"type": "json_object"}
+
+
+class _JsonStreamWatcher:
+    """Incremental scanner that spots the first complete, valid top-level JSON value in streamed text.
+
+    Skips a leading <think>...</think> block and tracks string/escape state so braces inside strings are ignored.
+    """
+
+    def __init__(self) -> None:
+        self.text = ""
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._inString = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> str | None:
+        """Append chunk; return the JSON text once a complete value has arrived."""
+        self.text += chunk
+        while self._pos < len(self.text):
+            ch = self.text[self._pos]
+            if self._depth == 0:
+                rest = self.text[self._pos:self._pos + 7]
+                if rest == "<think>":
+                    end = self.text.find("</think>", self._pos)
+                    if end == -1:
+                        return None
+                    self._pos = end + len("</think>")
+                    continue
+                if "<think>".startswith(rest) and len(rest) < 7:
+                    return None  # possibly a tag split across chunks
+                if ch in "{[":
+                    self._start, self._depth = self._pos, 1
+                self._pos += 1
+                continue
+            if self._inString:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._inString = False
+            elif ch == '"':
+                self._inString = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    candidate = self.text[self._start:self._pos + 1]
+                    try:
+                        json.loads(candidate)
+                        return candidate
+                    except json.JSONDecodeError:
+                        self._pos = self._start  # not a JSON value after all; rescan past its opening bracket
+            self._pos += 1
+        return None
+
+
+def _read_stream(lines, extract, expectJson: bool, maxTokens: int) -> str:
+    """Accumulate streamed content chunks; stop at the first complete JSON value (if expected) or the end of the
+    stream. The token cap is enforced by the server (max_tokens / num_predict), which ends the stream with the
+    finish reason "length" when the reply reaches it."""
+    watcher = _JsonStreamWatcher()
+    for line in lines:
+        piece, finish = extract(line)
+        if piece:
+            complete = watcher.feed(piece)
+            if expectJson and complete is not None:
+                return complete
+        if finish is not None:
+            if finish == "length":
+                print(f"[modelCall] reply hit the {maxTokens}-token cap")
+            break
+    return watcher.text
+
+
+def _openai_stream_piece(line: bytes) -> tuple[str, str | None]:
+    """Delta content of one SSE line and the finish reason once the stream ends ("done" at [DONE])."""
+    text = line.decode("utf-8").strip()
+    if not text.startswith("data:"):
+        return "", None
+    data = text[len("data:"):].strip()
+    if data == "[DONE]":
+        return "", "done"
+    choice = (json.loads(data).get("choices") or [{}])[0]
+    return (choice.get("delta") or {}).get("content") or "", choice.get("finish_reason")
+
+
+def _ollama_stream_piece(line: bytes) -> tuple[str, str | None]:
+    """Message content of one NDJSON line and, once Ollama reports done, its done_reason."""
+    if not line.strip():
+        return "", None
+    chunk = json.loads(line)
+    if chunk.get("error"):
+        raise Exception(f"Ollama stream error: {chunk['error']}")
+    content = (chunk.get("message") or {}).get("content") or ""
+    return content, (chunk.get("done_reason") or "stop") if chunk.get("done") else None
+
+
+def _call_openai(
+    prompt: str,
+    model_index: int = 0,
+    schema: dict | None = None,
+    expectJson: bool = False,
+    maxTokens: int | None = None,
+) -> str:
     """Call OpenAI API. On context/rate limit, retry with next model. Raises on failure."""
     api_key = _load_api_key()
     if not api_key:
@@ -65,7 +226,20 @@ def _call_openai(prompt: str, model_index: int = 0) -> str:
             "model": model,
             "messages": [{"role": "user", "content": prompt}],
         }
-        response = requests.post(url, json=payload, headers=headers, timeout=60)
+        if schema is not None:
+            payload["response_format"] = _openai_response_format(model, schema)
+        if STREAM_RESPONSES:
+            payload["stream"] = True
+            payload["max_tokens"] = maxTokens or MAX_RESPONSE_TOKENS
+        response = requests.post(url, json=payload, headers=headers, timeout=60, stream=STREAM_RESPONSES)
+        if response.status_code == 200 and STREAM_RESPONSES:
+            with response:
+                content = _read_stream(
+                    response.iter_lines(), _openai_stream_piece, expectJson, maxTokens or MAX_RESPONSE_TOKENS
+                )
+            if not content.strip():
+                raise ValueError("OpenAI returned empty content")
+            return content.strip()
         if response.status_code == 200:
             result = response.json()
             content = result.get("choices", [{}])[0].get("message", {}).get("content")
@@ -80,18 +254,35 @@ def _call_openai(prompt: str, model_index: int = 0) -> str:
     raise last_error
 
 
-def _call_ollama(prompt: str, model: str = OLLAMA_MODEL) -> str:
-    """Call Ollama local API."""
-    url = "http://localhost:11434/api/chat"
+def _call_ollama(
+    prompt: str,
+    model: str = OLLAMA_MODEL,
+    schema: dict | None = None,
+    expectJson: bool = False,
+    maxTokens: int | None = None,
+) -> str:
+    """Call Ollama via the endpoint pool. A schema switches on JSON output (format=json)."""
     payload = {
         "model": model,
         "messages": [{"role": "user", "content": prompt}],
-        "stream": False,
+        "stream": STREAM_RESPONSES,
     }
-    response = requests.post(url, json=payload, timeout=120)
-    if response.status_code != 200:
-        raise Exception(f"Ollama HTTP {response.status_code}: {response.text[:200]}")
-    result = response.json()
+    if schema is not None:
+        payload["format"] = "json"
+    if STREAM_RESPONSES:
+        payload["options"] = {"num_predict": maxTokens or MAX_RESPONSE_TOKENS}
+    with ollamaPool().acquire(model) as base:
+        response = requests.post(f"{base}/api/chat", json=payload, timeout=120, stream=STREAM_RESPONSES)
+        if response.status_code != 200:
+            raise Exception(f"Ollama HTTP {response.status_code} from {base}: {response.text[:200]}")
+        if STREAM_RESPONSES:
+            # Closing the response drops the connection, which makes Ollama stop generating
+            with response:
+                content = _read_stream(
+                    response.iter_lines(), _ollama_stream_piece, expectJson, maxTokens or MAX_RESPONSE_TOKENS
+                )
+            return content.strip()
+        result = response.json()
     content = result.get("message", {}).get("content")
     if content is None:
         raise ValueError("Ollama response missing content")
@@ -99,6 +290,17 @@ def _call_ollama(prompt: str, model: str = OLLAMA_MODEL) -> str:
 
 
 _FALLBACK_PRINTED = False
+_OLLAMA_POOL: OllamaPool | None = None
+_OLLAMA_POOL_LOCK = threading.Lock()
+
+
+def ollamaPool() -> OllamaPool:
+    """Shared endpoint pool, built from OLLAMA_HOSTS / OLLAMA_MAX_CONCURRENT on first use."""
+    global _OLLAMA_POOL
+    with _OLLAMA_POOL_LOCK:
+        if _OLLAMA_POOL is None:
+            _OLLAMA_POOL = OllamaPool(OLLAMA_HOSTS, OLLAMA_MAX_CONCURRENT)
+        return _OLLAMA_POOL
 
 
 def _call_with_retry(call_fn, prompt: str, name: str) -> str:
@@ -116,19 +318,45 @@ def _call_with_retry(call_fn, prompt: str, name: str) -> str:
     raise last_error
 
 
-def _call_llm(prompt: str) -> str:
-    """Call LLM: OpenAI first, Ollama fallback. Both retry on failure."""
+def _call_llm(prompt: str, schema: dict | None = None, maxTokens: int | None = None) -> str:
+    """Call LLM: OpenAI first, Ollama fallback. Both retry on failure.
+
+    schema marks a JSON reply (requested as structured output unless disabled); maxTokens caps streamed replies.
+    """
     global _FALLBACK_PRINTED
+    expectJson = schema is not None
+    if not STRUCTURED_OUTPUT:
+        schema = None
+    call_openai = partial(_call_openai, schema=schema, expectJson=expectJson, maxTokens=maxTokens)
+    call_ollama = partial(_call_ollama, schema=schema, expectJson=expectJson, maxTokens=maxTokens)
     api_key = _load_api_key()
     if api_key:
         try:
-            return _call_with_retry(_call_openai, prompt, "OpenAI")
+            return _call_with_retry(call_openai, prompt, "OpenAI")
         except Exception as e:
             if not _FALLBACK_PRINTED:
                 print(f"[modelCall] OpenAI unavailable, falling back to Ollama: {e}")
                 _FALLBACK_PRINTED = True
-            return _call_with_retry(_call_ollama, prompt, "Ollama")
-    return _call_with_retry(_call_ollama, prompt, "Ollama")
+            return _call_with_retry(call_ollama, prompt, "Ollama")
+    return _call_with_retry(call_ollama, prompt, "Ollama")
+
+
+_PARSE_STATS_LOCK = threading.Lock()
+_PARSE_STATS = {"parseFailures": 0, "repaired": 0, "fallbacks": 0}
+
+
+def _countParse(key: str, n: int = 1) -> None:
+    with _PARSE_STATS_LOCK:
+        _PARSE_STATS[key] += n
+
+
+def resetParseStats() -> dict[str, int]:
+    """Return parse failure / repair / fallback counts since the last reset, and reset them."""
+    with _PARSE_STATS_LOCK:
+        stats = dict(_PARSE_STATS)
+        for key in _PARSE_STATS:
+            _PARSE_STATS[key] = 0
+    return stats
 
 
 def generatePersona(opinionScore: float | None = None) -> str:
@@ -154,14 +382,14 @@ def generateOpinionPrompt(opinionScore: float, persona: str, topic: str = TOPIC)
     return _call_llm(prompt)
 
 
-def updateNodeOpinion(
+def buildUpdatePrompt(
     persona: str,
     current_score: float,
     current_prompt: str,
     neighbor_info: list[tuple[str, float]],
     topic: str = TOPIC,
-) -> tuple[float, str]:
-    """Update opinion via LLM from persona, current state, and neighbor opinions. Returns (score, prompt)."""
+) -> str:
+    """Build the single-node update prompt from persona, current state, and neighbor opinions."""
     prompt = (
         f"Topic: {topic}. Scale 0 = strongly prefer remote work, 1 = strongly prefer office.\n\n"
         f"Your personality: {persona}\n\n"
@@ -184,25 +412,222 @@ def updateNodeOpinion(
             '  "prompt": string, first-person, at most 50 words\n'
             "Only output the JSON, no other text."
         )
+    return prompt
 
-    raw = _call_llm(prompt)
+
+def updateNodeOpinion(
+    persona: str,
+    current_score: float,
+    current_prompt: str,
+    neighbor_info: list[tuple[str, float]],
+    topic: str = TOPIC,
+) -> tuple[float, str]:
+    """Update opinion via LLM from persona, current state, and neighbor opinions. Returns (score, prompt)."""
+    prompt = buildUpdatePrompt(persona, current_score, current_prompt, neighbor_info, topic)
+    raw = _call_llm(prompt, schema=UPDATE_SCHEMA)
     score, promptText = _parseUpdateResponse(raw, current_score, current_prompt)
     return (score, promptText)
 
 
-def _parseUpdateResponse(raw: str, fallbackScore: float, fallbackPrompt: str) -> tuple[float, str]:
-    """Parse JSON from LLM response; return fallbacks on parse failure."""
+def _validUpdate(obj) -> tuple[float, str] | None:
+    """(score, prompt) if obj matches UPDATE_SCHEMA with a finite score and non-empty prompt."""
+    if not isinstance(obj, dict):
+        return None
+    try:
+        score = float(obj["opinionScore"])
+        promptText = str(obj["prompt"]).strip()
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not promptText or not math.isfinite(score):
+        return None
+    return (max(0.0, min(1.0, score)), promptText)
+
+
+def _tryParseUpdate(raw: str) -> tuple[float, str] | None:
+    """Parse an update reply: whole text, fenced block, last line, then any embedded JSON object."""
     raw = raw.strip()
     for s in (raw, raw.split("```")[0].strip(), raw.split("\n")[-1]):
         if not s:
             continue
         try:
-            obj = json.loads(s)
-            score = float(obj.get("opinionScore", fallbackScore))
-            promptText = str(obj.get("prompt", fallbackPrompt)).strip() or fallbackPrompt
-            score = max(0.0, min(1.0, score))
-            return (score, promptText)
-        except (json.JSONDecodeError, TypeError, ValueError):
+            parsed = _validUpdate(json.loads(s))
+        except json.JSONDecodeError:
             continue
+        if parsed is not None:
+            return parsed
+    for obj in _iterJsonObjects(raw):
+        parsed = _validUpdate(obj)
+        if parsed is not None:
+            return parsed
+    return None
+
+
+def _repairPrompt(raw: str) -> str:
+    """Re-ask that carries only the malformed output, not the original context."""
+    return (
+        "The text below was meant to be a JSON object with exactly two keys: "
+        '"opinionScore" (float between 0 and 1) and "prompt" (string, first-person opinion). '
+        "Rewrite it as that JSON object, keeping its meaning. Only output the JSON, no other text.\n\n"
+        f"{raw.strip()[:2000]}"
+    )
+
+
+def _parseUpdateResponse(raw: str, fallbackScore: float, fallbackPrompt: str, repair: bool = True) -> tuple[float, str]:
+    """Parse JSON from LLM response, re-asking for a repair up to MAX_REPAIR_ATTEMPTS times; fallbacks last.
+    repair=False (offline batch mode) never makes a live request: an unparsable reply falls back at once."""
+    parsed = _tryParseUpdate(raw)
+    if parsed is not None:
+        return parsed
+    _countParse("parseFailures")
+    for _ in range(MAX_REPAIR_ATTEMPTS if repair else 0):
+        try:
+            raw = _call_llm(_repairPrompt(raw), schema=UPDATE_SCHEMA)
+        except Exception as e:
+            print(f"[modelCall] repair request failed: {e}")
+            break
+        parsed = _tryParseUpdate(raw)
+        if parsed is not None:
+            _countParse("repaired")
+            return parsed
+    _countParse("fallbacks")
     return (fallbackScore, fallbackPrompt)
 
+
+def _estimateTokens(text: str) -> int:
+    """Rough token count for budget planning."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _contextBudget() -> int:
+    """Context window of the backend that will serve requests first."""
+    model = OPENAI_MODELS[0] if _load_api_key() else OLLAMA_MODEL
+    return MODEL_CONTEXT_TOKENS.get(model, 4096)
+
+
+def _batchItemContext(item: dict) -> str:
+    """Per-node block of a batched update prompt."""
+    text = (
+        f"### Node {item['id']}\n"
+        f"Personality: {item['persona']}\n"
+        f"Current opinion (score {item['current_score']:.3f}): \"{item['current_prompt']}\"\n"
+    )
+    if item["neighbor_info"]:
+        text += "Neighbors' opinions (weighted by connection strength):\n"
+        for nprompt, w in item["neighbor_info"]:
+            text += f"  - (weight {w:.3f}): \"{nprompt}\"\n"
+    else:
+        text += "No neighbors: reaffirm the current opinion and keep the same score.\n"
+    return text
+
+
+def _batchPreamble(topic: str) -> str:
+    """Shared instructions sent once per batched request."""
+    return (
+        f"Topic: {topic}. Scale 0 = strongly prefer remote work, 1 = strongly prefer office.\n\n"
+        "You are updating several people in a social network. For each node below, consider the person's "
+        "personality, current opinion and neighbors' opinions, and update that person's opinion.\n\n"
+    )
+
+
+def _batchInstructions(ids: list[str]) -> str:
+    """Output format instructions for a batched request."""
+    container = 'a JSON object {"results": [...]} whose array has' if STRUCTURED_OUTPUT else "a JSON array with"
+    return (
+        f"\nOutput {container} exactly one object per node ({len(ids)} objects, ids: {', '.join(ids)}). "
+        "Each object has exactly three keys:\n"
+        '  "id": string, the node id\n'
+        '  "opinionScore": float between 0 and 1\n'
+        '  "prompt": string, first-person, at most 50 words, describing the updated opinion\n'
+        "Only output the JSON, no other text."
+    )
+
+
+def planUpdateBatches(items: list[dict], maxBatchSize: int, topic: str = TOPIC) -> list[list[str]]:
+    """Group node ids into batches that fit the model's context budget (at most maxBatchSize each)."""
+    budget = _contextBudget() - _estimateTokens(_batchPreamble(topic)) - _estimateTokens(_batchInstructions([]))
+    batches: list[list[str]] = []
+    current: list[str] = []
+    used = 0
+    for item in items:
+        cost = _estimateTokens(_batchItemContext(item)) + BATCH_OUTPUT_TOKENS_PER_ITEM
+        if current and (len(current) >= maxBatchSize or used + cost > budget):
+            batches.append(current)
+            current, used = [], 0
+        current.append(item["id"])
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _iterJsonObjects(text: str):
+    """Yield every top-level JSON object embedded in text, skipping unparsable fragments."""
+    decoder = json.JSONDecoder()
+    pos = text.find("{")
+    while pos != -1:
+        try:
+            obj, end = decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            pos = text.find("{", pos + 1)
+            continue
+        if isinstance(obj, dict):
+            yield obj
+        pos = text.find("{", end)
+
+
+def _parseBatchUpdateResponse(raw: str, ids: list[str]) -> dict[str, tuple[float, str]]:
+    """Parse a batched reply item by item. Returns {id: (score, prompt)} for the items that parsed."""
+    wanted = set(ids)
+    objects: list = []
+    start, end = raw.find("["), raw.rfind("]")
+    if start != -1 and end > start:
+        try:
+            parsed = json.loads(raw[start:end + 1])
+            if isinstance(parsed, list):
+                objects = [o for o in parsed if isinstance(o, dict)]
+        except json.JSONDecodeError:
+            pass
+    if not objects:
+        objects = list(_iterJsonObjects(raw))
+    results: dict[str, tuple[float, str]] = {}
+    for obj in objects:
+        nid = str(obj.get("id", "")).strip()
+        if nid not in wanted or nid in results:
+            continue
+        parsed = _validUpdate(obj)
+        if parsed is not None:
+            results[nid] = parsed
+    return results
+
+
+def updateNodeOpinionsBatch(items: list[dict], topic: str = TOPIC) -> dict[str, tuple[float, str]]:
+    """Update several nodes in one LLM request. Failed items are re-sent alone; single-node calls as last resort.
+
+    Each item has keys id, persona, current_score, current_prompt, neighbor_info (as in updateNodeOpinion).
+    Returns {id: (score, prompt)} for every item.
+    """
+    byId = {item["id"]: item for item in items}
+    pending = [item["id"] for item in items]
+    results: dict[str, tuple[float, str]] = {}
+    for attempt in range(MAX_BATCH_REDISPATCH + 1):
+        if len(pending) <= 1:
+            break
+        prompt = _batchPreamble(topic) + "".join(_batchItemContext(byId[nid]) + "\n" for nid in pending)
+        prompt += _batchInstructions(pending)
+        raw = _call_llm(prompt, schema=BATCH_UPDATE_SCHEMA, maxTokens=BATCH_OUTPUT_TOKENS_PER_ITEM * len(pending))
+        results.update(_parseBatchUpdateResponse(raw, pending))
+        failed = [nid for nid in pending if nid not in results]
+        _countParse("parseFailures", len(failed))
+        if failed and attempt < MAX_BATCH_REDISPATCH:
+            print(f"[modelCall] batch of {len(pending)}: {len(failed)} item(s) unparsed, re-dispatching")
+        pending = failed
+    for nid in pending:
+        item = byId[nid]
+        results[nid] = updateNodeOpinion(
+            persona=item["persona"],
+            current_score=item["current_score"],
+            current_prompt=item["current_prompt"],
+            neighbor_info=item["neighbor_info"],
+            topic=topic,
+        )
+    return results
@@ -0,0 +1,119 @@
+"""Ollama endpoint pool: least-outstanding-requests balancing, per-endpoint concurrency limits, health and model probing."""
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+
+HEALTH_TIMEOUT = 3  # seconds for /api/tags probes
+HEALTH_RECHECK_SECONDS = 30  # how long a probe result (healthy or not) is trusted
+ACQUIRE_TIMEOUT = 300  # seconds to wait for a free slot before giving up
+
+
+class _Endpoint:
+    def __init__(self, url: str, maxConcurrent: int) -> None:
+        self.url = url.rstrip("/")
+        self.maxConcurrent = maxConcurrent
+        self.outstanding = 0
+        self.healthy = True
+        self.models: set[str] | None = None  # None until probed
+        self.checkedAt = float("-inf")
+        self.checking = False  # a thread is probing it; others neither probe it again nor give up on it meanwhile
+
+    def serves(self, model: str) -> bool:
+        if self.models is None:
+            return True
+        return model in self.models or f"{model}:latest" in self.models
+
+
+class OllamaPool:
+    """Spread requests over several Ollama servers, always picking the healthy one with the fewest in flight."""
+
+    def __init__(self, urls: list[str], maxConcurrent: int = 2) -> None:
+        if not urls:
+            raise ValueError("OllamaPool needs at least one endpoint URL")
+        self.endpoints = [_Endpoint(url, max(1, maxConcurrent)) for url in urls]
+        self._cond = threading.Condition()
+
+    @property
+    def capacity(self) -> int:
+        """Total concurrent requests the pool admits."""
+        return sum(e.maxConcurrent for e in self.endpoints)
+
+    def _probe(self, endpoint: _Endpoint) -> None:
+        """Health check plus model list via /api/tags. The request runs outside the lock, the result is stored under it."""
+        healthy, models = False, None
+        try:
+            response = requests.get(f"{endpoint.url}/api/tags", timeout=HEALTH_TIMEOUT)
+            response.raise_for_status()
+            models = {m.get("name", "") for m in response.json().get("models", [])}
+            healthy = True
+        except (requests.RequestException, ValueError):
+            pass
+        finally:
+            with self._cond:
+                endpoint.healthy = healthy
+                if models is not None:
+                    endpoint.models = models
+                endpoint.checkedAt = time.monotonic()
+                endpoint.checking = False
+                self._cond.notify_all()
+
+    def _refresh(self, force: bool = False) -> None:
+        """Re-probe endpoints whose last check is stale. Each is claimed under the lock, so only one thread probes
+        it; the probes themselves run outside the lock, since they are slow."""
+        with self._cond:
+            now = time.monotonic()
+            due = [e for e in self.endpoints if not e.checking and (force or now - e.checkedAt >= HEALTH_RECHECK_SECONDS)]
+            for endpoint in due:
+                endpoint.checking = True
+        for endpoint in due:
+            self._probe(endpoint)
+
+    def _candidates(self, model: str) -> list[_Endpoint]:
+        return [e for e in self.endpoints if e.healthy and e.serves(model)]
+
+    @contextmanager
+    def acquire(self, model: str):
+        """Yield the base URL of the least-loaded healthy endpoint serving model; blocks while all are at their limit
+        (or, with none available, while another thread is still probing one)."""
+        self._refresh()
+        with self._cond:
+            stale = not self._candidates(model)
+        if stale:
+            self._refresh(force=True)
+        deadline = time.monotonic() + ACQUIRE_TIMEOUT
+        with self._cond:
+            while True:
+                candidates = self._candidates(model)
+                if not candidates and not any(e.checking for e in self.endpoints):
+                    raise Exception(f"No healthy Ollama endpoint serves {model}: {', '.join(e.url for e in self.endpoints)}")
+                free = [e for e in candidates if e.outstanding < e.maxConcurrent]
+                if free:
+                    endpoint = min(free, key=lambda e: e.outstanding / e.maxConcurrent)
+                    endpoint.outstanding += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Timed out waiting for a free Ollama slot for {model}")
+                self._cond.wait(timeout=min(remaining, HEALTH_RECHECK_SECONDS))
+        try:
+            yield endpoint.url
+        except requests.ConnectionError:
+            with self._cond:
+                endpoint.healthy = False
+                endpoint.checkedAt = time.monotonic()
+            print(f"[ollamaPool] {endpoint.url} unreachable, marked unhealthy")
+            raise
+        finally:
+            with self._cond:
+                endpoint.outstanding -= 1
+                self._cond.notify_all()
+
+    def status(self) -> list[dict]:
+        """Snapshot of endpoint state for logging."""
+        with self._cond:
+            return [
+                {"url": e.url, "healthy": e.healthy, "outstanding": e.outstanding, "maxConcurrent": e.maxConcurrent}
+                for e in self.endpoints
+            ]
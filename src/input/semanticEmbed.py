@@ -0,0 +1,163 @@
+"""Sentence embeddings for semantic analysis: pluggable embedders, batched encoding, on-disk cache keyed by text hash."""
+import hashlib
+import re
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from .networkOps import networksDir
+
+EMBED_BATCH_SIZE = 64
+SBERT_MODEL = "all-MiniLM-L6-v2"
+HASHING_DIM = 512
+CACHE_PATH = networksDir / ".embeddings.sqlite"
+SQLITE_TIMEOUT = 60  # seconds to wait on a cache locked by another process
+CACHE_CHUNK = 500  # keys per sqlite lookup (stays under the bound-parameter limit)
+ANCHOR_REMOTE = "I fully support remote work and flexibility."
+ANCHOR_RTO = "I believe everyone must return to the office full-time."
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+
+
+def _normalizeRows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+class HashingEmbedder:
+    """Offline embedder: signed feature hashing of word unigrams and bigrams. No model download, deterministic."""
+
+    def __init__(self, dim: int = HASHING_DIM) -> None:
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str) -> list[str]:
+        words = _TOKEN.findall(text.lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                vectors[row, value % self.dim] += 1.0 if (value >> 63) & 1 else -1.0
+        return _normalizeRows(vectors)
+
+
+class SbertEmbedder:
+    """sentence-transformers model; the package is imported on first use (optional dependency)."""
+
+    def __init__(self, modelName: str = SBERT_MODEL, batchSize: int = EMBED_BATCH_SIZE) -> None:
+        self.modelName = modelName
+        self.batchSize = batchSize
+        self.name = f"sbert-{modelName}"
+        self._model = None
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        if self._model is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError as e:
+                raise ImportError("SbertEmbedder needs sentence-transformers (pip install sentence-transformers); use the hashing embedder offline") from e
+            self._model = SentenceTransformer(self.modelName)
+        vectors = self._model.encode(texts, batch_size=self.batchSize, convert_to_numpy=True, normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+EMBEDDERS = {"sbert": SbertEmbedder, "hashing": HashingEmbedder}
+
+
+def getEmbedder(name: str = "sbert"):
+    """Embedder by name: "sbert" or "hashing"."""
+    if name not in EMBEDDERS:
+        raise ValueError(f"Unknown embedder: {name}. Choose from {', '.join(EMBEDDERS)}.")
+    return EMBEDDERS[name]()
+
+
+def textKey(text: str) -> str:
+    """Cache key of a text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite store of (embedder name, text hash) -> float32 vector. Safe to share between threads."""
+
+    def __init__(self, path: Path = CACHE_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), timeout=SQLITE_TIMEOUT, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (embedder TEXT, key TEXT, vector BLOB, PRIMARY KEY (embedder, key))"
+        )
+        self._conn.commit()
+
+    def get(self, embedder: str, keys: list[str]) -> dict[str, np.ndarray]:
+        found: dict[str, np.ndarray] = {}
+        with self._lock:
+            for start in range(0, len(keys), CACHE_CHUNK):
+                chunk = keys[start : start + CACHE_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE embedder = ? AND key IN ({marks})", [embedder, *chunk]
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put(self, embedder: str, vectors: dict[str, np.ndarray]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (embedder, key, vector) VALUES (?, ?, ?)",
+                [(embedder, key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in vectors.items()],
+            )
+            self._conn.commit()
+
+    def sample(self, embedder: str, limit: int) -> np.ndarray:
+        """Up to limit cached vectors of one embedder. Keys are sha256 digests, so key order is a uniform, reproducible sample."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT vector FROM embeddings WHERE embedder = ? ORDER BY key LIMIT ?", (embedder, limit)
+            ).fetchall()
+        if not rows:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([np.frombuffer(blob, dtype=np.float32) for (blob,) in rows])
+
+
+_CACHES: dict[Path, EmbeddingCache] = {}
+
+
+def getCache(path: Path = CACHE_PATH) -> EmbeddingCache:
+    """Shared cache per path."""
+    if path not in _CACHES:
+        _CACHES[path] = EmbeddingCache(path)
+    return _CACHES[path]
+
+
+def embedTexts(texts: list[str], embedder=None, cache: EmbeddingCache | None = None) -> np.ndarray:
+    """Unit-norm embeddings (one row per text). Repeated texts are encoded once; only texts missing from the cache are encoded, in batches."""
+    embedder = embedder or getEmbedder()
+    cache = cache if cache is not None else getCache()
+    keys = [textKey(t) for t in texts]
+    unique = dict(zip(keys, texts))
+    vectors = cache.get(embedder.name, list(unique))
+    missing = [k for k in unique if k not in vectors]
+    for start in range(0, len(missing), EMBED_BATCH_SIZE):
+        batch = missing[start : start + EMBED_BATCH_SIZE]
+        encoded = _normalizeRows(np.asarray(embedder.encode([unique[k] for k in batch]), dtype=np.float32))
+        fresh = dict(zip(batch, encoded))
+        cache.put(embedder.name, fresh)
+        vectors.update(fresh)
+    if not keys:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.stack([vectors[k] for k in keys])
+
+
+def anchorStance(embeddings: np.ndarray, embedder=None, cache: EmbeddingCache | None = None) -> np.ndarray:
+    """cos(text, remote anchor) - cos(text, RTO anchor) for every row, as one matrix product (> 0 leans Remote)."""
+    anchors = embedTexts([ANCHOR_REMOTE, ANCHOR_RTO], embedder, cache)
+    similarity = embeddings @ anchors.T
+    return similarity[:, 0] - similarity[:, 1]
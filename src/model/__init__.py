@@ -1,6 +1,47 @@
-"""Model: agent (LLM) and degroot iteration."""
+"""Model: agent (LLM), degroot (in memory or out of core), Friedkin-Johnsen, bounded-confidence and ensemble iteration."""
 
-from .agentModel import agentIterate, updateNode
-from .baseline import degrootIterate
+from .agentModel import SemanticDriftMonitor, agentIterate, updateNode
+from .baseline import (
+    ENSEMBLE_DISTS,
+    BoundedConfidence,
+    Ensemble,
+    InterventionSearch,
+    OutOfCoreDegroot,
+    buildCsr,
+    degrootInfluence,
+    degrootIterate,
+    edgeListChunks,
+    ensembleDesign,
+    fjEquilibrium,
+    fjIterate,
+    fjSystem,
+    influenceReport,
+    networkChunks,
+    saveEnsemble,
+    saveIntervention,
+    validateIntervention,
+)
 
-__all__ = ["agentIterate", "updateNode", "degrootIterate"]
+__all__ = [
+    "agentIterate",
+    "updateNode",
+    "SemanticDriftMonitor",
+    "degrootIterate",
+    "fjIterate",
+    "fjEquilibrium",
+    "fjSystem",
+    "BoundedConfidence",
+    "Ensemble",
+    "ENSEMBLE_DISTS",
+    "ensembleDesign",
+    "saveEnsemble",
+    "OutOfCoreDegroot",
+    "buildCsr",
+    "edgeListChunks",
+    "networkChunks",
+    "degrootInfluence",
+    "influenceReport",
+    "InterventionSearch",
+    "saveIntervention",
+    "validateIntervention",
+]
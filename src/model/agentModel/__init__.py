@@ -1,5 +1,6 @@
 """AgentModel: update network nodes via LLM."""
 
 from .iterate import agentIterate, updateNode
+from .semanticDrift import SemanticDriftMonitor
 
-__all__ = ["agentIterate", "updateNode"]
+__all__ = ["agentIterate", "updateNode", "SemanticDriftMonitor"]
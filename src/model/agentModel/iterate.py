@@ -1,14 +1,21 @@
 """Agent iteration: update nodes via LLM."""
 
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
 from tqdm import tqdm
 
-from input import modelCall, saveNetwork
+from input import batchCall, modelCall, saveNetwork
+from input.networkOps import networksDir
+
+from .semanticDrift import SemanticDriftMonitor
 
 PRECISION = 6
 
 
-def updateNode(node: dict, id_to_node: dict[str, dict]) -> dict:
-    """Update node opinion and prompt via LLM from persona and neighbor info."""
+def _updateArgs(node: dict, id_to_node: dict[str, dict]) -> dict:
+    """LLM update inputs for a node: persona, current state, and weighted neighbor prompts."""
     neighbors = node.get("neighbors", {})
     neighbor_info: list[tuple[str, float]] = []
     for jid, wij in neighbors.items():
@@ -16,24 +23,118 @@ def updateNode(node: dict, id_to_node: dict[str, dict]) -> dict:
         if j_node is not None:
             j_prompt = j_node.get("prompt", "")
             neighbor_info.append((j_prompt, wij))
+    return {
+        "persona": node.get("persona", ""),
+        "current_score": float(node.get("opinionScore", 0.5)),
+        "current_prompt": node.get("prompt", ""),
+        "neighbor_info": neighbor_info,
+    }
+
 
-    score, promptText = modelCall.updateNodeOpinion(
-        persona=node.get("persona", ""),
-        current_score=float(node.get("opinionScore", 0.5)),
-        current_prompt=node.get("prompt", ""),
-        neighbor_info=neighbor_info,
-    )
+def updateNode(node: dict, id_to_node: dict[str, dict]) -> dict:
+    """Update node opinion and prompt via LLM from persona and neighbor info."""
+    score, promptText = modelCall.updateNodeOpinion(**_updateArgs(node, id_to_node))
     return {"opinionScore": score, "prompt": promptText}
 
 
-def agentIterate(network: dict, outputName: str | None = None) -> dict:
-    """One agent iteration: update all nodes via LLM, optionally save."""
+def _applyUpdate(node: dict, u: dict) -> None:
+    """Write an updateNode result into the node (score rounded to PRECISION); missing keys keep the current values."""
+    node["opinionScore"] = round(float(u.get("opinionScore", node["opinionScore"])), PRECISION)
+    node["prompt"] = u.get("prompt", node["prompt"])
+
+
+def _concurrentIterate(nodes: list[dict], id_to_node: dict[str, dict], workers: int) -> None:
+    """Update nodes with parallel requests. All nodes read the same pre-iteration neighbor state."""
+    updates: dict[str, dict] = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(updateNode, node, id_to_node): node["id"] for node in nodes}
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Agent iter", unit="node"):
+            updates[futures[future]] = future.result()
+    for node in nodes:
+        _applyUpdate(node, updates[node["id"]])
+
+
+def _batchIterate(nodes: list[dict], id_to_node: dict[str, dict], batchSize: int, workers: int = 1) -> None:
+    """Update nodes several per LLM request. Sequentially, each batch sees the updates of earlier batches;
+    with workers > 1 batches run in parallel on the pre-iteration state."""
+    items = [{"id": n["id"], **_updateArgs(n, id_to_node)} for n in nodes]
+    batches = modelCall.planUpdateBatches(items, batchSize)
+    if workers > 1:
+        itemsById = {item["id"]: item for item in items}
+        results: dict[str, tuple[float, str]] = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(modelCall.updateNodeOpinionsBatch, [itemsById[nid] for nid in b]) for b in batches]
+            with tqdm(total=len(nodes), desc="Agent iter (batched)", unit="node") as bar:
+                for future in as_completed(futures):
+                    batchResults = future.result()
+                    results.update(batchResults)
+                    bar.update(len(batchResults))
+        for nid, (score, promptText) in results.items():
+            _applyUpdate(id_to_node[nid], {"opinionScore": score, "prompt": promptText})
+        return
+    with tqdm(total=len(nodes), desc="Agent iter (batched)", unit="node") as bar:
+        for batch in batches:
+            # Rebuild contexts so neighbor prompts reflect batches already applied in this iteration
+            batchItems = [{"id": nid, **_updateArgs(id_to_node[nid], id_to_node)} for nid in batch]
+            results = modelCall.updateNodeOpinionsBatch(batchItems)
+            for nid in batch:
+                score, promptText = results[nid]
+                _applyUpdate(id_to_node[nid], {"opinionScore": score, "prompt": promptText})
+            bar.update(len(batch))
+
+
+def _batchFileIterate(nodes: list[dict], id_to_node: dict[str, dict], requestsPath: Path, executor: str) -> None:
+    """Offline mode: write every prompt of the iteration to a batch file, execute it, ingest the results."""
+    argsById = {n["id"]: _updateArgs(n, id_to_node) for n in nodes}
+    updates = batchCall.runUpdateBatch(argsById, requestsPath, executor)
+    for node in nodes:
+        score, promptText = updates[node["id"]]
+        _applyUpdate(node, {"opinionScore": score, "prompt": promptText})
+
+
+def _batchRequestsPath(outputName: str) -> Path:
+    """networks/{slices}/iterK -> networks/.batches/{slices}/iterK.requests.jsonl.
+
+    Batch files live outside the slices dir, so the rollback of a failed run keeps them for the resume."""
+    out = Path(outputName)
+    return networksDir / ".batches" / out.parent / f"{out.name}.requests.jsonl"
+
+
+def agentIterate(
+    network: dict,
+    outputName: str | None = None,
+    batchSize: int = 1,
+    executor: str | None = None,
+    workers: int = 1,
+    semantic: SemanticDriftMonitor | None = None,
+    fixed: set[str] | None = None,
+) -> dict:
+    """One agent iteration: update all nodes via LLM, optionally save.
+
+    batchSize > 1 packs nodes per request; executor ("mock", "ollama", "openai") runs the whole
+    iteration offline through a batch-API file instead of interactive requests, so every node updates from the
+    pre-iteration state (a simultaneous, Jacobi-style update rather than the default in-place sequential loop); workers > 1 sends
+    requests in parallel (e.g. across a pool of Ollama endpoints); semantic, if given, embeds the
+    new prompts in one batch and updates its drift metrics before the network is saved; nodes whose id is in
+    fixed keep their opinion and prompt (stubborn agents) but are still read by their neighbors.
+    """
     nodes = network.get("nodes", [])
     id_to_node = {n["id"]: n for n in nodes}
-    for node in tqdm(nodes, desc="Agent iter", unit="node"):
-        u = updateNode(node, id_to_node)
-        node["opinionScore"] = round(float(u.get("opinionScore", node["opinionScore"])), PRECISION)
-        node["prompt"] = u.get("prompt", node["prompt"])
+    updated = [n for n in nodes if n["id"] not in fixed] if fixed else nodes
+    if executor and outputName:
+        _batchFileIterate(updated, id_to_node, _batchRequestsPath(outputName), executor)
+    elif executor:
+        with tempfile.TemporaryDirectory(prefix="agent_batch_") as tmp:  # nothing to resume when not saving
+            _batchFileIterate(updated, id_to_node, Path(tmp) / "iter.requests.jsonl", executor)
+    elif batchSize > 1:
+        _batchIterate(updated, id_to_node, batchSize, workers)
+    elif workers > 1:
+        _concurrentIterate(updated, id_to_node, workers)
+    else:
+        for node in tqdm(updated, desc="Agent iter", unit="node"):
+            _applyUpdate(node, updateNode(node, id_to_node))
+    if semantic is not None:
+        semantic.observe(nodes)
     if outputName:
         saveNetwork(network, outputName)
     return network
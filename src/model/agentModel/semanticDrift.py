@@ -0,0 +1,66 @@
+"""Online semantic drift: embed each iteration's prompts and track displacement, score/stance gap and dispersion."""
+
+import numpy as np
+
+from input.semanticEmbed import anchorStance, embedTexts, getEmbedder
+
+METRIC_PRECISION = 6
+STALL_TOLERANCE = 0.01  # mean embedding displacement below which an iteration counts as stalled
+
+
+def _round(value: float | None) -> float | None:
+    return None if value is None else round(float(value), METRIC_PRECISION)
+
+
+class SemanticDriftMonitor:
+    """Observe the network once before the run and once per iteration (agentIterate calls observe when given one).
+
+    Each observation embeds all prompts in one batched, cached call and stores in metrics:
+    per-node displacement |e_t - e_{t-1}| of the unit embeddings and its mean/max, semantic dispersion
+    (mean squared distance to the centroid embedding, 0 = every prompt says the same thing),
+    and how far opinionScore is from the embedding stance: their correlation (negative when they agree,
+    since score 0 = remote and stance > 0 = remote) and the RMS residual of the best linear fit score ~ stance.
+    With patience > 0, shouldStop turns true after patience consecutive iterations whose mean displacement
+    stays below stallTolerance.
+    """
+
+    def __init__(self, embedder: str = "sbert", stallTolerance: float = STALL_TOLERANCE, patience: int = 0) -> None:
+        self.embedder = getEmbedder(embedder)
+        self.stallTolerance = stallTolerance
+        self.patience = patience
+        self.stalledIterations = 0
+        self.metrics: dict = {}
+        self._previous: dict[str, np.ndarray] = {}
+
+    @property
+    def shouldStop(self) -> bool:
+        return self.patience > 0 and self.stalledIterations >= self.patience
+
+    def observe(self, nodes: list[dict]) -> dict:
+        ids = [n["id"] for n in nodes]
+        embeddings = embedTexts([str(n.get("prompt", "")) for n in nodes], self.embedder)
+        stance = anchorStance(embeddings, self.embedder)
+        scores = np.array([float(n.get("opinionScore", 0.5)) for n in nodes])
+        centroid = embeddings.mean(axis=0)
+        metrics: dict = {"semanticDispersion": _round(((embeddings - centroid) ** 2).sum(axis=1).mean())}
+
+        correlation, gap = None, None
+        if len(nodes) > 1 and scores.std() > 0 and stance.std() > 0:
+            correlation = np.corrcoef(scores, stance)[0, 1]
+            design = np.column_stack([np.ones_like(stance), stance])
+            coefficients = np.linalg.lstsq(design, scores, rcond=None)[0]
+            gap = np.sqrt(np.mean((scores - design @ coefficients) ** 2))
+        metrics["scoreStanceCorr"] = _round(correlation)
+        metrics["scoreStanceGap"] = _round(gap)
+
+        moved = [(nid, float(np.linalg.norm(e - self._previous[nid]))) for nid, e in zip(ids, embeddings) if nid in self._previous]
+        if moved:
+            displacement = np.array([d for _, d in moved])
+            metrics["semanticDisplacementMean"] = _round(displacement.mean())
+            metrics["semanticDisplacementMax"] = _round(displacement.max())
+            metrics["semanticDisplacement"] = {nid: _round(d) for nid, d in moved}
+            stalled = displacement.mean() < self.stallTolerance
+            self.stalledIterations = self.stalledIterations + 1 if stalled else 0
+        self._previous = dict(zip(ids, embeddings))
+        self.metrics = metrics
+        return metrics
@@ -1,5 +1,31 @@
-"""Baseline: classic DeGroot graph iteration."""
+"""Baseline: classic DeGroot, Friedkin-Johnsen and bounded-confidence graph iteration, plus batched ensembles
+out-of-core DeGroot, closed-form DeGroot influence and stubborn-seed interventions."""
 
+from .boundedConfidence import BoundedConfidence
+from .ensemble import ENSEMBLE_DISTS, Ensemble, ensembleDesign, saveEnsemble
+from .friedkinJohnsen import fjEquilibrium, fjIterate, fjSystem
+from .influence import degrootInfluence, influenceReport
+from .intervention import InterventionSearch, saveIntervention, validateIntervention
 from .iterate import degrootIterate
+from .outOfCore import OutOfCoreDegroot, buildCsr, edgeListChunks, networkChunks
 
-__all__ = ["degrootIterate"]
+__all__ = [
+    "degrootIterate",
+    "fjIterate",
+    "fjEquilibrium",
+    "fjSystem",
+    "BoundedConfidence",
+    "Ensemble",
+    "ENSEMBLE_DISTS",
+    "ensembleDesign",
+    "saveEnsemble",
+    "OutOfCoreDegroot",
+    "buildCsr",
+    "edgeListChunks",
+    "networkChunks",
+    "degrootInfluence",
+    "influenceReport",
+    "InterventionSearch",
+    "saveIntervention",
+    "validateIntervention",
+]
@@ -0,0 +1,87 @@
+"""Bounded-confidence iteration (Hegselmann-Krause, Deffuant): nodes only listen to neighbors within epsilon."""
+
+import numpy as np
+
+from input import saveNetwork
+
+from ..networkArrays import PRECISION, edgeArrays, nodeIds, opinionVector, writeOpinions
+
+EPSILON = 0.2
+CONVERGENCE_RATE = 0.5  # Deffuant mu
+FREEZE_TOLERANCE = 1e-6  # below this, confident neighbors count as agreeing (scores are stored to 6 decimals)
+VARIANTS = ("hk", "deffuant")
+
+
+class BoundedConfidence:
+    """Vectorized bounded-confidence engine over the network's edge arrays (built once; topology is fixed).
+
+    hk: x_i <- weighted mean of itself (weight = its mean link weight) and every neighbor with |x_i - x_j| <= epsilon,
+    computed for all nodes at once with a masked bincount over the edge list.
+    deffuant: a random matching of the undirected edges interacts each step; a matched pair within epsilon
+    moves together, x_i += mu (x_j - x_i) and x_j += mu (x_i - x_j).
+    frozen turns true once no pair within epsilon disagrees (or an hk step no longer changes the stored scores):
+    from then on no step can change anything.
+    """
+
+    def __init__(
+        self,
+        network: dict,
+        variant: str = "hk",
+        epsilon: float = EPSILON,
+        mu: float = CONVERGENCE_RATE,
+        seed: int | None = None,
+    ) -> None:
+        if variant not in VARIANTS:
+            raise ValueError(f"Unknown bounded-confidence variant: {variant}. Choose from {', '.join(VARIANTS)}.")
+        self.variant = variant
+        self.epsilon = epsilon
+        self.mu = mu
+        self.rng = np.random.default_rng(seed)
+        self.frozen = False
+        self.n = len(network.get("nodes", []))
+        self.rows, self.cols, self.weights = edgeArrays(network, nodeIds(network))
+        degree = np.bincount(self.rows, minlength=self.n)
+        strength = np.bincount(self.rows, self.weights, minlength=self.n)
+        self.selfWeights = np.where(degree > 0, strength / np.maximum(degree, 1), 1.0)
+        undirected = self.rows < self.cols
+        self.pairs = np.column_stack([self.rows[undirected], self.cols[undirected]])
+
+    def _hkStep(self, x: np.ndarray) -> np.ndarray:
+        confident = np.abs(x[self.rows] - x[self.cols]) <= self.epsilon
+        w = self.weights * confident
+        numerator = np.bincount(self.rows, w * x[self.cols], minlength=self.n) + self.selfWeights * x
+        denominator = np.bincount(self.rows, w, minlength=self.n) + self.selfWeights
+        return numerator / denominator
+
+    def _randomMatching(self) -> np.ndarray:
+        """Edges that come first, in a random order, at both of their endpoints: a random matching in O(E)."""
+        rank = self.rng.permutation(len(self.pairs))
+        first = np.full(self.n, len(self.pairs))
+        np.minimum.at(first, self.pairs[:, 0], rank)
+        np.minimum.at(first, self.pairs[:, 1], rank)
+        return self.pairs[(first[self.pairs[:, 0]] == rank) & (first[self.pairs[:, 1]] == rank)]
+
+    def _deffuantStep(self, x: np.ndarray) -> np.ndarray:
+        matched = self._randomMatching()
+        i, j = matched[:, 0], matched[:, 1]
+        gap = x[j] - x[i]
+        move = np.where(np.abs(gap) <= self.epsilon, self.mu * gap, 0.0)
+        x = x.copy()
+        x[i] += move
+        x[j] -= move
+        return x
+
+    def _isFrozen(self, x: np.ndarray) -> bool:
+        gap = np.abs(x[self.rows] - x[self.cols])
+        return not np.any((gap <= self.epsilon) & (gap > FREEZE_TOLERANCE))
+
+    def iterate(self, network: dict, outputName: str | None = None) -> dict:
+        """One bounded-confidence step on network (same node order as at construction). Optionally save."""
+        x = opinionVector(network)
+        if not self.frozen:
+            stored = np.round(np.clip(self._hkStep(x) if self.variant == "hk" else self._deffuantStep(x), 0.0, 1.0), PRECISION)
+            writeOpinions(network, stored)
+            self.frozen = (self.variant == "hk" and np.array_equal(stored, x)) or self._isFrozen(stored)
+        if outputName:
+            saveNetwork(network, outputName)
+        return network
@@ -0,0 +1,149 @@
+"""Ensemble iteration: R replicas on one topology, advanced together as an N x R matrix."""
+
+import json
+from itertools import product
+
+import numpy as np
+from tqdm import tqdm
+
+from input.networkOps import SCORE_DIST_SUFFIX, _sampleOpinionScores, networksDir
+
+from ..networkArrays import influenceMatrix, nodeIds
+
+ENSEMBLE_DISTS = ("normal", "skew_right_1", "skew_right_2", "skew_right_3", "polarized")
+SPLIT_THRESHOLD = 0.5  # a replica's minority share is the fraction of nodes on the smaller side of this score
+MOMENT_BLOCK = 2048  # rows per block of the moment passes (bounds the block-sized temporaries)
+
+
+class Ensemble:
+    """Replica r follows x_r(t+1) = clip((1 - s_r) W x_r(t) + s_r x_r(0) + sigma_r xi_r(t), 0, 1), with W the
+    row-normalized topology (isolated nodes keep their score), s_r the stubbornness (s = 0 is DeGroot) and
+    xi_r(t) standard normal noise. All replicas advance with one sparse mat-mat product W @ X per step, so
+    R replicas cost about one sparse pass over the edges plus O(N R) dense work.
+    """
+
+    def __init__(
+        self,
+        network: dict,
+        initial: np.ndarray,
+        noise: np.ndarray | float = 0.0,
+        stubbornness: np.ndarray | float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        weights, hasNeighbors = influenceMatrix(network, nodeIds(network))
+        self.weights = weights.astype(np.float32)
+        self.isolated = ~hasNeighbors
+        self.hasIsolated = bool(self.isolated.any())
+        self.initial = np.ascontiguousarray(initial, dtype=np.float32)
+        replicas = self.initial.shape[1]
+        self.noise = np.broadcast_to(np.asarray(noise, dtype=np.float32), (replicas,)).copy()
+        self.stubbornness = np.broadcast_to(np.asarray(stubbornness, dtype=np.float32), (replicas,)).copy()
+        self.noisy = self.noise > 0
+        self.rng = np.random.default_rng(seed)
+        self.scores = self.initial.copy()
+        self.steps = 0
+
+    def step(self) -> np.ndarray:
+        x = self.weights @ self.scores
+        if self.hasIsolated:
+            x[self.isolated] = self.scores[self.isolated]
+        x -= self.initial  # (1 - s) W x + s x0 = (1 - s)(W x - x0) + x0, without an N x R temporary
+        x *= 1.0 - self.stubbornness
+        x += self.initial
+        if self.noisy.all():
+            x += self.noise * self.rng.standard_normal(x.shape, dtype=np.float32)
+        elif self.noisy.any():  # draw only for the noisy replicas; noise generation costs more than W @ X
+            x[:, self.noisy] += self.noise[self.noisy] * self.rng.standard_normal((x.shape[0], self.noisy.sum()), dtype=np.float32)
+        np.clip(x, 0.0, 1.0, out=x)
+        self.scores = x
+        self.steps += 1
+        return x
+
+    def statistics(self) -> dict[str, np.ndarray]:
+        """Per-replica mean, standard deviation and minority share of the current scores. Two passes over row blocks
+        with float64 accumulation: column sums for the mean, then sums of squared deviations from it, so the std
+        of a replica near consensus is not lost to cancellation as in sqrt(E[x^2] - mean^2)."""
+        n, replicas = self.scores.shape
+        total, above = np.zeros(replicas), np.zeros(replicas)
+        for start in range(0, n, MOMENT_BLOCK):
+            block = self.scores[start : start + MOMENT_BLOCK]
+            total += block.sum(axis=0, dtype=np.float64)
+            above += np.count_nonzero(block > SPLIT_THRESHOLD, axis=0)
+        mean = total / n
+        center = mean.astype(np.float32)
+        squares = np.zeros(replicas)
+        for start in range(0, n, MOMENT_BLOCK):
+            centered = self.scores[start : start + MOMENT_BLOCK] - center
+            centered *= centered
+            squares += centered.sum(axis=0, dtype=np.float64)
+        squares -= n * (mean - center) ** 2  # deviations were taken from the float32-rounded mean
+        above /= n
+        return {
+            "mean": mean,
+            "std": np.sqrt(np.maximum(squares, 0.0) / n),
+            "minority": np.minimum(above, 1.0 - above),
+        }
+
+    def run(self, iters: int) -> dict[str, np.ndarray]:
+        """Advance iters steps; returns (iters + 1) x R arrays of every statistic, step 0 included."""
+        history = {key: [value] for key, value in self.statistics().items()}
+        for _ in tqdm(range(iters), desc="Ensemble iteration", unit="step"):
+            self.step()
+            for key, value in self.statistics().items():
+                history[key].append(value)
+        return {key: np.array(values) for key, values in history.items()}
+
+
+def ensembleDesign(
+    n: int,
+    dists: list[str],
+    replicas: int,
+    noise: list[float],
+    stubbornness: list[float],
+    seed: int | None = None,
+) -> tuple[np.ndarray, list[dict]]:
+    """Initial N x R scores and one parameter record per replica for the grid dists x noise x stubbornness x replicas."""
+    rng = np.random.default_rng(seed)
+    columns = []
+    design = []
+    for dist, sigma, stubborn in product(dists, noise, stubbornness):
+        for _ in range(replicas):
+            columns.append(_sampleOpinionScores(n, dist, seed=rng.integers(2**63)))
+            design.append({"dist": dist, "noise": sigma, "stubbornness": stubborn})
+    return np.column_stack(columns).astype(np.float32), design
+
+
+def ensembleSummary(history: dict[str, np.ndarray], design: list[dict]) -> list[dict]:
+    """Final-step statistics averaged over the replicas of each (dist, noise, stubbornness) cell."""
+    cells: dict[tuple, list[int]] = {}
+    for r, params in enumerate(design):
+        cells.setdefault((params["dist"], params["noise"], params["stubbornness"]), []).append(r)
+    summary = []
+    for (dist, sigma, stubborn), members in cells.items():
+        row = {"dist": SCORE_DIST_SUFFIX.get(dist, dist), "noise": sigma, "stubbornness": stubborn, "replicas": len(members)}
+        for key, values in history.items():
+            final = values[-1, members]
+            row[f"{key}Avg"] = round(float(final.mean()), 6)
+            row[f"{key}Sd"] = round(float(final.std()), 6)
+        summary.append(row)
+    return summary
+
+
+def saveEnsemble(outputName: str, ensemble: Ensemble, history: dict[str, np.ndarray], design: list[dict]) -> list[dict]:
+    """networks/{outputName}/: stats.npz (per-step statistics, steps x R), final.npy (N x R scores),
+    design.json (replica parameters) and summary.json (per-cell averages). Returns the summary."""
+    out = networksDir / outputName
+    out.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(
+        out / "stats.npz",
+        noise=ensemble.noise,
+        stubbornness=ensemble.stubbornness,
+        **history,
+    )
+    np.save(out / "final.npy", ensemble.scores)
+    summary = ensembleSummary(history, design)
+    with (out / "design.json").open("w", encoding="utf-8") as f:
+        json.dump(design, f)
+    with (out / "summary.json").open("w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return summary
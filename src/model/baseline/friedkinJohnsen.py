@@ -0,0 +1,96 @@
+"""Friedkin-Johnsen iteration: DeGroot averaging anchored to each node's initial opinion."""
+
+import re
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import bicgstab, spsolve
+
+from input import saveNetwork
+
+from ..networkArrays import influenceMatrix, nodeIds, opinionVector, writeOpinions
+
+MAX_SUSCEPTIBILITY = 0.99  # keeps I - Lambda W invertible even where no node of a component is stubborn
+DIRECT_SOLVE_MAX_NODES = 1000  # sparse LU up to here; LU fills in badly on hub-heavy graphs, so BiCGSTAB above
+SOLVE_TOLERANCE = 1e-10
+
+FIRM_WORDS = {
+    "assertive", "authoritative", "bold", "commanding", "confident", "decisive", "demanding", "determined",
+    "direct", "firm", "forceful", "headstrong", "inflexible", "insistent", "outspoken", "persuasive",
+    "resolute", "rigid", "steadfast", "stern", "strict", "strong-willed", "stubborn", "tenacious",
+    "uncompromising", "unyielding",
+}  # fmt: skip
+GENTLE_WORDS = {
+    "accommodating", "adaptable", "agreeable", "approachable", "calm", "compassionate", "considerate",
+    "cooperative", "easygoing", "empathetic", "flexible", "gentle", "humble", "kind", "lenient", "mild",
+    "mild-mannered", "nurturing", "open-minded", "patient", "receptive", "relaxed", "soft-spoken",
+    "tolerant", "understanding", "warm", "yielding",
+}  # fmt: skip
+_WORD = re.compile(r"[a-z]+(?:-[a-z]+)*")
+
+
+def personaFirmness(persona: str) -> float | None:
+    """Firmness in [0, 1] from the persona's gentle/firm adjectives (smoothed share of firm ones); None if it has neither."""
+    words = _WORD.findall(persona.lower())
+    firm = sum(w in FIRM_WORDS for w in words)
+    gentle = sum(w in GENTLE_WORDS for w in words)
+    if firm + gentle == 0:
+        return None
+    return (firm + 1) / (firm + gentle + 2)
+
+
+def nodeSusceptibility(node: dict) -> float:
+    """lambda_i = 1 - firmness. Personas are generated from a 0 (gentle) to 1 (firm) score equal to the initial
+    opinion, so that score stands in when the persona has no recognisable adjectives."""
+    firmness = personaFirmness(node.get("persona", ""))
+    if firmness is None:
+        firmness = float(node.get("initialOpinionScore", node["opinionScore"]))
+    return float(np.clip(1.0 - firmness, 0.0, MAX_SUSCEPTIBILITY))
+
+
+def fjSystem(network: dict) -> tuple[sparse.csr_matrix, np.ndarray, np.ndarray]:
+    """W, susceptibilities and anchors of the FJ update, read without modifying the network: nodes lacking
+    initialOpinionScore or susceptibility get the values the first FJ step would give them."""
+    nodes = network.get("nodes", [])
+    weights, hasNeighbors = influenceMatrix(network, nodeIds(network))
+    susceptibility = np.array([float(n.get("susceptibility", round(nodeSusceptibility(n), 6))) for n in nodes])
+    anchors = np.array([float(n.get("initialOpinionScore", n["opinionScore"])) for n in nodes])
+    return weights, np.where(hasNeighbors, susceptibility, 0.0), anchors  # isolated nodes hold their anchor
+
+
+def _prepare(network: dict) -> tuple[sparse.csr_matrix, np.ndarray, np.ndarray]:
+    """fjSystem, after filling initialOpinionScore and susceptibility on first use, so later steps (and saved
+    slices) keep the same anchor and lambda."""
+    for node in network.get("nodes", []):
+        node.setdefault("initialOpinionScore", node["opinionScore"])
+        node.setdefault("susceptibility", round(nodeSusceptibility(node), 6))
+    return fjSystem(network)
+
+
+def fjIterate(network: dict, outputName: str | None = None) -> dict:
+    """One FJ step: x_i = lambda_i * (weighted avg of neighbors) + (1 - lambda_i) * x_i(0). Optionally save."""
+    weights, susceptibility, anchors = _prepare(network)
+    scores = susceptibility * (weights @ opinionVector(network)) + (1.0 - susceptibility) * anchors
+    writeOpinions(network, scores)
+    if outputName:
+        saveNetwork(network, outputName)
+    return network
+
+
+def fjEquilibrium(network: dict, outputName: str | None = None) -> dict:
+    """Long-run FJ state without iterating: solve (I - Lambda W) x = (I - Lambda) x(0) with a sparse solver
+    (LU up to DIRECT_SOLVE_MAX_NODES nodes, BiCGSTAB from the current opinions above). Optionally save."""
+    weights, susceptibility, anchors = _prepare(network)
+    n = len(anchors)
+    system = sparse.csc_matrix(sparse.identity(n) - sparse.diags(susceptibility) @ weights)
+    rhs = (1.0 - susceptibility) * anchors
+    if n <= DIRECT_SOLVE_MAX_NODES:
+        scores = spsolve(system, rhs)
+    else:
+        scores, info = bicgstab(system, rhs, x0=opinionVector(network), rtol=SOLVE_TOLERANCE, maxiter=10 * n)
+        if info != 0:
+            raise RuntimeError(f"FJ equilibrium solve did not converge (bicgstab info={info})")
+    writeOpinions(network, np.atleast_1d(scores))
+    if outputName:
+        saveNetwork(network, outputName)
+    return network
@@ -0,0 +1,161 @@
+"""Closed-form DeGroot influence: each node's weight in the limiting opinions and their sensitivity to every link weight."""
+
+import json
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import bicgstab, splu
+
+from input.networkOps import networksDir
+
+from ..networkArrays import PRECISION, edgeArrays, influenceMatrix, nodeIds, opinionVector
+from .friedkinJohnsen import DIRECT_SOLVE_MAX_NODES, SOLVE_TOLERANCE
+
+
+def _solver(matrix: sparse.spmatrix):
+    """solve(b, transpose) for a nonsingular sparse matrix: one LU factorization serves both M x = b and M^T x = b
+    up to DIRECT_SOLVE_MAX_NODES rows, BiCGSTAB above."""
+    if matrix.shape[0] <= DIRECT_SOLVE_MAX_NODES:
+        lu = splu(sparse.csc_matrix(matrix))
+        return lambda b, transpose=False: lu.solve(b, trans="T" if transpose else "N")
+    csr, csrT = sparse.csr_matrix(matrix), sparse.csr_matrix(matrix.T)
+
+    def solve(b: np.ndarray, transpose: bool = False) -> np.ndarray:
+        x, info = bicgstab(csrT if transpose else csr, b, rtol=SOLVE_TOLERANCE, maxiter=10 * len(b))
+        if info != 0:
+            raise RuntimeError(f"DeGroot influence solve did not converge (bicgstab info={info})")
+        return x
+
+    return solve
+
+
+def _closedClass(walk: sparse.csr_matrix, scores: np.ndarray) -> tuple[np.ndarray, float, np.ndarray]:
+    """Stationary distribution pi (pi^T P = pi^T, sum 1) of one closed class, its consensus c = pi^T x(0), and a
+    solution y of (I - P) y = x(0) - c (the fundamental-matrix solve, defined up to a constant). Both come from the
+    class's I - P grounded at one node, which is nonsingular for an irreducible class."""
+    n = walk.shape[0]
+    if n == 1:
+        return np.ones(1), float(scores[0]), np.zeros(1)
+    ground = int(np.argmax(np.asarray(walk.sum(axis=0)).ravel()))
+    keep = np.arange(n) != ground
+    solve = _solver(sparse.identity(n - 1, format="csr") - walk[keep][:, keep])
+    pi = np.ones(n)
+    pi[keep] = solve(walk[ground].toarray().ravel()[keep], transpose=True)
+    pi /= pi.sum()
+    consensus = float(pi @ scores)
+    y = np.zeros(n)
+    y[keep] = solve((scores - consensus)[keep])
+    return pi, consensus, y
+
+
+def degrootInfluence(network: dict) -> dict[str, np.ndarray | float | int]:
+    """Exact long-run DeGroot outcome and its derivatives, without iterating.
+
+    W is the row-normalized weight matrix (x(t+1) = W x(t), nodes without links keep their score). Its closed
+    communicating classes reach consensus c_C = pi_C^T x(0), with pi_C the left eigenvector of W on the class;
+    nodes outside every closed class (possible on directed graphs) settle at the absorption-weighted mix
+    f_T = (I - W_TT)^-1 W_TR f_R. influence_j = d mean(f) / d x_j(0), which is pi_j weighted by the share of
+    nodes class C decides, and equals pi_j when the graph is strongly connected; it sums to 1.
+
+    sensitivity of link i -> j (w_ij in node i's neighbors) is d mean(f) / d w_ij. Raising w_ij perturbs row i of
+    W by (e_j - W_i) / d_i with d_i = sum_j w_ij. Inside a closed class this moves pi by
+    pi_i (e_j - W_i)^T Z / d_i, with Z = (I - W + 1 pi^T)^-1 the fundamental matrix, so one solve y = Z x(0) per
+    class prices every link. Outside, it moves f_T by (I - W_TT)^-1 e_i (f_j - f_i) / d_i, priced for all links at
+    once by u = (I - W_TT)^-T 1. For a periodic class (e.g. a bipartite graph) f is the time-averaged outcome.
+    """
+    ids = nodeIds(network)
+    n = len(ids)
+    rows, cols, weights = edgeArrays(network, ids)
+    strength = np.bincount(rows, weights, minlength=n)
+    walk, hasNeighbors = influenceMatrix(network, ids)
+    walk = sparse.csr_matrix(walk + sparse.diags((~hasNeighbors).astype(float)))  # unlinked nodes keep their score
+    scores = opinionVector(network)
+
+    classes, labels = connected_components(walk, directed=True, connection="strong")
+    linked = walk.tocoo()
+    leaving = labels[linked.row] != labels[linked.col]
+    closed = np.bincount(labels[linked.row[leaving]], minlength=classes) == 0
+    recurrent = closed[labels]
+
+    pi, y, consensus = np.zeros(n), np.zeros(n), np.zeros(n)
+    members = np.split(np.argsort(labels, kind="stable"), np.cumsum(np.bincount(labels, minlength=classes))[:-1])
+    for label in np.flatnonzero(closed):
+        idx = members[label]
+        pi[idx], consensus[idx], y[idx] = _closedClass(walk[idx][:, idx], scores[idx])
+
+    final = np.where(recurrent, consensus, 0.0)
+    mass = np.bincount(labels[recurrent], minlength=classes).astype(float)  # nodes whose outcome class C decides
+    u = np.zeros(n)
+    transient = np.flatnonzero(~recurrent)
+    if len(transient):
+        recurrentIdx = np.flatnonzero(recurrent)
+        inner = walk[transient][:, transient]
+        exits = walk[transient][:, recurrentIdx]
+        solve = _solver(sparse.identity(len(transient), format="csr") - inner)
+        final[transient] = solve(exits @ final[recurrentIdx])
+        u[transient] = solve(np.ones(len(transient)), transpose=True)
+        mass += np.bincount(labels[recurrentIdx], exits.T @ u[transient], minlength=classes)
+    influence = np.where(recurrent, pi * mass[labels], 0.0) / max(n, 1)
+
+    valid = strength[rows] > 0
+    rows, cols, weights = rows[valid], cols[valid], weights[valid]
+    perWeight = 1.0 / (n * strength[rows])
+    inClass = recurrent[rows]
+    sensitivity = np.where(
+        inClass,
+        mass[labels[rows]] * pi[rows] * (y[cols] - y[rows] + scores[rows] - consensus[rows]),
+        u[rows] * (final[cols] - final[rows]),
+    ) * perWeight
+    return {
+        "ids": ids,
+        "influence": influence,
+        "final": final,
+        "rows": rows,
+        "cols": cols,
+        "weights": weights,
+        "sensitivity": sensitivity,
+        "predictedMean": float(final.mean()) if n else 0.0,
+        "closedClasses": int(closed.sum()),
+        "transientNodes": len(transient),
+    }
+
+
+def influenceReport(network: dict, outputName: str | None = None) -> dict:
+    """degrootInfluence as a JSON report: nodes by influence, links by |sensitivity| (with elasticity
+    w_ij * sensitivity, the effect of scaling a link by 1 + epsilon, per epsilon). Optionally save to
+    networks/{outputName}.json."""
+    result = degrootInfluence(network)
+    ids = result["ids"]
+
+    def r(value: float) -> float:
+        return round(float(value), 2 * PRECISION)
+
+    nodeOrder = np.argsort(-result["influence"], kind="stable")
+    edgeOrder = np.argsort(-np.abs(result["sensitivity"]), kind="stable")
+    report = {
+        "nodes": len(ids),
+        "links": len(result["rows"]),
+        "closedClasses": result["closedClasses"],
+        "transientNodes": result["transientNodes"],
+        "predictedMean": r(result["predictedMean"]),
+        "influence": [
+            {"id": ids[i], "influence": r(result["influence"][i]), "finalOpinion": r(result["final"][i])} for i in nodeOrder
+        ],
+        "linkSensitivity": [
+            {
+                "node": ids[result["rows"][e]],
+                "neighbor": ids[result["cols"][e]],
+                "weight": r(result["weights"][e]),
+                "sensitivity": r(result["sensitivity"][e]),
+                "elasticity": r(result["weights"][e] * result["sensitivity"][e]),
+            }
+            for e in edgeOrder
+        ],
+    }
+    if outputName:
+        path = networksDir / f"{outputName}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
@@ -0,0 +1,152 @@
+"""Intervention search: which k nodes, held stubborn at a target opinion, shift the DeGroot / FJ outcome most."""
+
+import copy
+import heapq
+import json
+
+import numpy as np
+from scipy import sparse
+
+from input import modelCall
+from input.networkOps import networksDir
+
+from ..agentModel import agentIterate
+from ..networkArrays import PRECISION, influenceMatrix, nodeIds, opinionVector
+from .friedkinJohnsen import fjSystem
+
+BATCH_COLUMNS = 256  # seed sets propagated together as the columns of one N x B matrix
+REFRESH_COLUMNS = 32  # stale heap tops re-evaluated together in one lazy-greedy refresh
+MODELS = ("degroot", "fj")
+
+
+class InterventionSearch:
+    """Seed sets are scored by the mean opinion after horizon steps of the model with every seed's score pinned to
+    target (a stubborn agent: degroot averages neighbors, fj also pulls each node toward its initial opinion).
+
+    evaluate propagates many seed sets at once: column b of X holds the scores under set b, each step is one sparse
+    mat-mat product W @ X, and the seeds are re-pinned through their flat offsets in X. greedy picks k seeds with CELF lazy
+    evaluation: marginal gains are cached in a max-heap and only re-evaluated, refreshColumns heap tops at a time,
+    when they are stale; a fresh top is accepted without evaluating anything else, which is exact when gains diminish
+    as the set grows (as for stubborn agents in these linear models).
+    """
+
+    def __init__(
+        self,
+        network: dict,
+        model: str = "degroot",
+        target: float = 1.0,
+        horizon: int = 50,
+        batchColumns: int = BATCH_COLUMNS,
+        refreshColumns: int = REFRESH_COLUMNS,
+    ) -> None:
+        if model not in MODELS:
+            raise ValueError(f"Unknown intervention model: {model}. Choose from {', '.join(MODELS)}.")
+        self.ids = nodeIds(network)
+        self.target = float(target)
+        self.horizon = horizon
+        self.batchColumns = max(batchColumns, 1)
+        self.refreshColumns = max(refreshColumns, 1)
+        self.initial = opinionVector(network)
+        if model == "fj":
+            weights, susceptibility, anchors = fjSystem(network)
+            self.weights = sparse.csr_matrix(sparse.diags(susceptibility) @ weights)
+            self.drift = (1.0 - susceptibility) * anchors
+        else:
+            weights, hasNeighbors = influenceMatrix(network, self.ids)
+            self.weights = sparse.csr_matrix(weights + sparse.diags((~hasNeighbors).astype(float)))
+            self.drift = None
+        self.evaluations = 0
+        self.baseline = float(self.evaluate([[]])[0])
+        self.direction = 1.0 if self.target >= self.baseline else -1.0
+
+    def evaluate(self, seedSets: list[list[int]]) -> np.ndarray:
+        """Mean opinion after horizon steps for each seed set (node indices), in batches of batchColumns sets."""
+        means = []
+        for start in range(0, len(seedSets), self.batchColumns):
+            batch = seedSets[start : start + self.batchColumns]
+            pinned = np.concatenate([np.asarray(seeds, dtype=np.int64) * len(batch) + column for column, seeds in enumerate(batch)])
+            scores = np.repeat(self.initial[:, None], len(batch), axis=1)
+            scores.ravel()[pinned] = self.target  # flat (node, column) offsets: far cheaper than an N x B mask
+            for _ in range(self.horizon):
+                scores = self.weights @ scores
+                if self.drift is not None:
+                    scores += self.drift[:, None]
+                scores.ravel()[pinned] = self.target
+            means.append(scores.mean(axis=0))
+            self.evaluations += len(batch)
+        return np.concatenate(means) if means else np.zeros(0)
+
+    def greedy(self, k: int) -> list[dict]:
+        """k seeds by CELF lazy greedy; each entry has the node, its marginal shift of the mean opinion and the
+        cumulative shift of the set so far (signed: positive = toward target)."""
+        current = self.baseline
+        singles = self.evaluate([[i] for i in range(len(self.ids))])
+        heap = [(-self.direction * (value - current), i, 0) for i, value in enumerate(singles)]
+        heapq.heapify(heap)
+        chosen: list[int] = []
+        ranking: list[dict] = []
+        while heap and len(chosen) < k:
+            negGain, node, fresh = heap[0]
+            if fresh == len(chosen):
+                heapq.heappop(heap)
+                chosen.append(node)
+                current += -negGain * self.direction
+                ranking.append(
+                    {
+                        "rank": len(chosen),
+                        "id": self.ids[node],
+                        "initialOpinion": round(float(self.initial[node]), PRECISION),
+                        "marginalShift": round(-negGain, 2 * PRECISION),
+                        "cumulativeShift": round(self.direction * (current - self.baseline), 2 * PRECISION),
+                        "predictedMean": round(current, 2 * PRECISION),
+                    }
+                )
+                continue
+            tops = [heapq.heappop(heap) for _ in range(min(self.refreshColumns, len(heap)))]
+            stale = [entry[1] for entry in tops if entry[2] != len(chosen)]
+            values = self.evaluate([chosen + [node] for node in stale])
+            for node, value in zip(stale, values):
+                heapq.heappush(heap, (-self.direction * (value - current), node, len(chosen)))
+            for entry in tops:
+                if entry[2] == len(chosen):
+                    heapq.heappush(heap, entry)
+        return ranking
+
+
+def validateIntervention(network: dict, seeds: list[str], target: float, iters: int, **agentOptions) -> dict:
+    """Short agent runs of the network as is and with the seeds held stubborn at target (score and a prompt written
+    for it), from the same start. agentOptions go to agentIterate. Returns both mean-opinion paths and the shift."""
+    control = copy.deepcopy(network)
+    seeded = copy.deepcopy(network)
+    for node in seeded["nodes"]:
+        if node["id"] in seeds:
+            node["opinionScore"] = target
+            node["prompt"] = modelCall.generateOpinionPrompt(target, node.get("persona", ""))
+
+    def mean(net: dict) -> float:
+        return round(float(opinionVector(net).mean()), PRECISION)
+
+    paths = {"controlMean": [mean(control)], "seededMean": [mean(seeded)]}
+    for _ in range(iters):
+        paths["controlMean"].append(mean(agentIterate(control, **agentOptions)))
+        paths["seededMean"].append(mean(agentIterate(seeded, fixed=set(seeds), **agentOptions)))
+    return {"iters": iters, **paths, "agentShift": round(paths["seededMean"][-1] - paths["controlMean"][-1], PRECISION)}
+
+
+def saveIntervention(outputName: str, search: InterventionSearch, ranking: list[dict], validation: dict | None = None) -> dict:
+    """networks/{outputName}/ranking.json: search settings, the ranked seeds and the optional agent validation."""
+    report = {
+        "target": search.target,
+        "horizon": search.horizon,
+        "baselineMean": round(search.baseline, 2 * PRECISION),
+        "evaluations": search.evaluations,
+        "plainGreedyEvaluations": sum(len(search.ids) - r for r in range(len(ranking))),
+        "ranking": ranking,
+    }
+    if validation is not None:
+        report["validation"] = validation
+    out = networksDir / outputName
+    out.mkdir(parents=True, exist_ok=True)
+    with (out / "ranking.json").open("w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return report
@@ -0,0 +1,235 @@
+"""Out-of-core DeGroot: a row-normalized CSR memory-mapped from disk and streamed in row blocks."""
+
+import json
+import warnings
+from itertools import islice
+from multiprocessing import Pool, shared_memory
+from pathlib import Path
+from typing import Callable, Iterator
+
+import numpy as np
+from scipy import sparse
+from tqdm import tqdm
+
+from input.networkOps import _sampleOpinionScores, networksDir
+
+from ..networkArrays import PRECISION, edgeArrays, nodeIds
+
+BLOCK_EDGES = 1 << 23  # edges per row block: ~130 MB of indices, weights and float64 work arrays
+EDGE_CHUNK = 1 << 22  # edges read per chunk while building the CSR
+
+EdgeChunks = Callable[[], Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]]
+
+
+def _splitEdges(block: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    weights = block[:, 2].astype(float) if block.shape[1] > 2 else np.ones(len(block))
+    return block[:, 0].astype(np.int64), block[:, 1].astype(np.int64), weights
+
+
+def _parseRaggedEdges(lines: list[str]) -> np.ndarray:
+    """(E, 3) array from text lines whose weight column is optional per line (missing w = 1)."""
+    edges = []
+    for line in lines:
+        fields = line.split("#", 1)[0].split()
+        if fields:
+            edges.append((float(fields[0]), float(fields[1]), float(fields[2]) if len(fields) > 2 else 1.0))
+    return np.array(edges, dtype=float).reshape(-1, 3)
+
+
+def edgeListChunks(path: Path | str, chunkEdges: int = EDGE_CHUNK) -> EdgeChunks:
+    """Re-readable chunks of (rows, cols, weights) from an edge list: an .npy array of shape (E, 2|3), read through
+    a memory map, or text lines `i j [w]` ('#' comments; lines with and without w may be mixed). i listens to j
+    (like j in node i's neighbors), ids are integers 0..N-1 and w defaults to 1; list both directions for
+    undirected graphs."""
+    path = Path(path)
+
+    def chunks() -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        if path.suffix == ".npy":
+            edges = np.load(path, mmap_mode="r")
+            for start in range(0, len(edges), chunkEdges):
+                yield _splitEdges(np.asarray(edges[start : start + chunkEdges]))
+            return
+        with path.open("r", encoding="utf-8") as f:
+            while lines := list(islice(f, chunkEdges)):
+                try:
+                    with warnings.catch_warnings():
+                        warnings.simplefilter("ignore", UserWarning)  # chunk of comments only
+                        block = np.loadtxt(lines, ndmin=2, comments="#")
+                except ValueError:  # 2- and 3-column lines mixed in this chunk
+                    block = _parseRaggedEdges(lines)
+                if block.size:
+                    yield _splitEdges(block)
+
+    return chunks
+
+
+def networkChunks(network: dict) -> EdgeChunks:
+    """The links of an in-memory network as a single chunk (node index = position in network["nodes"])."""
+    return lambda: iter([edgeArrays(network, nodeIds(network))])
+
+
+def _grow(values: np.ndarray, size: int) -> np.ndarray:
+    return np.pad(values, (0, size - len(values))) if size > len(values) else values
+
+
+def buildCsr(
+    chunks: EdgeChunks,
+    outputName: str,
+    initial: np.ndarray | None = None,
+    scoreDist: str = "normal",
+    seed: int | None = None,
+) -> dict:
+    """Write networks/{outputName}/ (indptr.npy, indices.npy, data.npy, hasNeighbors.npy, meta.json) in two passes
+    over the edges: count links and weight per row, then scatter each chunk's columns and row-normalized weights
+    to their CSR offsets in the memory-mapped files. Peak memory is O(N + chunk), never O(E).
+    initial (default: N scores drawn from scoreDist) is stored as initial.npy. Returns the meta record."""
+    counts = np.zeros(0, dtype=np.int64)
+    strength = np.zeros(0)
+    n = 0 if initial is None else len(initial)
+    for rows, cols, weights in chunks():
+        if len(rows):
+            n = max(n, int(rows.max()) + 1, int(cols.max()) + 1)
+        counts = _grow(counts, n) + np.bincount(rows, minlength=n)
+        strength = _grow(strength, n) + np.bincount(rows, weights, minlength=n)
+    counts, strength = _grow(counts, n), _grow(strength, n)
+    edges = int(counts.sum())
+
+    out = networksDir / outputName
+    out.mkdir(parents=True, exist_ok=True)
+    indptr = np.lib.format.open_memmap(out / "indptr.npy", mode="w+", dtype=np.int64, shape=(n + 1,))
+    indptr[0] = 0
+    np.cumsum(counts, out=indptr[1:])
+    indexType = np.int32 if n < 2**31 else np.int64
+    indices = np.lib.format.open_memmap(out / "indices.npy", mode="w+", dtype=indexType, shape=(edges,))
+    data = np.lib.format.open_memmap(out / "data.npy", mode="w+", dtype=np.float32, shape=(edges,))
+    hasNeighbors = strength > 0
+    scale = np.divide(1.0, strength, out=np.zeros(n), where=hasNeighbors)
+    cursor = np.array(indptr[:-1])
+    for rows, cols, weights in tqdm(chunks(), desc="Building CSR", unit="chunk"):
+        order = np.argsort(rows, kind="stable")  # row-sorted chunk: writes go forward through each row's slots
+        rows, cols, weights = rows[order], cols[order], weights[order]
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]]) if len(rows) else np.zeros(0, dtype=np.int64)
+        runs = np.diff(np.r_[starts, len(rows)])
+        positions = cursor[rows] + np.arange(len(rows)) - np.repeat(starts, runs)
+        cursor[rows[starts]] += runs
+        indices[positions] = cols
+        data[positions] = weights * scale[rows]
+    for array in (indptr, indices, data):
+        array.flush()
+    del indptr, indices, data
+
+    np.save(out / "hasNeighbors.npy", hasNeighbors)
+    np.save(out / "initial.npy", _sampleOpinionScores(n, scoreDist, seed) if initial is None else np.asarray(initial, dtype=float))
+    meta = {"nodes": n, "edges": edges}
+    with (out / "meta.json").open("w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return meta
+
+
+def _openCsr(csrDir: Path) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    return (
+        np.load(csrDir / "indptr.npy", mmap_mode="r"),
+        np.load(csrDir / "indices.npy", mmap_mode="r"),
+        np.load(csrDir / "data.npy", mmap_mode="r"),
+        np.load(csrDir / "hasNeighbors.npy"),
+    )
+
+
+def _propagateBlock(csr: tuple, current: np.ndarray, following: np.ndarray, start: int, stop: int) -> float:
+    """following[start:stop] = rows start..stop of W @ current (rows without links keep their score); returns max |change|."""
+    indptr, indices, data, hasNeighbors = csr
+    lo, hi = int(indptr[start]), int(indptr[stop])
+    block = sparse.csr_matrix(
+        (data[lo:hi], indices[lo:hi], np.asarray(indptr[start : stop + 1]) - lo),
+        shape=(stop - start, len(current)),
+    )
+    scores = np.where(hasNeighbors[start:stop], block @ current, current[start:stop])
+    np.clip(scores, 0.0, 1.0, out=scores)
+    np.round(scores, PRECISION, out=scores)
+    following[start:stop] = scores
+    return float(np.abs(scores - current[start:stop]).max(initial=0.0))
+
+
+_worker: dict = {}
+
+
+def _initWorker(csrDir: Path, bufferNames: tuple[str, str], n: int) -> None:
+    _worker["csr"] = _openCsr(csrDir)
+    _worker["shm"] = [shared_memory.SharedMemory(name=name) for name in bufferNames]
+    _worker["buffers"] = [np.ndarray((n,), dtype=float, buffer=shm.buf) for shm in _worker["shm"]]
+
+
+def _workerBlock(start: int, stop: int, parity: int) -> float:
+    buffers = _worker["buffers"]
+    return _propagateBlock(_worker["csr"], buffers[parity], buffers[1 - parity], start, stop)
+
+
+class OutOfCoreDegroot:
+    """DeGroot x(t+1) = W x(t) over a CSR written by buildCsr, same update and rounding as degrootIterate.
+
+    Each step walks the row blocks (about blockEdges links each) and maps only that slice of indices/data into
+    memory, so RAM holds the two score vectors (current, next: 16 bytes per node), one block and the OS page cache.
+    With workers > 1 the score vectors live in shared memory and the blocks of a step are spread over worker
+    processes that map the CSR files themselves; nothing of size E is ever pickled. Call close() when done.
+    """
+
+    def __init__(self, csrDir: Path, scores: np.ndarray | None = None, blockEdges: int = BLOCK_EDGES, workers: int = 1) -> None:
+        self.csrDir = Path(csrDir)
+        self.csr = _openCsr(self.csrDir)
+        indptr = self.csr[0]
+        n = len(indptr) - 1
+        starts = np.searchsorted(indptr, np.arange(0, int(indptr[-1]), max(blockEdges, 1)), side="right") - 1
+        bounds = np.unique(np.r_[0, starts, n])
+        self.blocks = [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:])]
+        self.steps = 0
+        self.pool = None
+        if workers > 1:
+            self._shm = [shared_memory.SharedMemory(create=True, size=max(8 * n, 1)) for _ in range(2)]
+            self._buffers = [np.ndarray((n,), dtype=float, buffer=shm.buf) for shm in self._shm]
+            self.pool = Pool(workers, _initWorker, (self.csrDir, tuple(shm.name for shm in self._shm), n))
+        else:
+            self._buffers = [np.empty(n), np.empty(n)]
+        self._buffers[0][:] = np.load(self.csrDir / "initial.npy") if scores is None else scores
+        self._parity = 0
+
+    @property
+    def scores(self) -> np.ndarray:
+        return self._buffers[self._parity]
+
+    def step(self) -> float:
+        """Advance one step; returns the largest opinion change."""
+        if self.pool is not None:
+            changes = self.pool.starmap(_workerBlock, [(a, b, self._parity) for a, b in self.blocks])
+        else:
+            current, following = self._buffers[self._parity], self._buffers[1 - self._parity]
+            changes = [_propagateBlock(self.csr, current, following, a, b) for a, b in self.blocks]
+        self._parity = 1 - self._parity
+        self.steps += 1
+        return max(changes, default=0.0)
+
+    def run(self, iters: int, outputName: str, snapshotEvery: int = 1) -> float:
+        """iters steps with networks/{outputName}/iter{k}.npy snapshots every snapshotEvery steps (iter0 and the last
+        step always) and one {"iter", "maxDiff"} line per step in telemetry.jsonl. Returns the last maxDiff."""
+        out = networksDir / outputName
+        out.mkdir(parents=True, exist_ok=True)
+        telemetryPath = out / "telemetry.jsonl"
+        telemetryPath.unlink(missing_ok=True)
+        np.save(out / "iter0.npy", self.scores)
+        maxDiff = 0.0
+        for i in tqdm(range(1, iters + 1), desc="Out-of-core DeGroot", unit="step"):
+            maxDiff = self.step()
+            if i % max(snapshotEvery, 1) == 0 or i == iters:
+                np.save(out / f"iter{i}.npy", self.scores)
+            with telemetryPath.open("a", encoding="utf-8") as f:
+                f.write(json.dumps({"iter": i, "maxDiff": round(maxDiff, PRECISION)}) + "\n")
+        return maxDiff
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+            self._buffers = [buffer.copy() for buffer in self._buffers]
+            for shm in self._shm:
+                shm.close()
+                shm.unlink()
@@ -0,0 +1,47 @@
+"""Network dict <-> numpy/scipy arrays for the vectorized baseline engines."""
+
+import numpy as np
+from scipy import sparse
+
+PRECISION = 6
+
+
+def nodeIds(network: dict) -> list[str]:
+    return [n["id"] for n in network.get("nodes", [])]
+
+
+def edgeArrays(network: dict, ids: list[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(rows, cols, weights) with one entry per neighbor link i -> j (j influences i); unknown neighbor ids are skipped."""
+    index = {nid: i for i, nid in enumerate(ids)}
+    rows: list[int] = []
+    cols: list[int] = []
+    weights: list[float] = []
+    for i, node in enumerate(network.get("nodes", [])):
+        for jid, wij in node.get("neighbors", {}).items():
+            j = index.get(jid)
+            if j is not None:
+                rows.append(i)
+                cols.append(j)
+                weights.append(float(wij))
+    return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64), np.array(weights, dtype=float)
+
+
+def influenceMatrix(network: dict, ids: list[str]) -> tuple[sparse.csr_matrix, np.ndarray]:
+    """Row-stochastic W (W[i, j] = w_ij / sum_j w_ij, as in degrootIterate) and the mask of rows with positive weight."""
+    rows, cols, weights = edgeArrays(network, ids)
+    n = len(ids)
+    matrix = sparse.csr_matrix((weights, (rows, cols)), shape=(n, n))
+    totals = np.asarray(matrix.sum(axis=1)).ravel()
+    hasNeighbors = totals > 0
+    scale = np.divide(1.0, totals, out=np.zeros(n), where=hasNeighbors)
+    return sparse.csr_matrix(sparse.diags(scale) @ matrix), hasNeighbors
+
+
+def opinionVector(network: dict, field: str = "opinionScore") -> np.ndarray:
+    return np.array([float(n[field]) for n in network.get("nodes", [])])
+
+
+def writeOpinions(network: dict, scores: np.ndarray) -> None:
+    """Store scores (node order) as opinionScore, clipped to [0, 1] and rounded like the other models."""
+    for node, score in zip(network.get("nodes", []), np.clip(scores, 0.0, 1.0)):
+        node["opinionScore"] = round(float(score), PRECISION)
@@ -4,18 +4,27 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import math
+import os
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Sequence, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 import matplotlib.pyplot as plt
 import networkx as nx
 import numpy as np
 from matplotlib import colors as mcolors
 from matplotlib.cm import ScalarMappable
+from matplotlib.collections import LineCollection
+from scipy import ndimage
+
+from network_layout import network_layout
+from streaming_stats import DEFAULT_BINS, SCORE_HISTOGRAM_EDGES, StepHistograms, summarize_slices
 
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
@@ -23,6 +32,20 @@ NETWORKS_DIR = PROJECT_ROOT / "networks"
 PLOTS_DIR = PROJECT_ROOT / "plots"
 VISUALIZATION_DIR = PROJECT_ROOT / "src" / "visualization"
 DEFAULT_OUTPUT_DIR = VISUALIZATION_DIR / "output"
+SERIES_CACHE_NAME = ".series_cache.npz"
+SERIES_CACHE_VERSION = 1
+CLOUD_GRID_SIZE = 180
+LARGE_N_THRESHOLD = 2000  # node count above which the large-N rendering mode switches on
+HEATMAP_MAX_ROWS = 600  # heatmap rows after binning in large-N mode
+TRAJECTORY_DENSITY_BINS = 200  # opinion bins of the trajectory density image in large-N mode
+MANIFEST_NAME = "manifest.json"
+WATCH_FIGURES = ("median_band", "echo_chamber", "cross_cutting", "distribution")  # redrawn while watching
+SLICES_SUFFIXES = {
+    "_agent_slices": "agent",
+    "_degroot_slices": "degroot",
+    "_fj_slices": "fj",
+    "_bc_slices": "bc",
+}  # dir suffix -> iteration model
 
 
 def _discover_from_dir(search_dir: Path) -> List[Tuple[Path, Path]]:
@@ -41,8 +64,8 @@ def _discover_from_dir(search_dir: Path) -> List[Tuple[Path, Path]]:
                 json_path = search_dir / f"{base}.json"
             else:
                 json_path = json_candidates[0]
-        elif d.name.endswith("_degroot_slices"):
-            base = d.name.replace("_degroot_slices", "")
+        elif d.name.endswith(tuple(SLICES_SUFFIXES)):
+            base = d.name[: d.name.rindex("_", 0, -len("_slices"))]
             json_path = search_dir / f"{base}.json"
         else:
             continue
@@ -63,8 +86,8 @@ def discover_network_slice_pairs() -> List[Tuple[Path, Path]]:
                 base = d.name.replace("_agent_slices", "")
                 json_candidates = list(NETWORKS_DIR.glob(f"{base}_*.json"))
                 json_path = NETWORKS_DIR / f"{base}.json" if not json_candidates else json_candidates[0]
-            elif d.name.endswith("_degroot_slices"):
-                base = d.name.replace("_degroot_slices", "")
+            elif d.name.endswith(tuple(SLICES_SUFFIXES)):
+                base = d.name[: d.name.rindex("_", 0, -len("_slices"))]
                 json_path = NETWORKS_DIR / f"{base}.json"
             else:
                 continue
@@ -173,13 +196,15 @@ class SharpMidpointNormalize(mcolors.Normalize):
 
 
 def infer_graph_type_and_iteration(network_name: str, slices_dir_name: str) -> Tuple[str, str]:
-    """Infer graph type (ER/SW/SF/KC) and iteration (agent/degroot) from names."""
+    """Infer graph type (ER/SW/SF/KC) and iteration (agent/degroot/fj/bc) from names."""
     graph_type = "other"
     for g in ("ER", "SW", "SF", "KC"):
         if f"_{g}_" in network_name or network_name.endswith(f"_{g}") or f"_{g}_" in slices_dir_name:
             graph_type = g
             break
-    iteration = "agent" if "agent" in slices_dir_name else ("degroot" if "degroot" in slices_dir_name else "other")
+    iteration = next((model for suffix, model in SLICES_SUFFIXES.items() if slices_dir_name.endswith(suffix)), None)
+    if iteration is None:
+        iteration = "agent" if "agent" in slices_dir_name else ("degroot" if "degroot" in slices_dir_name else "other")
     return graph_type, iteration
 
 
@@ -274,6 +299,56 @@ def parse_args() -> argparse.Namespace:
         default=5,
         help="Rolling-mean window for the influential-edge trend curve.",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for rendering; pairs and the figures within a pair run in parallel when > 1.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Always re-read snapshot JSON instead of the per-slices-directory {SERIES_CACHE_NAME}.",
+    )
+    parser.add_argument(
+        "--large-n-threshold",
+        type=int,
+        default=LARGE_N_THRESHOLD,
+        help="Node count above which heatmap rows are binned, trajectories become a density image and dense artists are rasterized.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help=f"Re-render every figure, even those whose inputs are unchanged according to {MANIFEST_NAME}.",
+    )
+    parser.add_argument(
+        "--streaming-stats",
+        action="store_true",
+        help="Compute the median band and score histogram from per-step histograms streamed one slice at a time.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Tail --slices-dir while a simulation writes it and keep a small figure set up to date.",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between polls of the slices directory in --watch mode.",
+    )
+    parser.add_argument(
+        "--watch-every",
+        type=int,
+        default=1,
+        help="Redraw the watch figures after this many new snapshots.",
+    )
+    parser.add_argument(
+        "--watch-timeout",
+        type=float,
+        default=600.0,
+        help="Stop watching (and render the full figure set) after this many seconds without a new snapshot.",
+    )
     return parser.parse_args()
 
 
@@ -312,7 +387,19 @@ def build_graph(network_data: dict) -> nx.Graph:
     return graph
 
 
-def load_series(network_json: Path, slices_dir: Path) -> SeriesData:
+def snapshot_column(path: Path, node_index: Dict[str, int], column: int) -> Tuple[int, np.ndarray]:
+    """Step number (from the file name, else column) and opinion column of one snapshot; NaN where a node is absent."""
+    snapshot = load_json(path)
+    match = re.search(r"(\d+)", path.stem)
+    values = np.full(len(node_index), np.nan, dtype=float)
+    for node in snapshot.get("nodes", []):
+        row = node_index.get(str(node["id"]))
+        if row is not None:
+            values[row] = float(node["opinionScore"])
+    return (int(match.group(1)) if match else column), values
+
+
+def _load_series_from_json(network_json: Path, slices_dir: Path) -> SeriesData:
     network_data = load_json(network_json)
     graph = build_graph(network_data)
     node_ids = sorted((str(node["id"]) for node in network_data.get("nodes", [])), key=natural_key)
@@ -326,14 +413,8 @@ def load_series(network_json: Path, slices_dir: Path) -> SeriesData:
     opinion_matrix = np.full((len(node_ids), len(files)), np.nan, dtype=float)
 
     for column, path in enumerate(files):
-        snapshot = load_json(path)
-        match = re.search(r"(\d+)", path.stem)
-        steps.append(int(match.group(1)) if match else column)
-        for node in snapshot.get("nodes", []):
-            node_id = str(node["id"])
-            if node_id not in node_index:
-                continue
-            opinion_matrix[node_index[node_id], column] = float(node["opinionScore"])
+        step, opinion_matrix[:, column] = snapshot_column(path, node_index, column)
+        steps.append(step)
 
     if np.isnan(opinion_matrix).any():
         missing_nodes, missing_steps = np.where(np.isnan(opinion_matrix))
@@ -351,6 +432,93 @@ def load_series(network_json: Path, slices_dir: Path) -> SeriesData:
     )
 
 
+def _stat_signature(files: Sequence[Path]) -> str:
+    return json.dumps([[path.name, path.stat().st_size, path.stat().st_mtime_ns] for path in files])
+
+
+def _content_hash(files: Sequence[Path]) -> str:
+    digest = hashlib.sha256()
+    for path in files:
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _write_series_cache(cache_path: Path, series: SeriesData, stat_signature: str, content_hash: str) -> None:
+    edges = list(series.graph.edges(data="weight"))
+    arrays = {
+        "version": np.array(SERIES_CACHE_VERSION),
+        "stat_signature": np.array(stat_signature),
+        "content_hash": np.array(content_hash),
+        "network_name": np.array(series.network_name),
+        "node_ids": np.array(series.node_ids, dtype=str),
+        "steps": np.array(series.steps, dtype=np.int64),
+        "opinion_matrix": series.opinion_matrix,
+        "graph_nodes": np.array(list(series.graph.nodes()), dtype=str),
+        "edge_src": np.array([source for source, _, _ in edges], dtype=str),
+        "edge_dst": np.array([target for _, target, _ in edges], dtype=str),
+        "edge_weight": np.array([weight for _, _, weight in edges], dtype=float),
+        "pagerank": np.array([series.pagerank[node_id] for node_id in series.node_ids], dtype=float),
+    }
+    temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        with temp_path.open("wb") as handle:
+            np.savez(handle, **arrays)
+        os.replace(temp_path, cache_path)
+    except OSError as exc:  # read-only data dirs just skip caching
+        temp_path.unlink(missing_ok=True)
+        print(f"  (series cache not written: {exc})")
+
+
+def _series_from_cache(cached) -> SeriesData:
+    graph = nx.Graph()
+    graph.add_nodes_from(cached["graph_nodes"].tolist())
+    graph.add_weighted_edges_from(
+        zip(cached["edge_src"].tolist(), cached["edge_dst"].tolist(), cached["edge_weight"].tolist())
+    )
+    node_ids = cached["node_ids"].tolist()
+    return SeriesData(
+        steps=cached["steps"].tolist(),
+        node_ids=node_ids,
+        opinion_matrix=np.array(cached["opinion_matrix"], dtype=float),
+        graph=graph,
+        pagerank=dict(zip(node_ids, cached["pagerank"].tolist())),
+        network_name=str(cached["network_name"]),
+    )
+
+
+def load_series(network_json: Path, slices_dir: Path, use_cache: bool = True) -> SeriesData:
+    """Load a trajectory, reusing slices_dir/.series_cache.npz while its inputs are unchanged.
+
+    The cache is trusted when file names, sizes and mtimes match; otherwise the content hash decides,
+    so touched-but-identical files only refresh the signature. Anything else rebuilds from JSON.
+    """
+    files = [network_json] + sorted_json_files(slices_dir)
+    cache_path = slices_dir / SERIES_CACHE_NAME
+    if not use_cache:
+        return _load_series_from_json(network_json, slices_dir)
+
+    stat_signature = _stat_signature(files)
+    content_hash = None
+    if cache_path.exists():
+        try:
+            with np.load(cache_path) as cached:
+                if int(cached["version"]) == SERIES_CACHE_VERSION:
+                    if str(cached["stat_signature"]) == stat_signature:
+                        return _series_from_cache(cached)
+                    content_hash = _content_hash(files)
+                    if str(cached["content_hash"]) == content_hash:
+                        series = _series_from_cache(cached)
+                        _write_series_cache(cache_path, series, stat_signature, content_hash)
+                        return series
+        except (OSError, KeyError, ValueError) as exc:
+            print(f"  (ignoring unreadable series cache {cache_path}: {exc})")
+
+    series = _load_series_from_json(network_json, slices_dir)
+    _write_series_cache(cache_path, series, stat_signature, content_hash or _content_hash(files))
+    return series
+
+
 def moving_average(values: np.ndarray, window: int) -> np.ndarray:
     if window <= 1:
         return values.copy()
@@ -398,10 +566,24 @@ def apply_remote_rto_colorbar(colorbar) -> None:
     colorbar.set_label(REMOTE_RTO_SCALE_LABEL)
 
 
-def plot_sorted_heatmap(series: SeriesData, output_path: Path, max_y_ticks: int, dpi: int) -> None:
+def bin_rows(matrix: np.ndarray, max_rows: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Average consecutive rows into at most max_rows bins; returns (binned matrix, first row index of each bin)."""
+    starts = np.unique(np.linspace(0, matrix.shape[0], max_rows, endpoint=False, dtype=int))
+    counts = np.diff(np.append(starts, matrix.shape[0]))
+    return np.add.reduceat(matrix, starts, axis=0) / counts[:, None], starts
+
+
+def plot_sorted_heatmap(
+    series: SeriesData, output_path: Path, max_y_ticks: int, dpi: int, large_n_threshold: int = LARGE_N_THRESHOLD
+) -> None:
     final_order = np.argsort(series.opinion_matrix[:, -1])
     sorted_matrix = series.opinion_matrix[final_order]
     sorted_ids = [series.node_ids[index] for index in final_order]
+    y_label = "Node ID (all nodes shown, ordered by final Remote-vs-RTO position)"
+    if len(sorted_ids) > large_n_threshold:
+        sorted_matrix, starts = bin_rows(sorted_matrix, HEATMAP_MAX_ROWS)
+        sorted_ids = [sorted_ids[start] for start in starts]
+        y_label = f"Node ID (first of each bin; {len(final_order)} nodes in {len(starts)} bins, ordered by final position)"
     heatmap_norm = SharpMidpointNormalize(vmin=0.0, vmax=1.0, midpoint=0.5, center_band=0.09, exponent=0.72)
 
     fig, ax = plt.subplots(figsize=(11, 8))
@@ -421,7 +603,7 @@ def plot_sorted_heatmap(series: SeriesData, output_path: Path, max_y_ticks: int,
     ax.set_xticks(x_positions)
     ax.set_xticklabels(x_labels)
     ax.set_xlabel("Time step")
-    ax.set_ylabel("Node ID (all nodes shown, ordered by final Remote-vs-RTO position)")
+    ax.set_ylabel(y_label)
     ax.set_title("Sorted Heatmap of Remote-vs-RTO Trajectories")
 
     colorbar = fig.colorbar(image, ax=ax, pad=0.02)
@@ -429,7 +611,16 @@ def plot_sorted_heatmap(series: SeriesData, output_path: Path, max_y_ticks: int,
     save_figure(fig, output_path, dpi)
 
 
-def plot_highlighted_trajectories(series: SeriesData, output_path: Path, dpi: int) -> None:
+def trajectory_density(steps: np.ndarray, matrix: np.ndarray, bins: int) -> np.ndarray:
+    """(bins x steps) node counts per opinion bin and step, for drawing many trajectories as one image."""
+    rows = np.clip((matrix * bins).astype(int), 0, bins - 1)
+    flat = rows * len(steps) + np.arange(len(steps))[None, :]
+    return np.bincount(flat.ravel(), minlength=bins * len(steps)).reshape(bins, len(steps)).astype(float)
+
+
+def plot_highlighted_trajectories(
+    series: SeriesData, output_path: Path, dpi: int, large_n_threshold: int = LARGE_N_THRESHOLD
+) -> None:
     steps = np.array(series.steps)
     final_scores = series.opinion_matrix[:, -1]
     min_node = series.node_ids[int(np.argmin(final_scores))]
@@ -454,11 +645,25 @@ def plot_highlighted_trajectories(series: SeriesData, output_path: Path, dpi: in
         }
 
     fig, ax = plt.subplots(figsize=(11.5, 7))
-    for row, node_id in enumerate(series.node_ids):
-        values = series.opinion_matrix[row]
-        if node_id in highlight_specs:
-            continue
-        ax.plot(steps, values, color="#b3b3b3", linewidth=1.0, alpha=0.45, zorder=1)
+    background = np.array([node_id not in highlight_specs for node_id in series.node_ids])
+    if len(series.node_ids) > large_n_threshold:
+        density = trajectory_density(steps, series.opinion_matrix[background], TRAJECTORY_DENSITY_BINS)
+        ax.imshow(
+            np.ma.masked_equal(density, 0.0),
+            aspect="auto",
+            origin="lower",
+            extent=(steps[0], steps[-1], 0.0, 1.0),
+            cmap="Greys",
+            norm=mcolors.LogNorm(vmin=1.0, vmax=max(density.max(), 1.0)),
+            interpolation="bilinear",
+            alpha=0.8,
+            zorder=1,
+            rasterized=True,
+        )
+    else:
+        # Individual lines rather than a LineCollection: loc="best" legend placement only avoids Line2D data
+        for values in series.opinion_matrix[background]:
+            ax.plot(steps, values, color="#b3b3b3", linewidth=1.0, alpha=0.45, zorder=1)
 
     for node_id, spec in highlight_specs.items():
         row = series.node_ids.index(node_id)
@@ -482,12 +687,35 @@ def plot_highlighted_trajectories(series: SeriesData, output_path: Path, dpi: in
     save_figure(fig, output_path, dpi)
 
 
-def plot_shaded_median_area(series: SeriesData, output_path: Path, window: int, dpi: int) -> None:
-    steps = np.array(series.steps)
+def compute_median_band(series: SeriesData) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-step 10th percentile, median and 90th percentile of the opinions."""
     lower_band = np.quantile(series.opinion_matrix, 0.10, axis=0)
     upper_band = np.quantile(series.opinion_matrix, 0.90, axis=0)
     median_line = np.median(series.opinion_matrix, axis=0)
+    return lower_band, median_line, upper_band
 
+
+def plot_shaded_median_area(
+    series: SeriesData,
+    output_path: Path,
+    window: int,
+    dpi: int,
+    band: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None,
+) -> None:
+    lower_band, median_line, upper_band = band if band is not None else compute_median_band(series)
+    draw_median_band(series.steps, lower_band, median_line, upper_band, output_path, window, dpi)
+
+
+def draw_median_band(
+    steps: Sequence[int],
+    lower_band: np.ndarray,
+    median_line: np.ndarray,
+    upper_band: np.ndarray,
+    output_path: Path,
+    window: int,
+    dpi: int,
+) -> None:
+    steps = np.array(steps)
     smoothed_lower = moving_average(lower_band, window)
     smoothed_upper = moving_average(upper_band, window)
 
@@ -510,16 +738,26 @@ def plot_shaded_median_area(series: SeriesData, output_path: Path, window: int,
     save_figure(fig, output_path, dpi)
 
 
-def edge_influence_series(series: SeriesData) -> Dict[Tuple[str, str], np.ndarray]:
+def edge_index_arrays(series: SeriesData) -> Tuple[List[Tuple[str, str]], np.ndarray, np.ndarray, np.ndarray]:
+    """Edges in graph order plus (src, dst) row indices into opinion_matrix and edge weights."""
     node_index = {node_id: idx for idx, node_id in enumerate(series.node_ids)}
-    influences: Dict[Tuple[str, str], np.ndarray] = {}
-    for source, target, data in series.graph.edges(data=True):
-        weight = float(data.get("weight", 1.0))
-        values = weight * np.abs(
-            series.opinion_matrix[node_index[source]] - series.opinion_matrix[node_index[target]]
-        )
-        influences[(source, target)] = values
-    return influences
+    edges = list(series.graph.edges(data=True))
+    src = np.fromiter((node_index[source] for source, _, _ in edges), dtype=np.int64, count=len(edges))
+    dst = np.fromiter((node_index[target] for _, target, _ in edges), dtype=np.int64, count=len(edges))
+    weights = np.fromiter((float(data.get("weight", 1.0)) for _, _, data in edges), dtype=float, count=len(edges))
+    return [(source, target) for source, target, _ in edges], src, dst, weights
+
+
+def edge_influence_matrix(series: SeriesData) -> Tuple[List[Tuple[str, str]], np.ndarray]:
+    """C_uv(t) = w_uv * |x_u(t) - x_v(t)| for every edge (rows) and step (columns) at once."""
+    edges, src, dst, weights = edge_index_arrays(series)
+    matrix = series.opinion_matrix
+    return edges, weights[:, None] * np.abs(matrix[src] - matrix[dst])
+
+
+def edge_influence_series(series: SeriesData) -> Dict[Tuple[str, str], np.ndarray]:
+    edges, influence = edge_influence_matrix(series)
+    return {edge: influence[row] for row, edge in enumerate(edges)}
 
 
 def select_most_influential_edge(influences: Dict[Tuple[str, str], np.ndarray]) -> Tuple[Tuple[str, str], np.ndarray]:
@@ -581,21 +819,36 @@ def fallback_edge_correlation(graph: nx.Graph, opinions: Dict[str, float]) -> fl
 
 
 def compute_echo_chamber_index(series: SeriesData) -> np.ndarray:
-    values = []
-    node_index = {node_id: idx for idx, node_id in enumerate(series.node_ids)}
-    for column in range(series.opinion_matrix.shape[1]):
-        opinions = {node_id: float(series.opinion_matrix[node_index[node_id], column]) for node_id in series.node_ids}
-        nx.set_node_attributes(series.graph, opinions, "opinion")
-        coefficient = nx.numeric_assortativity_coefficient(series.graph, "opinion")
-        if np.isnan(coefficient):
-            coefficient = fallback_edge_correlation(series.graph, opinions)
-        values.append(float(coefficient))
-    return np.array(values, dtype=float)
+    """Numeric assortativity of opinions for every step in one pass.
+
+    Same quantity as nx.numeric_assortativity_coefficient: the Pearson correlation over both
+    orientations of every edge. Steps where it is undefined use fallback_edge_correlation.
+    """
+    _, src, dst, _ = edge_index_arrays(series)
+    matrix = series.opinion_matrix
+    n_steps = matrix.shape[1]
+    if src.size == 0:
+        return np.full(n_steps, np.nan)
+    ends_a = np.concatenate([matrix[src], matrix[dst]])
+    ends_b = np.concatenate([matrix[dst], matrix[src]])
+    centered_a = ends_a - ends_a.mean(axis=0)
+    centered_b = ends_b - ends_b.mean(axis=0)
+    variance = np.mean(centered_a ** 2, axis=0)
+    covariance = np.mean(centered_a * centered_b, axis=0)
+    values = np.full(n_steps, np.nan)
+    defined = np.ptp(ends_a, axis=0) > 0.0
+    values[defined] = covariance[defined] / variance[defined]
+    for column in np.flatnonzero(~defined):
+        opinions = {node_id: float(matrix[row, column]) for row, node_id in enumerate(series.node_ids)}
+        values[column] = fallback_edge_correlation(series.graph, opinions)
+    return values
 
 
-def plot_echo_chamber_index(series: SeriesData, output_path: Path, dpi: int) -> np.ndarray:
+def plot_echo_chamber_index(
+    series: SeriesData, output_path: Path, dpi: int, values: Optional[np.ndarray] = None
+) -> np.ndarray:
     steps = np.array(series.steps)
-    values = compute_echo_chamber_index(series)
+    values = values if values is not None else compute_echo_chamber_index(series)
 
     fig, ax = plt.subplots(figsize=(11.2, 5.8))
     ax.plot(steps, values, color="#37474f", linewidth=2.5)
@@ -610,28 +863,22 @@ def plot_echo_chamber_index(series: SeriesData, output_path: Path, dpi: int) ->
 
 
 def compute_cross_cutting_ratio(series: SeriesData, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
-    node_index = {node_id: idx for idx, node_id in enumerate(series.node_ids)}
+    _, src, dst, _ = edge_index_arrays(series)
     total_edges = max(series.graph.number_of_edges(), 1)
-    cross = []
-    internal = []
-
-    for column in range(series.opinion_matrix.shape[1]):
-        opinions = {node_id: float(series.opinion_matrix[node_index[node_id], column]) for node_id in series.node_ids}
-        cross_edges = 0
-        for source, target in series.graph.edges():
-            source_camp = opinions[source] >= threshold
-            target_camp = opinions[target] >= threshold
-            if source_camp != target_camp:
-                cross_edges += 1
-        cross_ratio = 100.0 * cross_edges / total_edges
-        cross.append(cross_ratio)
-        internal.append(100.0 - cross_ratio)
-
-    return np.array(internal, dtype=float), np.array(cross, dtype=float)
-
-
-def plot_cross_cutting_ratio(series: SeriesData, output_path: Path, threshold: float, dpi: int) -> np.ndarray:
-    internal, cross = compute_cross_cutting_ratio(series, threshold)
+    camps = series.opinion_matrix >= threshold
+    cross_edges = np.count_nonzero(camps[src] != camps[dst], axis=0)
+    cross = 100.0 * cross_edges / total_edges
+    return 100.0 - cross, cross.astype(float)
+
+
+def plot_cross_cutting_ratio(
+    series: SeriesData,
+    output_path: Path,
+    threshold: float,
+    dpi: int,
+    ratios: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> np.ndarray:
+    internal, cross = ratios if ratios is not None else compute_cross_cutting_ratio(series, threshold)
     steps = np.array(series.steps)
 
     fig, ax = plt.subplots(figsize=(11.2, 6.0))
@@ -665,6 +912,36 @@ def compute_bounds(position_sets: Iterable[Dict[str, Tuple[float, float]]]) -> T
     return (min(xs) - x_pad, max(xs) + x_pad), (min(ys) - y_pad, max(ys) + y_pad)
 
 
+def gaussian_density_grid(
+    points: np.ndarray,
+    xlim: Tuple[float, float],
+    ylim: Tuple[float, float],
+    sigma_x: float,
+    sigma_y: float,
+    grid_size: int = CLOUD_GRID_SIZE,
+) -> np.ndarray:
+    """Sum of per-point Gaussians sampled on a grid_size x grid_size grid (rows = y).
+
+    Points are bilinearly splatted onto the grid and blurred with a separable Gaussian, so the
+    cost is O(N + grid cells) instead of one full-grid exponential per point.
+    """
+    step_x = (xlim[1] - xlim[0]) / (grid_size - 1)
+    step_y = (ylim[1] - ylim[0]) / (grid_size - 1)
+    frac_x = np.clip((points[:, 0] - xlim[0]) / step_x, 0.0, grid_size - 1.0)
+    frac_y = np.clip((points[:, 1] - ylim[0]) / step_y, 0.0, grid_size - 1.0)
+    col = np.minimum(np.floor(frac_x).astype(int), grid_size - 2)
+    row = np.minimum(np.floor(frac_y).astype(int), grid_size - 2)
+    tx = frac_x - col
+    ty = frac_y - row
+
+    counts = np.zeros((grid_size, grid_size), dtype=float)
+    np.add.at(counts, (row, col), (1.0 - tx) * (1.0 - ty))
+    np.add.at(counts, (row, col + 1), tx * (1.0 - ty))
+    np.add.at(counts, (row + 1, col), (1.0 - tx) * ty)
+    np.add.at(counts, (row + 1, col + 1), tx * ty)
+    return ndimage.gaussian_filter(counts, sigma=(sigma_y / step_y, sigma_x / step_x), mode="constant", truncate=4.0)
+
+
 def add_cluster_cloud(
     ax: plt.Axes,
     positions: Dict[str, Tuple[float, float]],
@@ -675,21 +952,14 @@ def add_cluster_cloud(
 ) -> None:
     if not nodes:
         return
-    x_grid = np.linspace(xlim[0], xlim[1], 180)
-    y_grid = np.linspace(ylim[0], ylim[1], 180)
+    x_grid = np.linspace(xlim[0], xlim[1], CLOUD_GRID_SIZE)
+    y_grid = np.linspace(ylim[0], ylim[1], CLOUD_GRID_SIZE)
     xx, yy = np.meshgrid(x_grid, y_grid)
-    density = np.zeros_like(xx)
 
     sigma_x = max((xlim[1] - xlim[0]) * 0.055, 0.11)
     sigma_y = max((ylim[1] - ylim[0]) * 0.055, 0.11)
-    for node_id in nodes:
-        x_coord, y_coord = positions[node_id]
-        density += np.exp(
-            -(
-                ((xx - x_coord) ** 2) / (2.0 * sigma_x ** 2)
-                + ((yy - y_coord) ** 2) / (2.0 * sigma_y ** 2)
-            )
-        )
+    points = np.array([positions[node_id] for node_id in nodes], dtype=float)
+    density = gaussian_density_grid(points, xlim, ylim, sigma_x, sigma_y)
 
     peak = float(density.max())
     if peak <= 0.0:
@@ -715,17 +985,27 @@ def draw_network_panel(
     title: str,
     xlim: Tuple[float, float],
     ylim: Tuple[float, float],
+    large_n: bool = False,
 ) -> None:
+    """large_n rasterizes edges and nodes (keeps vector outputs small) and drops node outlines."""
     camp_a = [node_id for node_id, value in opinions.items() if value < threshold]
     camp_b = [node_id for node_id, value in opinions.items() if value >= threshold]
 
     add_cluster_cloud(ax, positions, camp_a, "#f4bcc2", xlim, ylim)
     add_cluster_cloud(ax, positions, camp_b, "#bfd7fb", xlim, ylim)
 
-    for source, target in graph.edges():
-        xs = [positions[source][0], positions[target][0]]
-        ys = [positions[source][1], positions[target][1]]
-        ax.plot(xs, ys, color="#9e9e9e", linewidth=0.85, alpha=0.42, zorder=1)
+    segments = [(positions[source], positions[target]) for source, target in graph.edges()]
+    ax.add_collection(
+        LineCollection(
+            segments,
+            colors="#9e9e9e",
+            linewidths=0.85,
+            alpha=0.42,
+            capstyle="projecting",
+            zorder=1,
+            rasterized=large_n,
+        )
+    )
 
     node_ids = sorted(graph.nodes(), key=natural_key)
     x_points = [positions[node_id][0] for node_id in node_ids]
@@ -741,9 +1021,10 @@ def draw_network_panel(
         vmin=0.0,
         vmax=1.0,
         edgecolors="white",
-        linewidths=0.9,
+        linewidths=0.0 if large_n else 0.9,
         alpha=0.97,
         zorder=2,
+        rasterized=large_n,
     )
 
     ax.set_xlim(*xlim)
@@ -763,21 +1044,31 @@ def draw_network_panel(
     )
 
 
-def plot_distribution_infographic(series: SeriesData, output_path: Path, threshold: float, layout_seed: int, dpi: int) -> None:
+def network_positions(series: SeriesData, layout_seed: int) -> Dict[str, Tuple[float, float]]:
+    """The cached layout shared by every network panel and animation of this topology."""
+    k_layout = max(3.2, 5.0 / (series.graph.number_of_nodes() ** 0.5))  # spread nodes apart, avoid overlap
+    return network_layout(series.graph, seed=layout_seed, k=k_layout, scale=2.6)
+
+
+def plot_distribution_infographic(
+    series: SeriesData,
+    output_path: Path,
+    threshold: float,
+    layout_seed: int,
+    dpi: int,
+    large_n_threshold: int = LARGE_N_THRESHOLD,
+) -> None:
     n_nodes = series.graph.number_of_nodes()
-    k_layout = max(3.2, 5.0 / (n_nodes ** 0.5))  # spread nodes apart, avoid overlap
-    base_positions = {
-        node_id: (float(coords[0]), float(coords[1]))
-        for node_id, coords in nx.spring_layout(
-            series.graph, seed=layout_seed, weight="weight", k=k_layout, scale=2.6
-        ).items()
-    }
+    base_positions = network_positions(series, layout_seed)
     node_index = {node_id: idx for idx, node_id in enumerate(series.node_ids)}
     start_opinions = {node_id: float(series.opinion_matrix[node_index[node_id], 0]) for node_id in series.node_ids}
     end_opinions = {node_id: float(series.opinion_matrix[node_index[node_id], -1]) for node_id in series.node_ids}
 
     xlim, ylim = compute_bounds([base_positions])
     sizes = scale_sizes(series.pagerank, minimum=60.0, maximum=280.0)  # smaller nodes for distribution plot
+    large_n = n_nodes > large_n_threshold
+    if large_n:
+        sizes = {node_id: size * large_n_threshold / n_nodes for node_id, size in sizes.items()}
 
     fig, axes = plt.subplots(1, 2, figsize=(15.5, 7.6), facecolor="white")
     fig.suptitle("Remote vs. RTO Network Distribution: Beginning vs End", fontsize=16, y=0.98)
@@ -792,6 +1083,7 @@ def plot_distribution_infographic(series: SeriesData, output_path: Path, thresho
         f"Beginning (step {series.steps[0]})",
         xlim,
         ylim,
+        large_n=large_n,
     )
     draw_network_panel(
         axes[1],
@@ -803,6 +1095,7 @@ def plot_distribution_infographic(series: SeriesData, output_path: Path, thresho
         f"End (step {series.steps[-1]})",
         xlim,
         ylim,
+        large_n=large_n,
     )
 
     colorbar = fig.colorbar(
@@ -817,14 +1110,13 @@ def plot_distribution_infographic(series: SeriesData, output_path: Path, thresho
 
 def plot_opinion_score_histogram(series: SeriesData, output_path: Path, dpi: int) -> None:
     """Bar chart: opinion score distribution (bins 0–0.1, 0.1–0.2, …) for initial vs final state."""
-    bins = np.arange(0.0, 1.05, 0.1)  # [0, 0.1, ..., 1.0]
-    node_index = {node_id: idx for idx, node_id in enumerate(series.node_ids)}
-    initial_scores = np.array([series.opinion_matrix[node_index[nid], 0] for nid in series.node_ids])
-    final_scores = np.array([series.opinion_matrix[node_index[nid], -1] for nid in series.node_ids])
+    hist_initial, _ = np.histogram(series.opinion_matrix[:, 0], bins=SCORE_HISTOGRAM_EDGES)
+    hist_final, _ = np.histogram(series.opinion_matrix[:, -1], bins=SCORE_HISTOGRAM_EDGES)
+    draw_score_histogram(hist_initial, hist_final, output_path, dpi)
 
-    hist_initial, _ = np.histogram(initial_scores, bins=bins)
-    hist_final, _ = np.histogram(final_scores, bins=bins)
 
+def draw_score_histogram(hist_initial: np.ndarray, hist_final: np.ndarray, output_path: Path, dpi: int) -> None:
+    bins = SCORE_HISTOGRAM_EDGES
     x_labels = [f"{b:.1f}-{b+0.1:.1f}" for b in bins[:-1]]
     x_pos = np.arange(len(x_labels))
     width = 0.35
@@ -844,53 +1136,456 @@ def plot_opinion_score_histogram(series: SeriesData, output_path: Path, dpi: int
     save_figure(fig, output_path, dpi)
 
 
-def generate_all_figures(args: argparse.Namespace) -> List[Path]:
-    network_json = args.network_json.resolve()
-    slices_dir = args.slices_dir.resolve()
-    base_output_dir = args.output_dir.resolve()  # e.g. networks/plots or src/visualization
+FIGURE_SUFFIXES: Dict[str, str] = {
+    "heatmap": "Sorted_Heatmap",
+    "trajectories": "Highlighted_Trajectories",
+    "median_band": "Shaded_Median_Area",
+    "edge_influence": "Most_Influential_Edge",
+    "distribution": "Opinion_Distribution_Beginning_End",
+    "score_histogram": "Opinion_Score_Histogram",
+    "echo_chamber": "Echo_Chamber_Index",
+    "cross_cutting": "Cross_Cutting_Edge_Ratio",
+}
+
+
+def pair_output_dir(base_output_dir: Path, network_name: str, slices_dir: Path) -> Path:
+    """output/{graph_type}/{score_dist}/{iteration} for a (network, slices) pair."""
+    graph_type, iteration = infer_graph_type_and_iteration(network_name, slices_dir.name)
+    score_dist = infer_score_dist(network_name)
+    return base_output_dir / graph_type / score_dist / iteration
+
+
+def figure_outputs(output_dir: Path, prefix: str, extension: str) -> Dict[str, Path]:
+    return {key: output_dir / f"{prefix}_{suffix}.{extension}" for key, suffix in FIGURE_SUFFIXES.items()}
+
+
+# CLI arguments each figure depends on; together with the slice contents and the code version they decide staleness
+FIGURE_ARGS: Dict[str, Tuple[str, ...]] = {
+    "heatmap": ("max_y_ticks", "dpi", "large_n_threshold"),
+    "trajectories": ("dpi", "large_n_threshold"),
+    "median_band": ("moving_average_window", "dpi", "streaming_stats"),
+    "edge_influence": ("edge_rolling_window", "dpi"),
+    "distribution": ("camp_threshold", "layout_seed", "dpi", "large_n_threshold"),
+    "score_histogram": ("dpi", "streaming_stats"),
+    "echo_chamber": ("dpi",),
+    "cross_cutting": ("camp_threshold", "dpi"),
+}
+STREAMING_FIGURES = ("median_band", "score_histogram")  # drawn from StepHistograms under --streaming-stats
+
+
+def _code_version() -> str:
+    """Hash of the plotting code, so figures are redrawn after it changes."""
+    digest = hashlib.sha256()
+    here = Path(__file__).resolve()
+    for path in (here, here.parent / "network_layout.py", here.parent / "streaming_stats.py"):
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+CODE_VERSION = _code_version()
+
+
+def pair_input_hash(network_json: Path, slices_dir: Path) -> str:
+    """Content hash of a pair's JSON files; taken from the series cache when its stat signature still matches."""
+    files = [network_json] + sorted_json_files(slices_dir)
+    cache_path = slices_dir / SERIES_CACHE_NAME
+    if cache_path.exists():
+        try:
+            with np.load(cache_path) as cached:
+                if str(cached["stat_signature"]) == _stat_signature(files):
+                    return str(cached["content_hash"])
+        except (OSError, KeyError, ValueError):
+            pass
+    return _content_hash(files)
+
+
+def figure_inputs(key: str, input_hash: str, args: argparse.Namespace) -> Dict[str, object]:
+    return {
+        "code": CODE_VERSION,
+        "slices": input_hash,
+        "args": {name: getattr(args, name) for name in FIGURE_ARGS[key]},
+    }
 
-    series = load_series(network_json, slices_dir)
-    prefix = args.prefix or series.network_name
-    extension = args.image_format
 
-    graph_type, iteration = infer_graph_type_and_iteration(series.network_name, slices_dir.name)
-    score_dist = infer_score_dist(series.network_name)
-    output_dir = base_output_dir / graph_type / score_dist / iteration
-    output_dir.mkdir(parents=True, exist_ok=True)
+def load_manifest(base_output_dir: Path) -> Dict[str, dict]:
+    path = base_output_dir / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    try:
+        return load_json(path)
+    except (OSError, ValueError) as exc:
+        print(f"  (ignoring unreadable manifest {path}: {exc})")
+        return {}
 
-    outputs = {
-        "heatmap": output_dir / f"{prefix}_Sorted_Heatmap.{extension}",
-        "trajectories": output_dir / f"{prefix}_Highlighted_Trajectories.{extension}",
-        "median_band": output_dir / f"{prefix}_Shaded_Median_Area.{extension}",
-        "edge_influence": output_dir / f"{prefix}_Most_Influential_Edge.{extension}",
-        "distribution": output_dir / f"{prefix}_Opinion_Distribution_Beginning_End.{extension}",
-        "score_histogram": output_dir / f"{prefix}_Opinion_Score_Histogram.{extension}",
-        "echo_chamber": output_dir / f"{prefix}_Echo_Chamber_Index.{extension}",
-        "cross_cutting": output_dir / f"{prefix}_Cross_Cutting_Edge_Ratio.{extension}",
-    }
 
-    plot_sorted_heatmap(series, outputs["heatmap"], args.max_y_ticks, args.dpi)
-    plot_highlighted_trajectories(series, outputs["trajectories"], args.dpi)
-    plot_shaded_median_area(series, outputs["median_band"], args.moving_average_window, args.dpi)
-    edge, _ = plot_most_influential_edge(series, outputs["edge_influence"], args.edge_rolling_window, args.dpi)
-    plot_distribution_infographic(series, outputs["distribution"], args.camp_threshold, args.layout_seed, args.dpi)
-    plot_opinion_score_histogram(series, outputs["score_histogram"], args.dpi)
-    echo_values = plot_echo_chamber_index(series, outputs["echo_chamber"], args.dpi)
-    cross_values = plot_cross_cutting_ratio(series, outputs["cross_cutting"], args.camp_threshold, args.dpi)
+def save_manifest(base_output_dir: Path, manifest: Dict[str, dict]) -> None:
+    path = base_output_dir / MANIFEST_NAME
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    temp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(temp_path, path)
+
+
+@dataclass
+class PairPlan:
+    output_dir: Path
+    outputs: Dict[str, Path]  # figures to render
+    inputs: Dict[str, Dict[str, object]]  # manifest entry per figure to render
+    skipped: int
+
+
+def plan_pair(
+    network_json: Path, slices_dir: Path, args: argparse.Namespace, manifest: Dict[str, dict]
+) -> PairPlan:
+    """Decide which figures of a pair are stale (missing, or recorded with different inputs) without loading it."""
+    base_output_dir = args.output_dir.resolve()
+    output_dir = pair_output_dir(base_output_dir, network_json.stem, slices_dir)
+    input_hash = pair_input_hash(network_json, slices_dir)
+    outputs: Dict[str, Path] = {}
+    inputs: Dict[str, Dict[str, object]] = {}
+    skipped = 0
+    for key, output_path in figure_outputs(output_dir, args.prefix or network_json.stem, args.image_format).items():
+        entry = figure_inputs(key, input_hash, args)
+        recorded = manifest.get(output_path.relative_to(base_output_dir).as_posix())
+        if not args.force and output_path.exists() and recorded == entry:
+            skipped += 1
+            continue
+        outputs[key] = output_path
+        inputs[key] = entry
+    return PairPlan(output_dir=output_dir, outputs=outputs, inputs=inputs, skipped=skipped)
+
 
+def record_figure(manifest: Dict[str, dict], base_output_dir: Path, output_path: Path, entry: Dict[str, object]) -> None:
+    manifest[output_path.relative_to(base_output_dir).as_posix()] = entry
+
+
+_STEP_STATS: Dict[Path, StepHistograms] = {}
+
+
+def streamed_step_stats(slices_dir: Path) -> StepHistograms:
+    """summarize_slices, memoized per process so the two figures using it read the slices once."""
+    if slices_dir not in _STEP_STATS:
+        _STEP_STATS[slices_dir] = summarize_slices(slices_dir, DEFAULT_BINS)
+    return _STEP_STATS[slices_dir]
+
+
+def needs_series(keys: Iterable[str], args: argparse.Namespace) -> bool:
+    """Whether rendering these figures needs the full opinion matrix (not when all of them are streamed)."""
+    return not (args.streaming_stats and set(keys) <= set(STREAMING_FIGURES))
+
+
+def render_figure(
+    key: str, series: Optional[SeriesData], output_path: Path, args: argparse.Namespace, slices_dir: Optional[Path] = None
+) -> object:
+    """Render one figure of the set; returns the figure's summary value (if any).
+
+    With --streaming-stats and a slices_dir, the median band and score histogram come from streamed
+    StepHistograms instead of the in-memory opinion matrix, and series may be None.
+    """
+    if args.streaming_stats and slices_dir is not None and key in STREAMING_FIGURES:
+        stats = streamed_step_stats(slices_dir)
+        if key == "median_band":
+            return draw_median_band(
+                stats.steps,
+                stats.quantile(0.10),
+                stats.quantile(0.5),
+                stats.quantile(0.90),
+                output_path,
+                args.moving_average_window,
+                args.dpi,
+            )
+        return draw_score_histogram(
+            stats.coarse_histogram(stats.steps[0]), stats.coarse_histogram(stats.steps[-1]), output_path, args.dpi
+        )
+    if key == "heatmap":
+        return plot_sorted_heatmap(series, output_path, args.max_y_ticks, args.dpi, args.large_n_threshold)
+    if key == "trajectories":
+        return plot_highlighted_trajectories(series, output_path, args.dpi, args.large_n_threshold)
+    if key == "median_band":
+        return plot_shaded_median_area(series, output_path, args.moving_average_window, args.dpi)
+    if key == "edge_influence":
+        edge, _ = plot_most_influential_edge(series, output_path, args.edge_rolling_window, args.dpi)
+        return edge
+    if key == "distribution":
+        return plot_distribution_infographic(
+            series, output_path, args.camp_threshold, args.layout_seed, args.dpi, args.large_n_threshold
+        )
+    if key == "score_histogram":
+        return plot_opinion_score_histogram(series, output_path, args.dpi)
+    if key == "echo_chamber":
+        return plot_echo_chamber_index(series, output_path, args.dpi)
+    if key == "cross_cutting":
+        return plot_cross_cutting_ratio(series, output_path, args.camp_threshold, args.dpi)
+    raise ValueError(f"Unknown figure: {key}")
+
+
+def print_pair_summary(
+    series: Optional[SeriesData],
+    slices_dir: Path,
+    output_dir: Path,
+    results: Dict[str, object],
+    outputs: Dict[str, Path],
+) -> None:
+    if series is None:  # only streamed figures were rendered
+        print(f"Output folder: {output_dir} (streamed from {slices_dir})")
+        for key, output_path in outputs.items():
+            if key in results:
+                print(f"Saved {output_path}")
+        return
+    graph_type, iteration = infer_graph_type_and_iteration(series.network_name, slices_dir.name)
+    score_dist = infer_score_dist(series.network_name)
     print(f"Loaded {series.network_name} with {len(series.node_ids)} nodes and {len(series.steps)} snapshots.")
     print(f"Output folder: {output_dir} (graph={graph_type}, score_dist={score_dist}, iteration={iteration})")
-    print(f"Most influential edge by cumulative influence: {edge[0]}-{edge[1]}")
+    if "edge_influence" in results:
+        edge = results["edge_influence"]
+        print(f"Most influential edge by cumulative influence: {edge[0]}-{edge[1]}")
     print(
         "Top 3 influential nodes by weighted PageRank: "
         + ", ".join(node_id for node_id, _ in sorted(series.pagerank.items(), key=lambda item: item[1], reverse=True)[:3])
     )
-    print(f"Final echo-chamber index: {echo_values[-1]:.4f}")
-    print(f"Final cross-cutting edge ratio: {cross_values[-1]:.2f}%")
-    for output_path in outputs.values():
-        print(f"Saved {output_path}")
+    if "echo_chamber" in results:
+        print(f"Final echo-chamber index: {results['echo_chamber'][-1]:.4f}")
+    if "cross_cutting" in results:
+        print(f"Final cross-cutting edge ratio: {results['cross_cutting'][-1]:.2f}%")
+    for key, output_path in outputs.items():
+        if key in results:
+            print(f"Saved {output_path}")
 
-    return list(outputs.values())
+
+def generate_all_figures(args: argparse.Namespace) -> List[Path]:
+    """Render the stale figures of one pair and record them in the manifest; returns the paths rendered."""
+    network_json = args.network_json.resolve()
+    slices_dir = args.slices_dir.resolve()
+    base_output_dir = args.output_dir.resolve()  # e.g. networks/plots or src/visualization
+
+    manifest = load_manifest(base_output_dir)
+    plan = plan_pair(network_json, slices_dir, args, manifest)
+    if not plan.outputs:
+        print(f"Up to date: {plan.output_dir} ({plan.skipped} figures unchanged)")
+        return []
+
+    series = load_series(network_json, slices_dir, use_cache=not args.no_cache) if needs_series(plan.outputs, args) else None
+    plan.output_dir.mkdir(parents=True, exist_ok=True)
+    results = {}
+    for key, output_path in plan.outputs.items():
+        results[key] = render_figure(key, series, output_path, args, slices_dir)
+        record_figure(manifest, base_output_dir, output_path, plan.inputs[key])
+    save_manifest(base_output_dir, manifest)
+    print_pair_summary(series, slices_dir, plan.output_dir, results, plan.outputs)
+    if plan.skipped:
+        print(f"Skipped {plan.skipped} up-to-date figure(s)")
+    return list(plan.outputs.values())
+
+
+def _init_worker() -> None:
+    """Process-pool initializer: render off-screen in every worker."""
+    plt.switch_backend("Agg")
+
+
+def _load_task(network_json: Path, slices_dir: Path, use_cache: bool, needed: bool) -> Optional[SeriesData]:
+    return load_series(network_json, slices_dir, use_cache) if needed else None
+
+
+def _render_task(
+    key: str, series: Optional[SeriesData], output_path: Path, args: argparse.Namespace, slices_dir: Path
+) -> object:
+    return render_figure(key, series, output_path, args, slices_dir)
+
+
+def generate_pairs_parallel(pairs: Sequence[Tuple[Path, Path]], args: argparse.Namespace, jobs: int) -> Dict[str, List[str]]:
+    """Render every figure of every pair in a process pool.
+
+    Each pair's series is loaded once by one worker and then shared (pickled) with the eight figure
+    tasks of that pair; it is not loaded when only streamed figures are stale. Returns {pair label: [error messages]} for pairs that had failures.
+    """
+    base_output_dir = args.output_dir.resolve()
+    errors: Dict[str, List[str]] = {}
+    manifest = load_manifest(base_output_dir)
+    plans: Dict[Tuple[Path, Path], PairPlan] = {}
+    for network_json, slices_dir in pairs:
+        plan = plan_pair(network_json.resolve(), slices_dir.resolve(), args, manifest)
+        if plan.outputs:
+            plans[(network_json, slices_dir)] = plan
+        else:
+            print(f"Up to date: {network_json.stem} + {slices_dir.name}")
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as pool:
+        load_futures = {
+            pool.submit(
+                _load_task, network_json.resolve(), slices_dir.resolve(), not args.no_cache, needs_series(plan.outputs, args)
+            ): (network_json, slices_dir)
+            for (network_json, slices_dir), plan in plans.items()
+        }
+        figure_futures = {}
+        pair_state: Dict[str, Dict[str, object]] = {}
+        for future in as_completed(load_futures):
+            network_json, slices_dir = load_futures[future]
+            label = f"{network_json.stem} + {slices_dir.name}"
+            try:
+                series = future.result()
+            except Exception as exc:
+                errors.setdefault(label, []).append(f"load: {exc}")
+                print(f"  ERROR [{label}] load: {exc}")
+                continue
+            plan = plans[(network_json, slices_dir)]
+            plan.output_dir.mkdir(parents=True, exist_ok=True)
+            pair_state[label] = {
+                "series": series,
+                "slices_dir": slices_dir,
+                "plan": plan,
+                "results": {},
+            }
+            for key, output_path in plan.outputs.items():
+                figure_futures[pool.submit(_render_task, key, series, output_path, args, slices_dir.resolve())] = (label, key)
+
+        pending = {label: len(state["plan"].outputs) for label, state in pair_state.items()}
+        for future in as_completed(figure_futures):
+            label, key = figure_futures[future]
+            state = pair_state[label]
+            plan = state["plan"]
+            try:
+                state["results"][key] = future.result()
+                record_figure(manifest, base_output_dir, plan.outputs[key], plan.inputs[key])
+            except Exception as exc:
+                errors.setdefault(label, []).append(f"{key}: {exc}")
+                print(f"  ERROR [{label}] {key}: {exc}")
+            pending[label] -= 1
+            if pending[label] == 0:
+                save_manifest(base_output_dir, manifest)
+                print(f"\n[done] {label}")
+                print_pair_summary(state["series"], state["slices_dir"], plan.output_dir, state["results"], plan.outputs)
+    return errors
+
+
+class SeriesWatcher:
+    """Tail a slices directory: append each new snapshot as a column and extend the per-step metrics incrementally."""
+
+    def __init__(self, network_json: Path, slices_dir: Path, threshold: float) -> None:
+        network_data = load_json(network_json)
+        self.graph = build_graph(network_data)
+        self.node_ids = sorted((str(node["id"]) for node in network_data.get("nodes", [])), key=natural_key)
+        self.node_index = {node_id: idx for idx, node_id in enumerate(self.node_ids)}
+        self.pagerank = nx.pagerank(self.graph, weight="weight")
+        self.network_name = network_json.stem
+        self.slices_dir = slices_dir
+        self.threshold = threshold
+        self.steps: List[int] = []
+        self.loaded: set = set()
+        self._matrix = np.empty((len(self.node_ids), 16), dtype=float)  # grown by doubling
+        self.lower = self.median = self.upper = self.echo = self.cross = np.empty(0)
+
+    @property
+    def series(self) -> SeriesData:
+        return SeriesData(
+            steps=list(self.steps),
+            node_ids=self.node_ids,
+            opinion_matrix=self._matrix[:, : len(self.steps)],
+            graph=self.graph,
+            pagerank=self.pagerank,
+            network_name=self.network_name,
+        )
+
+    def poll(self) -> int:
+        """Read snapshots that appeared since the last poll; returns how many were appended."""
+        try:
+            new_files = [path for path in sorted_json_files(self.slices_dir) if path.name not in self.loaded]
+        except FileNotFoundError:
+            return 0  # the simulation has not created the directory yet
+        start = len(self.steps)
+        for path in new_files:
+            try:
+                step, values = snapshot_column(path, self.node_index, len(self.steps))
+            except ValueError:
+                break  # still being written; picked up on the next poll
+            if np.isnan(values).any():
+                missing = [self.node_ids[row] for row in np.flatnonzero(np.isnan(values))[:5]]
+                raise ValueError(f"Missing opinionScore values in {path.name} for nodes: {', '.join(missing)}")
+            if len(self.steps) == self._matrix.shape[1]:
+                self._matrix = np.concatenate([self._matrix, np.empty_like(self._matrix)], axis=1)
+            self._matrix[:, len(self.steps)] = values
+            self.steps.append(step)
+            self.loaded.add(path.name)
+        if len(self.steps) > start:
+            self._extend_metrics(start)
+        return len(self.steps) - start
+
+    def _extend_metrics(self, start: int) -> None:
+        """Every metric is per step, so only the new columns are computed."""
+        full = self.series
+        new = SeriesData(
+            steps=full.steps[start:],
+            node_ids=full.node_ids,
+            opinion_matrix=full.opinion_matrix[:, start:],
+            graph=full.graph,
+            pagerank=full.pagerank,
+            network_name=full.network_name,
+        )
+        lower, median, upper = compute_median_band(new)
+        _, cross = compute_cross_cutting_ratio(new, self.threshold)
+        self.lower = np.concatenate([self.lower, lower])
+        self.median = np.concatenate([self.median, median])
+        self.upper = np.concatenate([self.upper, upper])
+        self.echo = np.concatenate([self.echo, compute_echo_chamber_index(new)])
+        self.cross = np.concatenate([self.cross, cross])
+
+    def render(self, key: str, output_path: Path, args: argparse.Namespace) -> object:
+        """render_figure, reusing the incrementally maintained metrics where a figure has them."""
+        series = self.series
+        if key == "median_band":
+            band = (self.lower, self.median, self.upper)
+            return plot_shaded_median_area(series, output_path, args.moving_average_window, args.dpi, band=band)
+        if key == "echo_chamber":
+            return plot_echo_chamber_index(series, output_path, args.dpi, values=self.echo)
+        if key == "cross_cutting":
+            ratios = (100.0 - self.cross, self.cross)
+            return plot_cross_cutting_ratio(series, output_path, args.camp_threshold, args.dpi, ratios=ratios)
+        return render_figure(key, series, output_path, args)
+
+
+def watch_slices(args: argparse.Namespace) -> None:
+    """Follow a running simulation: redraw WATCH_FIGURES every --watch-every snapshots, then the full set on exit."""
+    network_json = args.network_json.resolve()
+    slices_dir = args.slices_dir.resolve()
+    base_output_dir = args.output_dir.resolve()
+    watcher = SeriesWatcher(network_json, slices_dir, args.camp_threshold)
+    output_dir = pair_output_dir(base_output_dir, watcher.network_name, slices_dir)
+    outputs = figure_outputs(output_dir, args.prefix or watcher.network_name, args.image_format)
+    print(f"Watching {slices_dir} every {args.watch_interval:g}s (Ctrl+C to stop)")
+
+    rendered_at = 0
+    last_change = time.monotonic()
+    try:
+        while True:
+            added = watcher.poll()
+            if added:
+                last_change = time.monotonic()
+                print(
+                    f"  step {watcher.steps[-1]} ({len(watcher.steps)} snapshots): median={watcher.median[-1]:.3f}  "
+                    f"echo-chamber={watcher.echo[-1]:.4f}  cross-cutting={watcher.cross[-1]:.2f}%"
+                )
+            if watcher.steps and len(watcher.steps) - rendered_at >= max(args.watch_every, 1):
+                output_dir.mkdir(parents=True, exist_ok=True)
+                for key in WATCH_FIGURES:
+                    watcher.render(key, outputs[key], args)
+                rendered_at = len(watcher.steps)
+                print(f"  redrew {len(WATCH_FIGURES)} figures in {output_dir}")
+            elif time.monotonic() - last_change >= args.watch_timeout:
+                print(f"No new snapshot for {args.watch_timeout:g}s; stopping.")
+                break
+            time.sleep(args.watch_interval)
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+
+    if not watcher.steps:
+        return
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(base_output_dir)
+    input_hash = pair_input_hash(network_json, slices_dir)
+    results = {}
+    for key, output_path in outputs.items():
+        results[key] = watcher.render(key, output_path, args)
+        record_figure(manifest, base_output_dir, output_path, figure_inputs(key, input_hash, args))
+    save_manifest(base_output_dir, manifest)
+    print_pair_summary(watcher.series, slices_dir, output_dir, results, outputs)
 
 
 def resolve_args(args: argparse.Namespace) -> None:
@@ -915,7 +1610,7 @@ def resolve_args(args: argparse.Namespace) -> None:
             for search_dir in search_dirs:
                 if not search_dir.exists():
                     continue
-                for suffix in ("_agent_slices", "_degroot_slices"):
+                for suffix in SLICES_SUFFIXES:
                     cand = search_dir / f"{base}{suffix}"
                     if cand.exists():
                         args.slices_dir = cand
@@ -925,7 +1620,7 @@ def resolve_args(args: argparse.Namespace) -> None:
                 # Net1_ER: agent slices may be Net1_agent_slices
                 if "_" in base:
                     prefix = base.split("_")[0]
-                    for suffix in ("_agent_slices", "_degroot_slices"):
+                    for suffix in SLICES_SUFFIXES:
                         cand = search_dir / f"{prefix}{suffix}"
                         if cand.exists():
                             args.slices_dir = cand
@@ -934,7 +1629,7 @@ def resolve_args(args: argparse.Namespace) -> None:
                     break
             if args.slices_dir is None:
                 raise FileNotFoundError(
-                    f"No slices dir found for {base}. Expected {base}_agent_slices or _degroot_slices."
+                    f"No slices dir found for {base}. Expected {base}{' or '.join(SLICES_SUFFIXES)}."
                 )
         else:
             args.slices_dir = Path(args.slices_dir).resolve()
@@ -943,7 +1638,12 @@ def resolve_args(args: argparse.Namespace) -> None:
 def main() -> None:
     args = parse_args()
     args.output_dir = Path(args.output_dir).resolve()
-    if args.single:
+    if args.watch:
+        if args.network_json is None or args.slices_dir is None:
+            args.single = True
+            resolve_args(args)
+        watch_slices(args)
+    elif args.single:
         resolve_args(args)
         generate_all_figures(args)
     elif args.all:
@@ -952,6 +1652,12 @@ def main() -> None:
             print("No (network_json, slices_dir) pairs found in networks/.")
             return
         print(f"Processing {len(pairs)} network/slice pairs...")
+        if args.jobs > 1:
+            errors = generate_pairs_parallel(pairs, args, args.jobs)
+            print(f"\nFinished {len(pairs)} pairs with {args.jobs} jobs; {len(errors)} pair(s) had errors.")
+            for label, messages in errors.items():
+                print(f"  {label}: {'; '.join(messages)}")
+            return
         for i, (network_json, slices_dir) in enumerate(pairs, 1):
             args.network_json = network_json
             args.slices_dir = slices_dir
@@ -0,0 +1,195 @@
+"""Network layout service: one cached, stable set of node positions per topology and seed, shared by all figures."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import ArpackNoConvergence, eigsh
+
+
+LAYOUT_CACHE_DIR = Path(__file__).resolve().parent / ".layout_cache"
+LAYOUT_CACHE_VERSION = 1
+EXACT_LAYOUT_MAX_NODES = 1000  # up to here use nx.spring_layout (O(N^2) per iteration)
+FORCE_ITERATIONS = 120
+
+Positions = Dict[str, Tuple[float, float]]
+_MEMORY_CACHE: Dict[str, Positions] = {}
+
+
+def topology_hash(graph: nx.Graph) -> str:
+    """Hash of node order, edges and weights: everything the layout depends on."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(node) for node in graph.nodes()]).encode("utf-8"))
+    edges = sorted(
+        (str(min(u, v, key=str)), str(max(u, v, key=str)), round(float(w), 9))
+        for u, v, w in graph.edges(data="weight", default=1.0)
+    )
+    digest.update(json.dumps(edges).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _rescale(coords: np.ndarray, scale: float) -> np.ndarray:
+    """Center and scale so the largest absolute coordinate equals scale (as nx.rescale_layout)."""
+    coords = coords - coords.mean(axis=0)
+    limit = np.abs(coords).max()
+    return coords * (scale / limit) if limit > 0 else coords
+
+
+def _spectral_init(adjacency: sparse.csr_matrix, rng: np.random.Generator) -> np.ndarray:
+    """Sparse spectral start: 2nd/3rd leading eigenvectors of D^-1/2 A D^-1/2, jittered; random if ARPACK fails."""
+    n = adjacency.shape[0]
+    coords = rng.random((n, 2))
+    if n < 4:
+        return coords
+    degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    inv_sqrt = np.where(degree > 0, 1.0 / np.sqrt(np.maximum(degree, 1e-12)), 0.0)
+    normalized = sparse.diags(inv_sqrt) @ adjacency @ sparse.diags(inv_sqrt)
+    try:
+        _, vectors = eigsh(normalized, k=3, which="LA", v0=rng.random(n), maxiter=n * 10, tol=1e-4)
+    except (ArpackNoConvergence, ValueError):
+        return coords
+    spectral = vectors[:, :2]
+    spread = np.ptp(spectral, axis=0)
+    spectral = spectral / np.where(spread > 0, spread, 1.0)
+    return spectral + 0.01 * (coords - 0.5)
+
+
+class _RepulsionMesh:
+    """Particle-mesh evaluation of the Fruchterman-Reingold repulsion sum_j k^2 (x_i - x_j) / |x_i - x_j|^2.
+
+    Nodes are binned onto a grid_size x grid_size mesh over their bounding box and the density is convolved
+    with the r / |r|^2 kernel by FFT, O(G^2 log G) per step instead of O(N^2). The kernel is scale-free up to
+    a 1 / cell factor, so its transform is computed once.
+    """
+
+    def __init__(self, grid_size: int) -> None:
+        self.grid_size = grid_size
+        self.shape = (2 * grid_size, 2 * grid_size)
+        offsets = np.arange(-(grid_size - 1), grid_size, dtype=float)
+        dx, dy = np.meshgrid(offsets, offsets, indexing="ij")
+        dist2 = dx ** 2 + dy ** 2
+        dist2[grid_size - 1, grid_size - 1] = np.inf  # no self-force
+        self.kernel_x = np.fft.rfft2(dx / dist2, self.shape)
+        self.kernel_y = np.fft.rfft2(dy / dist2, self.shape)
+
+    def __call__(self, coords: np.ndarray, k: float) -> np.ndarray:
+        g = self.grid_size
+        low = coords.min(axis=0)
+        cell = float(max(np.ptp(coords, axis=0).max(), 1e-9)) * 1.02 / (g - 1)
+        index = np.clip(np.rint((coords - low) / cell).astype(int), 0, g - 1)
+        flat = index[:, 0] * g + index[:, 1]
+        density = np.bincount(flat, minlength=g * g).reshape(g, g).astype(float)
+        density_hat = np.fft.rfft2(density, self.shape)
+        field = []
+        for kernel in (self.kernel_x, self.kernel_y):
+            full = np.fft.irfft2(density_hat * kernel, self.shape)[g - 1 : 2 * g - 1, g - 1 : 2 * g - 1]
+            field.append(full.ravel()[flat])
+        return (k * k / cell) * np.column_stack(field)
+
+
+def force_directed_positions(
+    graph: nx.Graph,
+    seed: int,
+    k: Optional[float] = None,
+    scale: float = 1.0,
+    iterations: int = FORCE_ITERATIONS,
+) -> Positions:
+    """Scalable Fruchterman-Reingold: spectral start, O(E) attraction, FFT grid repulsion, linear cooling."""
+    nodes = list(graph.nodes())
+    n = len(nodes)
+    if n == 0:
+        return {}
+    if n == 1:
+        return {nodes[0]: (0.0, 0.0)}
+    adjacency = nx.to_scipy_sparse_array(graph, nodelist=nodes, weight="weight", format="csr")
+    adjacency = sparse.csr_matrix(adjacency)
+    rng = np.random.default_rng(seed)
+    coords = _spectral_init(adjacency, rng)
+    k = k if k is not None else float(np.sqrt(1.0 / n))
+    repulsion = _RepulsionMesh(int(np.clip(2 * np.sqrt(n), 64, 512)))
+
+    coo = adjacency.tocoo()
+    rows, cols, weights = coo.row, coo.col, coo.data
+    temperature = 0.1 * float(max(np.ptp(coords, axis=0).max(), 1e-9))
+    cooling = temperature / float(iterations + 1)
+    for _ in range(iterations):
+        delta = coords[cols] - coords[rows]
+        distance = np.maximum(np.hypot(delta[:, 0], delta[:, 1]), 1e-9)
+        pull = (weights * distance / k)[:, None] * delta
+        attraction = np.column_stack(
+            [np.bincount(rows, pull[:, 0], minlength=n), np.bincount(rows, pull[:, 1], minlength=n)]
+        )
+        displacement = repulsion(coords, k) + attraction
+        length = np.maximum(np.hypot(displacement[:, 0], displacement[:, 1]), 0.01)
+        coords = coords + displacement * (temperature / length)[:, None]
+        temperature -= cooling
+    coords = _rescale(coords, scale)
+    return {node: (float(x), float(y)) for node, (x, y) in zip(nodes, coords)}
+
+
+def _cache_key(graph: nx.Graph, seed: int, k: Optional[float], scale: float, method: str) -> str:
+    params = json.dumps([LAYOUT_CACHE_VERSION, method, seed, k, scale])
+    return hashlib.sha256((topology_hash(graph) + params).encode("utf-8")).hexdigest()[:32]
+
+
+def network_layout(
+    graph: nx.Graph,
+    seed: int,
+    k: Optional[float] = None,
+    scale: float = 1.0,
+    method: str = "auto",
+    cache_dir: Optional[Path] = LAYOUT_CACHE_DIR,
+) -> Positions:
+    """Node positions for graph, cached in memory and on disk per (topology, seed, k, scale, method).
+
+    method "spring" is nx.spring_layout (what the figures have always used), "force" is the scalable
+    force_directed_positions, and "auto" picks spring up to EXACT_LAYOUT_MAX_NODES nodes. k only tunes
+    spring; force uses the Fruchterman-Reingold optimal distance sqrt(1/N).
+    """
+    if method == "auto":
+        method = "spring" if graph.number_of_nodes() <= EXACT_LAYOUT_MAX_NODES else "force"
+    if method not in ("spring", "force"):
+        raise ValueError(f"Unknown layout method: {method}")
+    key = _cache_key(graph, seed, k, scale, method)
+    if key in _MEMORY_CACHE:
+        return _MEMORY_CACHE[key]
+
+    cache_path = cache_dir / f"{key}.npz" if cache_dir is not None else None
+    if cache_path is not None and cache_path.exists():
+        try:
+            with np.load(cache_path) as cached:
+                positions = {
+                    node: (float(x), float(y)) for node, (x, y) in zip(cached["nodes"].tolist(), cached["coords"])
+                }
+            if set(positions) == set(graph.nodes()):
+                _MEMORY_CACHE[key] = positions
+                return positions
+        except (OSError, KeyError, ValueError):
+            pass
+
+    if method == "spring":
+        positions = {
+            node: (float(coords[0]), float(coords[1]))
+            for node, coords in nx.spring_layout(graph, seed=seed, weight="weight", k=k, scale=scale).items()
+        }
+    else:
+        positions = force_directed_positions(graph, seed, scale=scale)
+
+    _MEMORY_CACHE[key] = positions
+    if cache_path is not None:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            with temp_path.open("wb") as handle:
+                np.savez(handle, nodes=np.array(list(positions), dtype=str), coords=np.array(list(positions.values())))
+            os.replace(temp_path, cache_path)
+        except OSError:
+            pass
+    return positions
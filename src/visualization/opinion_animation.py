@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""Export the evolution of a (network, slices) pair as an animated MP4, GIF or APNG."""
+
+from __future__ import annotations
+
+import argparse
+import io
+import shutil
+import struct
+import subprocess
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Tuple
+
+import matplotlib
+import numpy as np
+from matplotlib import colors as mcolors
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.cm import ScalarMappable
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from PIL import GifImagePlugin, Image
+
+from advanced_network_visualizations import (
+    DEFAULT_OUTPUT_DIR,
+    LARGE_N_THRESHOLD,
+    TWO_POLE_CMAP,
+    SeriesData,
+    apply_remote_rto_colorbar,
+    compute_bounds,
+    discover_network_slice_pairs,
+    load_series,
+    network_positions,
+    pair_output_dir,
+    scale_sizes,
+)
+
+
+ANIMATION_SUFFIX = "Opinion_Evolution"
+ANIMATION_FORMATS = ("gif", "apng", "png", "mp4")
+SIZE_CHANGE_GAIN = 6.0  # node size grows by this factor times its opinion change since the previous frame
+MAX_SIZE_FACTOR = 2.5
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Animate opinion evolution on a network snapshot series.")
+    parser.add_argument(
+        "--network-json",
+        type=Path,
+        default=None,
+        help="Base network JSON file. If omitted, uses the first discovered pair from networks/.",
+    )
+    parser.add_argument(
+        "--slices-dir",
+        type=Path,
+        default=None,
+        help="Directory containing iter*.json snapshot files (read through its .series_cache.npz).",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help=f"Output file (.gif, .apng, .png or .mp4). Default: output/{{graph}}/{{dist}}/{{iteration}}/{{prefix}}_{ANIMATION_SUFFIX}.gif",
+    )
+    parser.add_argument(
+        "--format",
+        default="gif",
+        choices=ANIMATION_FORMATS,
+        help="Format used when --output is not given.",
+    )
+    parser.add_argument("--fps", type=float, default=8.0, help="Frames per second.")
+    parser.add_argument(
+        "--frames-per-step",
+        type=int,
+        default=1,
+        help="Frames per snapshot; values > 1 interpolate opinions between snapshots for smoother motion.",
+    )
+    parser.add_argument("--layout-seed", type=int, default=42, help="Random seed used for the topology layout.")
+    parser.add_argument("--dpi", type=int, default=100, help="Frame DPI.")
+    parser.add_argument(
+        "--large-n-threshold",
+        type=int,
+        default=LARGE_N_THRESHOLD,
+        help="Node count above which node markers are shrunk and outlines dropped.",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Re-read snapshot JSON instead of the series cache.")
+    return parser.parse_args()
+
+
+def frame_opinions(series: SeriesData, frames_per_step: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(nodes x frames) opinions, linearly interpolated between snapshots, and the fractional step of each frame."""
+    steps = np.asarray(series.steps, dtype=float)
+    frames_per_step = max(frames_per_step, 1)
+    positions = np.arange((len(steps) - 1) * frames_per_step + 1) / frames_per_step
+    left = np.minimum(np.floor(positions).astype(int), len(steps) - 1)
+    right = np.minimum(left + 1, len(steps) - 1)
+    fraction = positions - left
+    matrix = series.opinion_matrix
+    opinions = matrix[:, left] * (1.0 - fraction) + matrix[:, right] * fraction
+    return opinions, steps[left] * (1.0 - fraction) + steps[right] * fraction
+
+
+def render_frames(
+    series: SeriesData,
+    layout_seed: int,
+    dpi: int,
+    frames_per_step: int = 1,
+    large_n_threshold: int = LARGE_N_THRESHOLD,
+) -> Iterator[np.ndarray]:
+    """Yield RGBA frames. The edges, colorbar and titles are drawn once into a cached background; every
+    frame restores it and redraws only the node scatter (new colors and sizes) and the step label."""
+    positions = network_positions(series, layout_seed)
+    xlim, ylim = compute_bounds([positions])
+    coords = np.array([positions[node_id] for node_id in series.node_ids])
+    base = scale_sizes(series.pagerank, minimum=60.0, maximum=280.0)
+    base_sizes = np.array([base[node_id] for node_id in series.node_ids])
+    large_n = len(series.node_ids) > large_n_threshold
+    if large_n:
+        base_sizes = base_sizes * large_n_threshold / len(series.node_ids)
+    opinions, frame_steps = frame_opinions(series, frames_per_step)
+
+    fig = Figure(figsize=(9.6, 7.6), dpi=dpi, facecolor="white")
+    canvas = FigureCanvasAgg(fig)  # off-screen regardless of the pyplot backend
+    ax = fig.subplots()
+    ax.add_collection(
+        LineCollection(
+            [(positions[source], positions[target]) for source, target in series.graph.edges()],
+            colors="#9e9e9e",
+            linewidths=0.85,
+            alpha=0.42,
+            zorder=1,
+        )
+    )
+    scatter = ax.scatter(
+        coords[:, 0],
+        coords[:, 1],
+        c=opinions[:, 0],
+        s=base_sizes,
+        cmap=TWO_POLE_CMAP,
+        vmin=0.0,
+        vmax=1.0,
+        edgecolors="white",
+        linewidths=0.0 if large_n else 0.9,
+        alpha=0.97,
+        zorder=2,
+        animated=True,
+    )
+    label = ax.text(0.02, 0.02, "", transform=ax.transAxes, ha="left", va="bottom", fontsize=11, color="#4a4a4a", animated=True)
+    ax.set_xlim(*xlim)
+    ax.set_ylim(*ylim)
+    ax.set_aspect("equal", adjustable="box")
+    ax.axis("off")
+    ax.set_title(f"{series.network_name}: Remote vs. RTO opinion evolution", fontsize=14)
+    colorbar = fig.colorbar(
+        ScalarMappable(norm=mcolors.Normalize(vmin=0.0, vmax=1.0), cmap=TWO_POLE_CMAP), ax=ax, fraction=0.036, pad=0.02
+    )
+    apply_remote_rto_colorbar(colorbar)
+
+    canvas.draw()
+    background = canvas.copy_from_bbox(fig.bbox)
+    previous = opinions[:, 0]
+    for frame in range(opinions.shape[1]):
+        current = opinions[:, frame]
+        change = np.abs(current - previous) * max(frames_per_step, 1)
+        scatter.set_array(current)
+        scatter.set_sizes(base_sizes * np.minimum(1.0 + SIZE_CHANGE_GAIN * change, MAX_SIZE_FACTOR))
+        label.set_text(f"step {frame_steps[frame]:.1f}" if frames_per_step > 1 else f"step {frame_steps[frame]:.0f}")
+        canvas.restore_region(background)
+        ax.draw_artist(scatter)
+        ax.draw_artist(label)
+        yield np.asarray(canvas.buffer_rgba()).copy()
+        previous = current
+
+
+def write_gif(frames: Iterator[np.ndarray], output_path: Path, fps: float) -> int:
+    """Looping GIF with an adaptive palette per frame, each frame encoded and written as soon as it is rendered."""
+    duration = max(int(round(1000.0 / fps)), 1)
+    count = 0
+    with output_path.open("wb") as f:
+        for frame in frames:
+            image = Image.fromarray(frame[..., :3]).quantize(colors=255, method=Image.Quantize.MEDIANCUT)
+            if count == 0:
+                header, _ = GifImagePlugin.getheader(image, info={"loop": 0})
+                f.write(b"".join(header))
+            f.write(b"".join(GifImagePlugin.getdata(image, duration=duration, include_color_table=True)))
+            count += 1
+        f.write(b";")
+    if count == 0:
+        output_path.unlink()
+        raise ValueError("No frames to write")
+    return count
+
+
+def _png_chunks(data: bytes) -> List[Tuple[bytes, bytes]]:
+    """(type, body) of each chunk of an encoded PNG."""
+    chunks, offset = [], 8
+    while offset < len(data):
+        (length,) = struct.unpack(">I", data[offset : offset + 4])
+        chunks.append((data[offset + 4 : offset + 8], data[offset + 8 : offset + 8 + length]))
+        offset += 12 + length
+    return chunks
+
+
+def _write_png_chunk(f: BinaryIO, kind: bytes, body: bytes) -> None:
+    f.write(struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body)))
+
+
+def write_apng(frames: Iterator[np.ndarray], output_path: Path, fps: float) -> int:
+    """Looping APNG: each frame is PNG-encoded by Pillow and its image data appended as one fcTL + IDAT/fdAT
+    frame, so only the current frame is held in memory. The frame count in acTL is filled in at the end."""
+    delay = max(int(round(1000.0 / fps)), 1)
+    count = sequence = 0
+    with output_path.open("wb") as f:
+        for frame in frames:
+            encoded = io.BytesIO()
+            Image.fromarray(frame[..., :3]).save(encoded, format="PNG")
+            chunks = _png_chunks(encoded.getvalue())
+            header = next(body for kind, body in chunks if kind == b"IHDR")
+            if count == 0:
+                f.write(b"\x89PNG\r\n\x1a\n")
+                _write_png_chunk(f, b"IHDR", header)
+                actl_offset = f.tell()
+                _write_png_chunk(f, b"acTL", struct.pack(">II", 0, 0))
+            width, height = struct.unpack(">II", header[:8])
+            _write_png_chunk(f, b"fcTL", struct.pack(">IIIIIHHBB", sequence, width, height, 0, 0, delay, 1000, 0, 0))
+            sequence += 1
+            for kind, body in chunks:
+                if kind != b"IDAT":
+                    continue
+                if count == 0:
+                    _write_png_chunk(f, b"IDAT", body)
+                else:
+                    _write_png_chunk(f, b"fdAT", struct.pack(">I", sequence) + body)
+                    sequence += 1
+            count += 1
+        if count:
+            _write_png_chunk(f, b"IEND", b"")
+            f.seek(actl_offset)
+            _write_png_chunk(f, b"acTL", struct.pack(">II", count, 0))
+    if count == 0:
+        output_path.unlink()
+        raise ValueError("No frames to write")
+    return count
+
+
+def write_ffmpeg(frames: Iterator[np.ndarray], output_path: Path, fps: float) -> int:
+    """MP4 (H.264) by piping raw RGBA frames to ffmpeg, so nothing is re-rendered for the encoder."""
+    ffmpeg = shutil.which(matplotlib.rcParams["animation.ffmpeg_path"])
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg not found on PATH; install it or export .gif/.apng instead")
+    first = next(frames, None)
+    if first is None:
+        raise ValueError("No frames to write")
+    height, width = first.shape[:2]
+    command = [
+        ffmpeg, "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{width}x{height}", "-r", f"{fps:g}", "-i", "-",
+        "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-c:v", "libx264", "-pix_fmt", "yuv420p",
+        str(output_path),
+    ]  # fmt: skip
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    count = 0
+    try:
+        process.stdin.write(first.tobytes())
+        count = 1
+        for frame in frames:
+            process.stdin.write(frame.tobytes())
+            count += 1
+    finally:
+        process.stdin.close()
+        stderr = process.stderr.read().decode("utf-8", "replace")
+        process.wait()
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed ({process.returncode}): {stderr.strip()[:300]}")
+    return count
+
+
+def export_animation(
+    series: SeriesData,
+    output_path: Path,
+    layout_seed: int = 42,
+    fps: float = 8.0,
+    dpi: int = 100,
+    frames_per_step: int = 1,
+    large_n_threshold: int = LARGE_N_THRESHOLD,
+) -> int:
+    """Write the animation; the writer is chosen by extension (.mp4 -> ffmpeg, .gif -> GIF, .apng/.png -> APNG).
+    Returns the number of frames."""
+    suffix = output_path.suffix.lower()
+    if suffix not in (".mp4", ".gif", ".apng", ".png"):
+        raise ValueError(f"Unsupported animation format: {output_path.suffix}")
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    frames = render_frames(series, layout_seed, dpi, frames_per_step, large_n_threshold)
+    if suffix == ".mp4":
+        return write_ffmpeg(frames, output_path, fps)
+    if suffix == ".gif":
+        return write_gif(frames, output_path, fps)
+    return write_apng(frames, output_path, fps)
+
+
+def main() -> None:
+    args = parse_args()
+    if args.network_json is None or args.slices_dir is None:
+        pairs = discover_network_slice_pairs()
+        if not pairs:
+            raise FileNotFoundError("No (network_json, slices_dir) pairs found in networks/. Specify --network-json and --slices-dir.")
+        args.network_json, args.slices_dir = pairs[0]
+        print(f"Using first discovered: {args.network_json.name} + {args.slices_dir.name}")
+    network_json = args.network_json.resolve()
+    slices_dir = args.slices_dir.resolve()
+    series = load_series(network_json, slices_dir, use_cache=not args.no_cache)
+    output_path = args.output
+    if output_path is None:
+        output_dir = pair_output_dir(DEFAULT_OUTPUT_DIR, series.network_name, slices_dir)
+        output_path = output_dir / f"{series.network_name}_{ANIMATION_SUFFIX}.{args.format}"
+    frames = export_animation(
+        series,
+        output_path,
+        layout_seed=args.layout_seed,
+        fps=args.fps,
+        dpi=args.dpi,
+        frames_per_step=args.frames_per_step,
+        large_n_threshold=args.large_n_threshold,
+    )
+    print(f"Saved {output_path} ({frames} frames, {len(series.node_ids)} nodes)")
+
+
+if __name__ == "__main__":
+    main()
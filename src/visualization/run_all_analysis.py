@@ -1,109 +1,295 @@
+#!/usr/bin/env python3
+"""Semantic drift analysis: per-node stance trajectories of agent runs, their paths through one shared semantic
+space, and opinion trajectories of the baseline (DeGroot, FJ, BC) runs."""
+
+from __future__ import annotations
+
+import argparse
 import os
-import json
-import pandas as pd
-import numpy as np
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import matplotlib
+
+matplotlib.use("Agg")
+
 import matplotlib.pyplot as plt
-import seaborn as sns
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.manifold import TSNE
-
-BASE_DIR = '/Users/hyunwooyu/Desktop/UCSD/ECE227/researcher B'
-FIGURES_DIR = os.path.join(BASE_DIR, 'figures')
-
-os.makedirs(FIGURES_DIR, exist_ok=True)
-
-networks = [
-    {"id": "Net1_ER", "agent": "Net1_agent_slices", "degroot": "Net1_ER_degroot_slices"},
-    {"id": "Net2_SW", "agent": "Net2_agent_slices", "degroot": "Net2_SW_degroot_slices"},
-    {"id": "Net3_SF", "agent": "Net3_agent_slices", "degroot": "Net3_SF_degroot_slices"},
-    {"id": "Net4_KC", "agent": "Net4_KC_agent_slices", "degroot": "Net4_KC_degroot_slices"}
-]
-
-print("Loading SBERT model")
-model = SentenceTransformer('all-MiniLM-L6-v2')
-anchor_remote = model.encode(["I fully support remote work and flexibility."])
-anchor_rto = model.encode(["I believe everyone must return to the office full-time."])
-
-def get_sentiment_score(emb):
-    sim_remote = cosine_similarity(emb.reshape(1, -1), anchor_remote.reshape(1, -1))[0][0]
-    sim_rto = cosine_similarity(emb.reshape(1, -1), anchor_rto.reshape(1, -1))[0][0]
-    return sim_remote - sim_rto
-
-def load_json_data(folder_path, is_agent=True):
-    all_data = []
-    if not os.path.exists(folder_path):
-        print(f"Cannot find the {folder_path} folder.")
-        return pd.DataFrame()
-
-    file_list = [f for f in os.listdir(folder_path) if f.endswith('.json')]
-    file_list = sorted(file_list, key=lambda x: int(''.join(filter(str.isdigit, x)) or 0))
-
-    for file_name in file_list:
-        with open(os.path.join(folder_path, file_name), 'r') as f:
-            data = json.load(f)
-            nodes = data.get('nodes', [])
-            step = int(''.join(filter(str.isdigit, file_name)) or 0)
-            for node in nodes:
-                if is_agent:
-                    all_data.append({'step': step, 'node_id': node['id'], 'opinion': node['prompt']})
-                else:
-                    all_data.append({'step': step, 'node_id': node['id'], 'opinionScore': node['opinionScore']})
-    return pd.DataFrame(all_data)
-
-for net in networks:
-    print(f"\n========== [ Starting analysis for {net['id']} ] ==========")
-    agent_path = os.path.join(BASE_DIR, net['agent'])
-    degroot_path = os.path.join(BASE_DIR, net['degroot'])
-
-    df_agent = load_json_data(agent_path, is_agent=True)
-    if not df_agent.empty:
-        print(f"[{net['id']}] Calculating text embeddings...")
-        df_agent['embedding'] = list(model.encode(df_agent['opinion'].tolist()))
-        df_agent['sentiment_score'] = df_agent['embedding'].apply(get_sentiment_score)
-
-        plt.figure(figsize=(10, 6))
-        for node_id in df_agent['node_id'].unique()[:10]:
-            node_data = df_agent[df_agent['node_id'] == node_id]
-            plt.plot(node_data['step'], node_data['sentiment_score'], label=f'Node {node_id}')
-        plt.title(f'Opinion Drift: Remote vs. RTO ({net["id"]})')
-        plt.xlabel('Time Step')
-        plt.ylabel('Sentiment Score (Remote > 0 > RTO)')
-        plt.axhline(0, color='black', linestyle='--', alpha=0.3)
-        plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-        plt.tight_layout()
-        line_save_path = os.path.join(FIGURES_DIR, f"{net['id']}_Agent_Line.jpg")
-        plt.savefig(line_save_path)
-        plt.close() 
-        print(f"Saved: {net['id']}_Agent_Line.jpg")
-
-        last_step_df = df_agent[df_agent['step'] == df_agent['step'].max()]
-        if len(last_step_df) > 1:
-            p_value = min(30, max(1, len(last_step_df) - 1)) 
-            embeddings_2d = TSNE(n_components=2, random_state=42, perplexity=p_value).fit_transform(np.stack(last_step_df['embedding'].values))
-            plt.figure(figsize=(8, 6))
-            sns.scatterplot(x=embeddings_2d[:, 0], y=embeddings_2d[:, 1], hue=last_step_df['sentiment_score'], palette='coolwarm')
-            plt.title(f'Semantic Clustering of Opinions ({net["id"]})')
-            tsne_save_path = os.path.join(FIGURES_DIR, f"{net['id']}_Agent_tSNE.jpg")
-            plt.savefig(tsne_save_path)
-            plt.close()
-            print(f"Saved: {net['id']}_Agent_tSNE.jpg")
-
-    # --- [B] DeGroot Baseline Analysis Part ---
-    df_degroot = load_json_data(degroot_path, is_agent=False)
-    if not df_degroot.empty:
-        plt.figure(figsize=(10, 6))
-        for node_id in df_degroot['node_id'].unique()[:10]:
-            node_data = df_degroot[df_degroot['node_id'] == node_id]
-            plt.plot(node_data['step'], node_data['opinionScore'], label=f'Node {node_id}')
-        plt.title(f'Opinion Convergence: DeGroot Baseline ({net["id"]})')
-        plt.xlabel('Time Step')
-        plt.ylabel('Opinion Score')
-        plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-        plt.tight_layout()
-        degroot_save_path = os.path.join(FIGURES_DIR, f"{net['id']}_DeGroot_Line.jpg")
-        plt.savefig(degroot_save_path)
-        plt.close()
-        print(f"Saved: {net['id']}_DeGroot_Line.jpg")
-
-print("Analysis and saving for all networks are complete")
+import numpy as np
+from matplotlib.collections import LineCollection
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from advanced_network_visualizations import (
+    VISUALIZATION_DIR,
+    discover_network_slice_pairs,
+    infer_graph_type_and_iteration,
+    load_json,
+    natural_key,
+    snapshot_column,
+    sorted_json_files,
+)
+from input.semanticEmbed import anchorStance, embedTexts, getCache, getEmbedder, textKey
+from semantic_projection import PROJECTION_METHODS, PROJECTION_SAMPLE, SemanticProjection, load_or_fit_projection
+from streaming_stats import slice_step
+
+
+DEFAULT_FIGURES_DIR = VISUALIZATION_DIR / "analysis"
+PLOTTED_NODES = 10
+BASELINE_LABELS = {
+    "degroot": ("DeGroot", "Opinion Convergence: DeGroot Baseline"),
+    "fj": ("FJ", "Opinion Dynamics: Friedkin-Johnsen Baseline"),
+    "bc": ("BC", "Opinion Dynamics: Bounded-Confidence Baseline"),
+}
+
+
+@dataclass
+class SliceArrays:
+    steps: List[int]
+    node_ids: List[str]
+    values: np.ndarray  # (nodes x steps): stance for agent runs, opinionScore for baseline runs
+    text_keys: Optional[List[str]] = None  # unique prompt cache keys, agent runs only
+    text_ids: Optional[np.ndarray] = None  # (nodes x steps) index into text_keys, -1 where a node is missing
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Semantic drift analysis for every discovered (network, slices) pair.")
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=DEFAULT_FIGURES_DIR,
+        help="Directory for the figures. Default: src/visualization/analysis/.",
+    )
+    parser.add_argument(
+        "--embedder",
+        default=os.environ.get("SEMANTIC_EMBEDDER", "sbert"),
+        choices=("sbert", "hashing"),
+        help="Embedder for agent prompts (cached in networks/.embeddings.sqlite). Env: SEMANTIC_EMBEDDER.",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes; each analyses whole pairs.")
+    parser.add_argument("--nodes", type=int, default=PLOTTED_NODES, help="Nodes drawn in the line plots.")
+    parser.add_argument(
+        "--projection",
+        default="pca",
+        choices=PROJECTION_METHODS,
+        help="Shared 2D semantic space: PCA, random projection or landmark MDS on angular distances.",
+    )
+    parser.add_argument(
+        "--projection-sample",
+        type=int,
+        default=PROJECTION_SAMPLE,
+        help="Cached embeddings the projection is fitted on.",
+    )
+    parser.add_argument(
+        "--refit-projection",
+        action="store_true",
+        help="Refit the stored projection (networks/.semantic_projection/) on the current embedding cache.",
+    )
+    return parser.parse_args()
+
+
+def is_agent_slices(slices_dir: Path) -> bool:
+    return "_agent_slices" in slices_dir.name
+
+
+def stream_slices(network_json: Path, slices_dir: Path, embedder_name: str) -> SliceArrays:
+    """Read one slice at a time into a (nodes x steps) array. Agent prompts are embedded per slice (the
+    embedding cache makes repeated prompts free) and reduced to their anchor stance right away."""
+    node_ids = sorted((str(node["id"]) for node in load_json(network_json).get("nodes", [])), key=natural_key)
+    node_index = {node_id: row for row, node_id in enumerate(node_ids)}
+    files = sorted_json_files(slices_dir)
+    if not files:
+        raise FileNotFoundError(f"No snapshot JSON files were found in {slices_dir}")
+    values = np.full((len(node_ids), len(files)), np.nan)
+    steps: List[int] = []
+    if not is_agent_slices(slices_dir):
+        for column, path in enumerate(files):
+            step, values[:, column] = snapshot_column(path, node_index, column)
+            steps.append(step)
+        return SliceArrays(steps, node_ids, values)
+
+    embedder = getEmbedder(embedder_name)
+    key_index: Dict[str, int] = {}
+    text_ids = np.full((len(node_ids), len(files)), -1, dtype=np.int32)
+    for column, path in enumerate(files):
+        steps.append(slice_step(path, column))
+        prompts = [""] * len(node_ids)
+        rows = []
+        for node in load_json(path).get("nodes", []):
+            row = node_index.get(str(node["id"]))
+            if row is not None:
+                prompts[row] = str(node.get("prompt", ""))
+                rows.append(row)
+        texts = [prompts[row] for row in rows]
+        values[rows, column] = anchorStance(embedTexts(texts, embedder), embedder)
+        text_ids[rows, column] = [key_index.setdefault(textKey(text), len(key_index)) for text in texts]
+    return SliceArrays(steps, node_ids, values, list(key_index), text_ids)
+
+
+def project_arrays(arrays: SliceArrays, projection: SemanticProjection) -> np.ndarray:
+    """(nodes x steps x 2) coordinates in the shared space; each distinct prompt is projected once."""
+    vectors = getCache().get(projection.embedder, arrays.text_keys)
+    missing = [key for key in arrays.text_keys if key not in vectors]
+    if missing:
+        raise KeyError(f"{len(missing)} prompts are missing from the embedding cache")
+    unique = projection.transform(np.stack([vectors[key] for key in arrays.text_keys]))
+    coords = np.full(arrays.text_ids.shape + (2,), np.nan)
+    present = arrays.text_ids >= 0
+    coords[present] = unique[arrays.text_ids[present]]
+    return coords
+
+
+def plot_node_lines(arrays: SliceArrays, output_path: Path, title: str, ylabel: str, n_nodes: int, zero_line: bool) -> None:
+    plt.figure(figsize=(10, 6))
+    for row, node_id in enumerate(arrays.node_ids[:n_nodes]):
+        plt.plot(arrays.steps, arrays.values[row], label=f"Node {node_id}")
+    plt.title(title)
+    plt.xlabel("Time Step")
+    plt.ylabel(ylabel)
+    if zero_line:
+        plt.axhline(0, color="black", linestyle="--", alpha=0.3)
+    plt.legend(bbox_to_anchor=(1.05, 1), loc="upper left")
+    plt.tight_layout()
+    plt.savefig(output_path)
+    plt.close()
+
+
+def projection_bounds(coords: List[np.ndarray]) -> Tuple[Tuple[float, float], Tuple[float, float]]:
+    """Common axis limits for every network, so positions are comparable between figures."""
+    stacked = np.concatenate([c.reshape(-1, 2) for c in coords])
+    stacked = stacked[~np.isnan(stacked).any(axis=1)]
+    low, high = stacked.min(axis=0), stacked.max(axis=0)
+    pad = 0.05 * np.maximum(high - low, 1e-9)
+    return (low[0] - pad[0], high[0] + pad[0]), (low[1] - pad[1], high[1] + pad[1])
+
+
+def plot_semantic_drift(
+    arrays: SliceArrays, coords: np.ndarray, bounds, output_path: Path, title: str, method: str
+) -> None:
+    """Every node's path through the shared space (gray), its start (hollow) and its end colored by stance."""
+    plt.figure(figsize=(8, 6))
+    ax = plt.gca()
+    ax.add_collection(LineCollection(list(coords), colors="#9e9e9e", linewidths=0.7, alpha=0.45))
+    ax.scatter(coords[:, 0, 0], coords[:, 0, 1], facecolors="none", edgecolors="#7a7a7a", s=18, linewidths=0.6)
+    scatter = ax.scatter(coords[:, -1, 0], coords[:, -1, 1], c=arrays.values[:, -1], cmap="coolwarm", s=40)
+    plt.colorbar(scatter, label="Final stance (Remote > 0 > RTO)")
+    ax.set_xlim(*bounds[0])
+    ax.set_ylim(*bounds[1])
+    ax.set_xlabel(f"{method} 1")
+    ax.set_ylabel(f"{method} 2")
+    plt.title(title)
+    plt.tight_layout()
+    plt.savefig(output_path)
+    plt.close()
+
+
+def plot_network_centroids(
+    centroids: Dict[str, Tuple[List[int], np.ndarray]], bounds, output_path: Path, method: str
+) -> None:
+    """Centroid path of every agent network over time, all in the same space."""
+    plt.figure(figsize=(10, 7))
+    for net_id, (_, path) in sorted(centroids.items(), key=lambda item: natural_key(item[0])):
+        (line,) = plt.plot(path[:, 0], path[:, 1], linewidth=1.4, alpha=0.85, label=net_id)
+        plt.scatter(path[0, 0], path[0, 1], facecolors="none", edgecolors=line.get_color(), s=30)
+        plt.scatter(path[-1, 0], path[-1, 1], color=line.get_color(), s=30)
+    plt.xlim(*bounds[0])
+    plt.ylim(*bounds[1])
+    plt.xlabel(f"{method} 1")
+    plt.ylabel(f"{method} 2")
+    plt.title("Semantic drift of network centroids (hollow: first step, filled: last step)")
+    plt.legend(bbox_to_anchor=(1.02, 1), loc="upper left", fontsize=7)
+    plt.tight_layout()
+    plt.savefig(output_path)
+    plt.close()
+
+
+def plot_projections(pairs: List[Tuple[str, SliceArrays]], output_dir: Path, args: argparse.Namespace) -> List[Path]:
+    """Project every agent pair into the shared space (fitted once, stored on disk) and draw the drift figures."""
+    projection = load_or_fit_projection(
+        getCache(), getEmbedder(args.embedder).name, args.projection, args.projection_sample, args.refit_projection
+    )
+    coords = {net_id: project_arrays(arrays, projection) for net_id, arrays in pairs}
+    bounds = projection_bounds(list(coords.values()))
+    saved: List[Path] = []
+    for net_id, arrays in pairs:
+        path = output_dir / f"{net_id}_Agent_Semantic_Drift.jpg"
+        plot_semantic_drift(arrays, coords[net_id], bounds, path, f"Semantic Drift ({net_id})", args.projection)
+        saved.append(path)
+    centroids = {net_id: (arrays.steps, np.nanmean(coords[net_id], axis=0)) for net_id, arrays in pairs}
+    path = output_dir / "Semantic_Drift_Networks.jpg"
+    plot_network_centroids(centroids, bounds, path, args.projection)
+    saved.append(path)
+    return saved
+
+
+def analyze_pair(
+    network_json: Path, slices_dir: Path, output_dir: Path, embedder_name: str, n_nodes: int
+) -> Tuple[List[Path], Optional[SliceArrays]]:
+    """Line figures of one (network, slices) pair; returns the saved paths and, for agent runs, the arrays
+    the shared-space projection needs."""
+    net_id = network_json.stem
+    arrays = stream_slices(network_json, slices_dir, embedder_name)
+    if is_agent_slices(slices_dir):
+        line_path = output_dir / f"{net_id}_Agent_Line.jpg"
+        plot_node_lines(
+            arrays, line_path, f"Opinion Drift: Remote vs. RTO ({net_id})", "Sentiment Score (Remote > 0 > RTO)", n_nodes, True
+        )
+        return [line_path], arrays
+    _, iteration = infer_graph_type_and_iteration(net_id, slices_dir.name)
+    label, title = BASELINE_LABELS.get(iteration, BASELINE_LABELS["degroot"])
+    line_path = output_dir / f"{net_id}_{label}_Line.jpg"
+    plot_node_lines(arrays, line_path, f"{title} ({net_id})", "Opinion Score", n_nodes, False)
+    return [line_path], None
+
+
+def main() -> None:
+    args = parse_args()
+    output_dir = args.output_dir.resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    pairs: List[Tuple[Path, Path]] = discover_network_slice_pairs()
+    if not pairs:
+        print("No (network_json, slices_dir) pairs found in networks/.")
+        return
+    print(f"Analysing {len(pairs)} network/slice pairs with {args.workers} worker(s)...")
+    tasks = [(network_json, slices_dir, output_dir, args.embedder, args.nodes) for network_json, slices_dir in pairs]
+    agent_arrays: List[Tuple[str, SliceArrays]] = []
+    failures = 0
+
+    def collect(task, result) -> None:
+        saved, arrays = result
+        for path in saved:
+            print(f"Saved: {path.name}")
+        if arrays is not None:
+            agent_arrays.append((task[0].stem, arrays))
+
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = {pool.submit(analyze_pair, *task): task for task in tasks}
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    collect(task, future.result())
+                except Exception as exc:
+                    failures += 1
+                    print(f"  ERROR [{task[0].stem} + {task[1].name}]: {exc}")
+    else:
+        for task in tasks:
+            try:
+                collect(task, analyze_pair(*task))
+            except Exception as exc:
+                failures += 1
+                print(f"  ERROR [{task[0].stem} + {task[1].name}]: {exc}")
+
+    if agent_arrays:
+        try:
+            for path in plot_projections(agent_arrays, output_dir, args):
+                print(f"Saved: {path.name}")
+        except Exception as exc:
+            print(f"  ERROR [semantic projection]: {exc}")
+    print(f"Analysis complete: {len(pairs) - failures}/{len(pairs)} pairs, figures in {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
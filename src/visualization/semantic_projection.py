@@ -0,0 +1,154 @@
+"""Shared 2D semantic space: a projection fitted once on a sample of cached embeddings and reused for every step and network."""
+
+from __future__ import annotations
+
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from input.networkOps import networksDir
+from input.semanticEmbed import EmbeddingCache
+
+
+PROJECTION_DIR = networksDir / ".semantic_projection"
+PROJECTION_METHODS = ("pca", "random", "landmark")
+PROJECTION_SAMPLE = 5000  # cached embeddings the projection is fitted on
+PROJECTION_LANDMARKS = 256  # landmark count for the "landmark" method
+PROJECTION_SEED = 42
+
+
+@dataclass
+class SemanticProjection:
+    """y = f(x) @ components.T + offset, where f is the identity for linear methods and the squared angular
+    distance to each landmark for landmark MDS. Either way a whole step projects with one matrix product."""
+
+    method: str
+    embedder: str
+    components: np.ndarray  # (2 x dim), or (2 x landmarks) for landmark MDS
+    offset: np.ndarray  # (2,)
+    landmarks: Optional[np.ndarray] = None  # (landmarks x dim), landmark MDS only
+    sample_size: int = 0
+
+    def transform(self, embeddings: np.ndarray) -> np.ndarray:
+        features = np.asarray(embeddings, dtype=np.float64)
+        if self.landmarks is not None:
+            features = np.arccos(np.clip(features @ self.landmarks.T, -1.0, 1.0)) ** 2
+        return features @ self.components.T + self.offset
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {
+            "method": np.array(self.method),
+            "embedder": np.array(self.embedder),
+            "components": self.components,
+            "offset": self.offset,
+            "sample_size": np.array(self.sample_size),
+        }
+        if self.landmarks is not None:
+            arrays["landmarks"] = self.landmarks
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with temp_path.open("wb") as handle:
+            np.savez(handle, **arrays)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "SemanticProjection":
+        with np.load(path) as data:
+            return cls(
+                method=str(data["method"]),
+                embedder=str(data["embedder"]),
+                components=np.array(data["components"]),
+                offset=np.array(data["offset"]),
+                landmarks=np.array(data["landmarks"]) if "landmarks" in data else None,
+                sample_size=int(data["sample_size"]),
+            )
+
+
+def _orient(components: np.ndarray) -> np.ndarray:
+    """Make the largest-magnitude entry of each axis positive, so refits do not mirror the plot."""
+    signs = np.sign(components[np.arange(len(components)), np.abs(components).argmax(axis=1)])
+    return components * np.where(signs == 0, 1.0, signs)[:, None]
+
+
+def fit_pca(sample: np.ndarray, embedder: str) -> SemanticProjection:
+    mean = sample.mean(axis=0)
+    _, _, vt = np.linalg.svd(sample - mean, full_matrices=False)
+    components = _orient(vt[:2])
+    return SemanticProjection("pca", embedder, components, -mean @ components.T, sample_size=len(sample))
+
+
+def fit_random(sample: np.ndarray, embedder: str, seed: int = PROJECTION_SEED) -> SemanticProjection:
+    """Orthonormalized Gaussian projection; the sample only supplies the centering."""
+    mean = sample.mean(axis=0)
+    gaussian = np.random.default_rng(seed).standard_normal((sample.shape[1], 2))
+    components = np.linalg.qr(gaussian)[0].T
+    return SemanticProjection("random", embedder, components, -mean @ components.T, sample_size=len(sample))
+
+
+def fit_landmark(
+    sample: np.ndarray, embedder: str, landmarks: int = PROJECTION_LANDMARKS, seed: int = PROJECTION_SEED
+) -> SemanticProjection:
+    """Landmark MDS on angular distances: classical MDS of the landmarks, then distance-based triangulation
+    (de Silva & Tenenbaum) for every other point, O(landmarks) per point."""
+    rng = np.random.default_rng(seed)
+    chosen = sample[np.sort(rng.choice(len(sample), size=min(landmarks, len(sample)), replace=False))]
+    chosen = chosen / np.maximum(np.linalg.norm(chosen, axis=1, keepdims=True), 1e-12)
+    squared = np.arccos(np.clip(chosen @ chosen.T, -1.0, 1.0)) ** 2
+    column_mean = squared.mean(axis=0)
+    centered = squared - column_mean - squared.mean(axis=1, keepdims=True) + squared.mean()
+    eigenvalues, eigenvectors = np.linalg.eigh(-0.5 * centered)
+    top = np.argsort(eigenvalues)[::-1][:2]
+    pseudo_inverse = _orient(eigenvectors[:, top].T) / np.sqrt(np.maximum(eigenvalues[top], 1e-12))[:, None]
+    return SemanticProjection(
+        "landmark", embedder, -0.5 * pseudo_inverse, 0.5 * pseudo_inverse @ column_mean, chosen, len(sample)
+    )
+
+
+def projection_path(embedder: str, method: str, directory: Path = PROJECTION_DIR) -> Path:
+    return directory / f"{embedder}_{method}.npz"
+
+
+def fit_projection(
+    cache: EmbeddingCache, embedder: str, method: str = "pca", sample_size: int = PROJECTION_SAMPLE
+) -> SemanticProjection:
+    if method not in PROJECTION_METHODS:
+        raise ValueError(f"Unknown projection method: {method}. Choose from {', '.join(PROJECTION_METHODS)}.")
+    sample = cache.sample(embedder, sample_size)
+    if len(sample) < 3:
+        raise ValueError(f"Need at least 3 cached {embedder} embeddings to fit a projection, found {len(sample)}")
+    sample = sample.astype(np.float64)
+    if method == "pca":
+        return fit_pca(sample, embedder)
+    if method == "random":
+        return fit_random(sample, embedder)
+    return fit_landmark(sample, embedder)
+
+
+def load_or_fit_projection(
+    cache: EmbeddingCache,
+    embedder: str,
+    method: str = "pca",
+    sample_size: int = PROJECTION_SAMPLE,
+    refit: bool = False,
+    directory: Path = PROJECTION_DIR,
+) -> SemanticProjection:
+    """The stored projection for (embedder, method) if there is one, so every run shares the same space;
+    otherwise (or with refit) fit on a sample of the cache and store it."""
+    path = projection_path(embedder, method, directory)
+    if path.exists() and not refit:
+        try:
+            return SemanticProjection.load(path)
+        except (OSError, KeyError, ValueError) as exc:
+            print(f"  (refitting unreadable projection {path}: {exc})")
+    projection = fit_projection(cache, embedder, method, sample_size)
+    try:
+        projection.save(path)
+    except OSError as exc:
+        print(f"  (projection not saved: {exc})")
+    return projection
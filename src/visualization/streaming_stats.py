@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""Bounded-memory per-step opinion statistics: mergeable fixed-bin histograms built one slice at a time."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+
+DEFAULT_BINS = 4096  # quantile error <= 1 / DEFAULT_BINS on the [0, 1] opinion scale
+SCORE_HISTOGRAM_EDGES = np.arange(0.0, 1.05, 0.1)  # the 0-0.1, 0.1-0.2, ... bars of the score histogram
+
+
+class StepHistograms:
+    """Per-step histograms of opinions on [0, 1].
+
+    Each step keeps DEFAULT_BINS-style fine counts (for quantiles), exact counts over SCORE_HISTOGRAM_EDGES
+    (same binning as np.histogram) and the exact min/max. Everything is additive, so summaries of disjoint
+    node shards or disjoint step ranges merge into the summary of the whole run.
+    """
+
+    def __init__(self, bins: int = DEFAULT_BINS, coarse_edges: np.ndarray = SCORE_HISTOGRAM_EDGES) -> None:
+        self.bins = bins
+        self.coarse_edges = np.asarray(coarse_edges, dtype=float)
+        self.fine: Dict[int, np.ndarray] = {}
+        self.coarse: Dict[int, np.ndarray] = {}
+        self.minimum: Dict[int, float] = {}
+        self.maximum: Dict[int, float] = {}
+
+    @property
+    def steps(self) -> List[int]:
+        return sorted(self.fine)
+
+    def add(self, step: int, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            return
+        fine = np.bincount(np.clip((values * self.bins).astype(np.int64), 0, self.bins - 1), minlength=self.bins)
+        coarse, _ = np.histogram(values, bins=self.coarse_edges)
+        self._accumulate(step, fine, coarse, float(values.min()), float(values.max()))
+
+    def _accumulate(self, step: int, fine: np.ndarray, coarse: np.ndarray, low: float, high: float) -> None:
+        if step in self.fine:
+            self.fine[step] = self.fine[step] + fine
+            self.coarse[step] = self.coarse[step] + coarse
+            self.minimum[step] = min(self.minimum[step], low)
+            self.maximum[step] = max(self.maximum[step], high)
+        else:
+            self.fine[step] = fine.astype(np.int64)
+            self.coarse[step] = coarse.astype(np.int64)
+            self.minimum[step] = low
+            self.maximum[step] = high
+
+    def merge(self, other: "StepHistograms") -> "StepHistograms":
+        if other.bins != self.bins or not np.array_equal(other.coarse_edges, self.coarse_edges):
+            raise ValueError("Cannot merge StepHistograms with different binning")
+        for step in other.fine:
+            self._accumulate(step, other.fine[step], other.coarse[step], other.minimum[step], other.maximum[step])
+        return self
+
+    def quantile(self, q: float) -> np.ndarray:
+        """Per-step q-quantile (np.quantile's linear definition), locating order statistics inside their fine bin."""
+        steps = self.steps
+        counts = np.array([self.fine[step] for step in steps], dtype=np.int64)
+        cumulative = np.cumsum(counts, axis=1)
+        totals = cumulative[:, -1]
+        rank = q * (totals - 1)
+        low_rank = np.floor(rank)
+        values = []
+        for order in (low_rank, np.minimum(low_rank + 1, totals - 1)):
+            row_bins = np.count_nonzero(cumulative <= order[:, None], axis=1)  # bin holding this order statistic
+            before = np.where(row_bins > 0, cumulative[np.arange(len(steps)), np.maximum(row_bins - 1, 0)], 0)
+            in_bin = counts[np.arange(len(steps)), row_bins]
+            position = (order - before + 0.5) / np.maximum(in_bin, 1)
+            values.append((row_bins + position) / self.bins)
+        estimate = values[0] + (rank - low_rank) * (values[1] - values[0])
+        low = np.array([self.minimum[step] for step in steps])
+        high = np.array([self.maximum[step] for step in steps])
+        return np.clip(estimate, low, high)
+
+    def coarse_histogram(self, step: int) -> np.ndarray:
+        return self.coarse[step]
+
+    def save(self, path: Path) -> None:
+        steps = self.steps
+        np.savez_compressed(
+            path,
+            bins=np.array(self.bins),
+            coarse_edges=self.coarse_edges,
+            steps=np.array(steps, dtype=np.int64),
+            fine=np.array([self.fine[step] for step in steps], dtype=np.int64).reshape(len(steps), self.bins),
+            coarse=np.array([self.coarse[step] for step in steps], dtype=np.int64).reshape(len(steps), -1),
+            minimum=np.array([self.minimum[step] for step in steps]),
+            maximum=np.array([self.maximum[step] for step in steps]),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "StepHistograms":
+        with np.load(path) as data:
+            stats = cls(int(data["bins"]), data["coarse_edges"])
+            for row, step in enumerate(data["steps"].tolist()):
+                stats._accumulate(
+                    step, data["fine"][row], data["coarse"][row], float(data["minimum"][row]), float(data["maximum"][row])
+                )
+        return stats
+
+
+def slice_step(path: Path, default: int) -> int:
+    match = re.search(r"(\d+)", path.stem)
+    return int(match.group(1)) if match else default
+
+
+def read_slice_opinions(path: Path) -> np.ndarray:
+    """opinionScore of every node in one snapshot; only this slice is held in memory."""
+    with path.open("r", encoding="utf-8") as handle:
+        nodes = json.load(handle).get("nodes", [])
+    return np.fromiter((float(node["opinionScore"]) for node in nodes), dtype=float, count=len(nodes))
+
+
+def summarize_files(paths: Sequence[Path], bins: int = DEFAULT_BINS, steps: Optional[Sequence[int]] = None) -> StepHistograms:
+    stats = StepHistograms(bins)
+    for index, path in enumerate(paths):
+        stats.add(steps[index] if steps is not None else slice_step(path, index), read_slice_opinions(path))
+    return stats
+
+
+def _chunks(items: Sequence, count: int) -> Iterable[Sequence]:
+    size = -(-len(items) // count)
+    return (items[start : start + size] for start in range(0, len(items), size))
+
+
+def summarize_slices(slices_dir: Path, bins: int = DEFAULT_BINS, workers: int = 1) -> StepHistograms:
+    """Stream every snapshot of slices_dir into StepHistograms; workers > 1 summarise step ranges in parallel and merge."""
+    files = [path for path in slices_dir.iterdir() if path.suffix == ".json"]
+    if not files:
+        raise FileNotFoundError(f"No snapshot JSON files were found in {slices_dir}")
+    indexed = sorted(((slice_step(path, index), path) for index, path in enumerate(sorted(files))), key=lambda item: item[0])
+    steps = [step for step, _ in indexed]
+    paths = [path for _, path in indexed]
+    if workers <= 1 or len(paths) == 1:
+        return summarize_files(paths, bins, steps)
+    stats = StepHistograms(bins)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(summarize_files, list(path_chunk), bins, list(step_chunk))
+            for path_chunk, step_chunk in zip(_chunks(paths, workers), _chunks(steps, workers))
+        ]
+        for future in futures:
+            stats.merge(future.result())
+    return stats
+
+
+def main() -> None:
+    from advanced_network_visualizations import (
+        DEFAULT_OUTPUT_DIR,
+        draw_median_band,
+        draw_score_histogram,
+        pair_output_dir,
+    )
+
+    parser = argparse.ArgumentParser(description="Median band and score histogram of a slices directory in bounded memory.")
+    parser.add_argument("--slices-dir", type=Path, required=True, help="Directory containing iter*.json snapshot files.")
+    parser.add_argument("--network-name", default=None, help="Figure prefix and output grouping. Default: slices dir minus its _*_slices suffix.")
+    parser.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT_DIR, help="Base directory for the figures.")
+    parser.add_argument("--bins", type=int, default=DEFAULT_BINS, help="Fine histogram bins per step.")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes reading slices in parallel.")
+    parser.add_argument("--summary", type=Path, default=None, help="Also save the mergeable summary (.npz) here.")
+    parser.add_argument("--moving-average-window", type=int, default=5, help="Window for smoothing the percentile band.")
+    parser.add_argument("--dpi", type=int, default=220, help="Output image DPI.")
+    args = parser.parse_args()
+
+    slices_dir = args.slices_dir.resolve()
+    network_name = args.network_name or re.sub(r"_[a-z]+_slices$", "", slices_dir.name)
+    stats = summarize_slices(slices_dir, args.bins, args.workers)
+    if args.summary:
+        stats.save(args.summary)
+    output_dir = pair_output_dir(args.output_dir.resolve(), network_name, slices_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    steps = stats.steps
+    band_path = output_dir / f"{network_name}_Shaded_Median_Area.png"
+    histogram_path = output_dir / f"{network_name}_Opinion_Score_Histogram.png"
+    draw_median_band(
+        steps, stats.quantile(0.10), stats.quantile(0.5), stats.quantile(0.90), band_path, args.moving_average_window, args.dpi
+    )
+    draw_score_histogram(stats.coarse_histogram(steps[0]), stats.coarse_histogram(steps[-1]), histogram_path, args.dpi)
+    print(f"Summarised {len(steps)} snapshots of {slices_dir.name}")
+    print(f"Saved {band_path}")
+    print(f"Saved {histogram_path}")
+
+
+if __name__ == "__main__":
+    main()